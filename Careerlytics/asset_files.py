@@ -0,0 +1,219 @@
+"""
+Cache-friendly serving of the question banks and exam pages.
+
+Replaces django.views.static.serve for the mocktestdata and radinesstest
+trees, which stay the single source of these files. Every response
+carries an ETag of the file's content hash and of the content encoding
+sent, and answers If-None-Match with a 304; responses are sent with
+Cache-Control: no-cache, so browsers revalidate on every use and only
+download a file again when its content changed.
+build_question_assets writes gzip and brotli variants of the text files
+and a manifest of their hashes, and responses use the smallest variant
+the client accepts.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+
+# URL prefix -> directory served under it
+ASSET_ROOTS = {
+    'mocktestdata': os.path.join(settings.BASE_DIR, 'mocktestdata'),
+    'radinesstest': os.path.join(settings.BASE_DIR, 'radinesstest'),
+}
+
+# Only data and page files are served; code and databases in the same trees are not
+SERVED_EXTENSIONS = ('.json', '.html', '.txt')
+
+# Precompressed variants and the manifest, written by build_question_assets
+ASSET_BUILD_DIR = os.path.join(settings.BASE_DIR, 'asset_build')
+MANIFEST_PATH = os.path.join(ASSET_BUILD_DIR, 'manifest.json')
+
+# Files smaller than this are not worth compressing
+PRECOMPRESS_MIN_SIZE = 512
+
+# Content-Encoding -> variant suffix, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+_lock = threading.Lock()
+_hashes: Dict[str, Tuple[int, int, str]] = {}
+_manifest: Tuple[Optional[float], Dict[str, Any]] = (None, {})
+
+
+def content_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _read_manifest() -> Dict[str, Any]:
+    """Manifest of the last build, reloaded when the file changes"""
+    global _manifest
+    try:
+        mtime = os.path.getmtime(MANIFEST_PATH)
+    except OSError:
+        return {}
+    if _manifest[0] != mtime:
+        try:
+            with open(MANIFEST_PATH, encoding='utf-8') as f:
+                files = json.load(f).get('files', {})
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read {MANIFEST_PATH}: {e}")
+            files = {}
+        _manifest = (mtime, files)
+    return _manifest[1]
+
+
+def asset_path(name: str) -> str:
+    """Absolute path of '<root>/<path>', or Http404"""
+    root, _, relative = name.partition('/')
+    if root not in ASSET_ROOTS or not relative.lower().endswith(SERVED_EXTENSIONS):
+        raise Http404(name)
+    try:
+        path = safe_join(ASSET_ROOTS[root], relative)
+    except ValueError:
+        raise Http404(name)
+    if not os.path.isfile(path):
+        raise Http404(name)
+    return path
+
+
+def asset_info(name: str) -> Dict[str, Any]:
+    """
+    Path, hash and built variants of '<root>/<path>'
+
+    The manifest entry is used while the file's size and mtime still match
+    it; otherwise the hash is computed once and kept until the file changes.
+    """
+    path = asset_path(name)
+    stat = os.stat(path)
+    entry = _read_manifest().get(name)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return dict(entry, path=path)
+
+    cached = _hashes.get(path)
+    if cached is None or cached[:2] != (stat.st_size, stat.st_mtime_ns):
+        cached = (stat.st_size, stat.st_mtime_ns, content_hash(path))
+        with _lock:
+            _hashes[path] = cached
+    return {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': cached[2], 'variants': {}}
+
+
+def _accepted_encodings(request) -> set:
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+@require_safe
+def serve_asset(request, path, root):
+    """Serve a file of one of the ASSET_ROOTS (drop-in for django.views.static.serve)"""
+    name = f'{root}/{path}'
+    info = asset_info(name)
+
+    file_path, encoding = info['path'], None
+    accepted = _accepted_encodings(request)
+    for coding, _ in ENCODINGS:
+        variant = info['variants'].get(coding)
+        if coding in accepted and variant:
+            variant_path = os.path.join(ASSET_BUILD_DIR, variant)
+            if os.path.isfile(variant_path):
+                file_path, encoding = variant_path, coding
+                break
+
+    # Each encoding is a different representation, so it gets its own tag
+    etag = quote_etag(f"{info['hash']}-{encoding}" if encoding else info['hash'])
+    if_none_match = [tag.strip().removeprefix('W/') for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]
+    if etag in if_none_match or '*' in if_none_match:
+        response = HttpResponseNotModified()
+    else:
+        content_type, _ = mimetypes.guess_type(info['path'])
+        response = FileResponse(open(file_path, 'rb'), content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    if info['variants']:
+        response['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def _compressors():
+    compressors = {'gzip': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+        compressors['br'] = lambda data: brotli.compress(data, quality=11)
+    except ImportError:
+        print("Warning: brotli is not installed, writing gzip variants only")
+    return compressors
+
+
+def build_assets() -> Dict[str, int]:
+    """
+    Hash every served file, write compressed variants of the larger ones
+    and the manifest; variants of files that changed or went away are removed
+    """
+    compressors = _compressors()
+    files = {}
+    counts = {'files': 0, 'variants': 0, 'removed': 0}
+    for root, directory in ASSET_ROOTS.items():
+        for current, dirnames, filenames in os.walk(directory):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith(('.', '__')))
+            for filename in sorted(filenames):
+                if not filename.lower().endswith(SERVED_EXTENSIONS):
+                    continue
+                path = os.path.join(current, filename)
+                name = f"{root}/{os.path.relpath(path, directory).replace(os.sep, '/')}"
+                stat = os.stat(path)
+                with open(path, 'rb') as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()[:16]
+                variants = {}
+                if len(data) >= PRECOMPRESS_MIN_SIZE:
+                    for coding, suffix in ENCODINGS:
+                        if coding not in compressors:
+                            continue
+                        variant = f"{name}.{digest}{suffix}"
+                        variant_path = os.path.join(ASSET_BUILD_DIR, variant)
+                        if not os.path.exists(variant_path):
+                            compressed = compressors[coding](data)
+                            if len(compressed) >= len(data):
+                                continue
+                            os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+                            with open(variant_path, 'wb') as f:
+                                f.write(compressed)
+                        variants[coding] = variant
+                        counts['variants'] += 1
+                files[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest, 'variants': variants}
+                counts['files'] += 1
+
+    os.makedirs(ASSET_BUILD_DIR, exist_ok=True)
+    partial = f'{MANIFEST_PATH}.tmp'
+    with open(partial, 'w', encoding='utf-8') as f:
+        json.dump({'files': files}, f, indent=1, sort_keys=True)
+    os.replace(partial, MANIFEST_PATH)
+
+    current = {os.path.join(ASSET_BUILD_DIR, variant) for entry in files.values() for variant in entry['variants'].values()}
+    for directory, _, filenames in os.walk(ASSET_BUILD_DIR):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if path != MANIFEST_PATH and path not in current:
+                os.remove(path)
+                counts['removed'] += 1
+    return counts
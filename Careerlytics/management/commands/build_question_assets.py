@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from Careerlytics.asset_files import ASSET_BUILD_DIR, build_assets
+
+
+class Command(BaseCommand):
+    help = "Hash the served question banks and exam pages and write their gzip/brotli variants."
+
+    def handle(self, *args, **options):
+        counts = build_assets()
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['files']} files, {counts['variants']} compressed variants in {ASSET_BUILD_DIR}"
+            f" ({counts['removed']} stale variants removed)"
+        ))
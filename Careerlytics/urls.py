@@ -28,7 +28,7 @@ from users import views_python_test
 from users import views_mock_test
 from admins import views as admins
 from django.views.generic import TemplateView
-from django.views.static import serve
+from Careerlytics.asset_files import serve_asset
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -83,6 +83,8 @@ urlpatterns = [
     path('placement-drives/delete/<int:activity_id>/', mainview.admin_delete_activity, name='admin_delete_activity'),
     path('placement-drives/view/<int:activity_id>/', mainview.admin_view_activity, name='admin_view_activity'),
     path('placement-drives/applications/<int:drive_id>/', mainview.admin_drive_applications, name='admin_drive_applications'),
+    path('placement-drives/candidates/<int:drive_id>/', mainview.admin_drive_candidates, name='admin_drive_candidates'),
+    path('placement-drives/cohort-eligibility/', mainview.admin_cohort_eligibility, name='admin_cohort_eligibility'),
     path('placement-drives/opted-in/', mainview.admin_opted_in, name='admin_opted_in'),
     path('placement-drives/application-detail/<int:application_id>/', mainview.admin_application_detail, name='admin_application_detail'),
     path('placement-drives/update-status/<int:application_id>/', mainview.admin_update_application_status, name='admin_update_application_status'),
@@ -125,11 +127,11 @@ urlpatterns = [
     path('mock-test/jamai/list/', views_mock_test.softskills_test_list, name='softskills_test_list'),
     path('mock-test/questions/<str:test_type>/<str:category>/<str:filename>', views_mock_test.serve_question_file, name='serve_question_file'),
     
-    # Serve mocktestdata directory
-    path('mocktestdata/<path:path>', serve, kwargs={'document_root': 'mocktestdata'}, name='mocktestdata_file'),
+    # Serve mocktestdata directory (ETag revalidation, precompressed variants)
+    path('mocktestdata/<path:path>', serve_asset, kwargs={'root': 'mocktestdata'}, name='mocktestdata_file'),
 
     # Serve readiness test data directory
-    path('radinesstest/<path:path>', serve, kwargs={'document_root': 'radinesstest'}, name='readinesstest_file'),
+    path('radinesstest/<path:path>', serve_asset, kwargs={'root': 'radinesstest'}, name='readinesstest_file'),
 
     # Jamai (Voice Recording) URLs
     path('softskills/', include('jamai.urls', namespace='softskills')),
@@ -2,7 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods, require_POST
 import json
@@ -571,7 +571,9 @@ def student_classification(request):
     # Process strengths and weaknesses for each result
     # ReadinessTestResult uses aptitude_score, reasoning_score, etc. as raw counts
     # We need to convert them to percentages for the strengths/weaknesses logic
-    # Aptitude: 9, Reasoning: 9, English: 6, Core: 36
+    # Category totals are the question counts of the readiness banks
+    from personalizedplan.testsystem.grading import readiness_category_totals
+    totals = readiness_category_totals()
     for res in results:
         res.strengths = []
         res.weaknesses = []
@@ -581,10 +583,10 @@ def student_classification(request):
         res.readiness_classification = res.classification
         
         # Calculate percentages for internal logic
-        apt_pct = (res.aptitude_score / 9 * 100) if 9 > 0 else 0
-        reas_pct = (res.reasoning_score / 9 * 100) if 9 > 0 else 0
-        eng_pct = (res.english_score / 6 * 100) if 6 > 0 else 0
-        core_pct = (res.core_score / 36 * 100) if 36 > 0 else 0
+        apt_pct = (res.aptitude_score / totals['aptitude'] * 100) if totals['aptitude'] > 0 else 0
+        reas_pct = (res.reasoning_score / totals['reasoning'] * 100) if totals['reasoning'] > 0 else 0
+        eng_pct = (res.english_score / totals['english'] * 100) if totals['english'] > 0 else 0
+        core_pct = (res.core_score / totals['core'] * 100) if totals['core'] > 0 else 0
         
         # Attach percentage and raw scores to result object for template rendering
         res.score = int(res.percentage)
@@ -695,7 +697,8 @@ def student_classification(request):
             'improvement': improvement_count,
             'at_risk': at_risk_count,
             'ready_percent': int((ready_count / total_attempts * 100)) if total_attempts > 0 else 0
-        }
+        },
+        'category_totals': totals,
     }
     return render(request, 'admins/studentclassification.html', context)
 
@@ -900,6 +903,68 @@ def admin_drive_applications(request, drive_id):
     }
     return render(request, 'admins/opted.html', context)
 
+def admin_drive_candidates(request, drive_id):
+    """Rank a drive's applicants (or every eligible student) by resume relevance"""
+    if not request.user.is_staff:
+        return JsonResponse({'status': 'error', 'message': 'Unauthorized'}, status=403)
+    
+    drive = get_object_or_404(PlacementActivity, id=drive_id, activity_type='drive')
+    scope = request.GET.get('scope', 'applicants')
+    if scope not in ('applicants', 'eligible'):
+        return JsonResponse({'status': 'error', 'message': 'scope must be applicants or eligible'}, status=400)
+    try:
+        k = max(1, min(int(request.GET.get('k', 50)), 500))
+    except ValueError:
+        k = 50
+    
+    from users.models import UserRegistration
+    from resumeanalysis.resume_search import rank_drive_candidates
+    
+    ranked = rank_drive_candidates(drive, scope=scope, k=k)
+    
+    # Attach student details with a single query
+    users = UserRegistration.objects.in_bulk([r['user_id'] for r in ranked])
+    candidates = []
+    for rank, result in enumerate(ranked, start=1):
+        student = users.get(result['user_id'])
+        if not student:
+            continue
+        candidates.append({
+            'rank': rank,
+            'userid': student.userid,
+            'student_id': student.student_id,
+            'email': student.email,
+            'resume_analysis_id': str(result['analysis_id']),
+            'relevance': result['score'],
+        })
+    
+    return JsonResponse({
+        'status': 'success',
+        'drive_id': drive.id,
+        'scope': scope,
+        'candidates': candidates,
+    })
+
+def admin_cohort_eligibility(request):
+    """Every student's eligibility across every role, as JSON or CSV"""
+    if not request.user.is_staff:
+        return JsonResponse({'status': 'error', 'message': 'Unauthorized'}, status=403)
+    
+    placement_cell = PlacementCell.objects.filter(user=request.user).first()
+    if not placement_cell:
+        return JsonResponse({'status': 'error', 'message': 'No placement cell found for your account.'}, status=404)
+    
+    from resumeanalysis.cohort_eligibility import get_cohort_report, cohort_report_csv
+    
+    report = get_cohort_report(placement_cell, force=request.GET.get('refresh') == '1')
+    
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(cohort_report_csv(report), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="cohort_eligibility_{placement_cell.pk}.csv"'
+        return response
+    
+    return JsonResponse({'status': 'success', **report})
+
 def admin_test_results(request):
     """View all test results"""
     if not request.user.is_staff:
@@ -930,6 +995,8 @@ def admin_test_results(request):
         )
     
     # Add properties for template compatibility
+    from personalizedplan.testsystem.grading import readiness_category_totals
+    totals = readiness_category_totals()
     for res in results:
         res.score = int(res.percentage)
         res.readiness_classification = res.classification
@@ -937,10 +1004,10 @@ def admin_test_results(request):
         res.test_title = "Global Readiness Assessment"
         
         # Calculate percentages and raw marks
-        res.aptitude_score_pct = int((res.aptitude_score / 9 * 100) if 9 > 0 else 0)
-        res.reasoning_score_pct = int((res.reasoning_score / 9 * 100) if 9 > 0 else 0)
-        res.english_score_pct = int((res.english_score / 6 * 100) if 6 > 0 else 0)
-        res.core_subjects_score_pct = int((res.core_score / 36 * 100) if 36 > 0 else 0)
+        res.aptitude_score_pct = int((res.aptitude_score / totals['aptitude'] * 100) if totals['aptitude'] > 0 else 0)
+        res.reasoning_score_pct = int((res.reasoning_score / totals['reasoning'] * 100) if totals['reasoning'] > 0 else 0)
+        res.english_score_pct = int((res.english_score / totals['english'] * 100) if totals['english'] > 0 else 0)
+        res.core_subjects_score_pct = int((res.core_score / totals['core'] * 100) if totals['core'] > 0 else 0)
         
         res.aptitude_raw = res.aptitude_score
         res.reasoning_raw = res.reasoning_score
@@ -953,6 +1020,7 @@ def admin_test_results(request):
         'results': results,
         'search_query': search_query,
         'test_id': test_id,
+        'category_totals': totals,
     }
     return render(request, 'admins/test_results.html', context)
 
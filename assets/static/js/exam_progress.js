@@ -0,0 +1,140 @@
+/*
+ * Delta-based exam autosave.
+ *
+ * Answer changes are collected and posted together at most every
+ * `interval` seconds as {attempt, seq, changes}. Every post carries all
+ * changes the server has not acknowledged yet under a new, higher seq, so
+ * the server can drop any post older than the last one it applied. Pending
+ * changes are flushed with a keepalive request when the page is hidden,
+ * and handed to the submission with finalPayload().
+ *
+ * Pages whose server does not hand out the attempt key and seq pass a
+ * `storageKey`; the key is then generated here and both are kept in
+ * sessionStorage, so a reload of the same test (same `fingerprint`)
+ * continues the same attempt.
+ */
+function ExamProgress(options) {
+    this.url = options.url;
+    this.attempt = options.attempt;
+    this.seq = options.seq || 0;
+    this.storageKey = options.storageKey || null;
+    this.fingerprint = options.fingerprint || '';
+    if (this.storageKey) {
+        const stored = JSON.parse(sessionStorage.getItem(this.storageKey) || 'null');
+        if (stored && stored.fingerprint === this.fingerprint) {
+            this.attempt = stored.attempt;
+            this.seq = stored.seq;
+        } else {
+            this.attempt = (window.crypto && crypto.randomUUID)
+                ? crypto.randomUUID().replace(/-/g, '')
+                : Date.now().toString(16) + Math.random().toString(16).slice(2);
+        }
+    }
+    this.interval = (options.interval || 10) * 1000;
+    this.csrfToken = options.csrfToken || null;
+    this.unacked = {};   // position -> answer not yet acknowledged by the server
+    this.timer = null;
+    this.inFlight = false;
+
+    const progress = this;
+    document.addEventListener('visibilitychange', function() {
+        if (document.visibilityState === 'hidden') {
+            progress.flush(true);
+        }
+    });
+    window.addEventListener('pagehide', function() {
+        progress.flush(true);
+    });
+}
+
+// Record an answer change (null when cleared) and schedule a save
+ExamProgress.prototype.record = function(position, answer) {
+    if (!this.attempt) return;
+    this.unacked[position] = answer === undefined ? null : answer;
+    this.schedule();
+};
+
+ExamProgress.prototype.schedule = function() {
+    if (this.timer) return;
+    const progress = this;
+    this.timer = setTimeout(function() {
+        progress.timer = null;
+        progress.flush(false);
+    }, this.interval);
+};
+
+ExamProgress.prototype.flush = function(keepalive) {
+    if (!this.attempt || Object.keys(this.unacked).length === 0) return;
+    if (this.inFlight && !keepalive) {
+        // One save at a time; the next one picks up everything still unacknowledged
+        this.schedule();
+        return;
+    }
+
+    const sent = Object.assign({}, this.unacked);
+    const seq = this.nextSeq();
+    const progress = this;
+    this.inFlight = true;
+
+    fetch(this.url, {
+        method: 'POST',
+        keepalive: keepalive,
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': this.csrfToken
+        },
+        body: JSON.stringify({attempt: this.attempt, seq: seq, changes: sent})
+    })
+    .then(response => {
+        if (response.status === 409) {
+            // The test was submitted or replaced; stop saving
+            progress.attempt = null;
+        }
+        return response.json();
+    })
+    .then(data => {
+        if (data.status === 'success' && data.seq >= seq) {
+            // Drop the acknowledged changes unless they were changed again meanwhile
+            Object.keys(sent).forEach(position => {
+                if (progress.unacked[position] === sent[position]) {
+                    delete progress.unacked[position];
+                }
+            });
+        } else if (data.status !== 'success') {
+            console.warn('Failed to save progress to backend:', data.message);
+        }
+    })
+    .catch(error => {
+        console.error('Error saving progress to backend:', error);
+    })
+    .finally(() => {
+        progress.inFlight = false;
+        if (Object.keys(progress.unacked).length > 0) {
+            progress.schedule();
+        }
+    });
+};
+
+// Fields to add to the submission so the server can apply the last unsaved changes
+ExamProgress.prototype.finalPayload = function() {
+    if (this.timer) {
+        clearTimeout(this.timer);
+        this.timer = null;
+    }
+    const payload = {attempt: this.attempt, seq: this.nextSeq(), changes: Object.assign({}, this.unacked)};
+    this.attempt = null;   // no further saves once submitted
+    if (this.storageKey) {
+        sessionStorage.removeItem(this.storageKey);
+    }
+    return payload;
+};
+
+ExamProgress.prototype.nextSeq = function() {
+    this.seq += 1;
+    if (this.storageKey) {
+        sessionStorage.setItem(this.storageKey, JSON.stringify({
+            attempt: this.attempt, seq: this.seq, fingerprint: this.fingerprint
+        }));
+    }
+    return this.seq;
+};
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mocktestdata.mock_test_export import (
+    EXPORT_BATCH_SIZE, FORMATS, MODEL_FIELDS, ExportError, export_to_file, model_rows, parse_bound, sqlite_rows
+)
+from mocktestdata.mock_test_retention import BACKEND_DB_PATH
+
+
+class Command(BaseCommand):
+    help = "Stream mock test results or logs to a JSONL or CSV file, gzip-compressed if it ends in .gz."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(MODEL_FIELDS), help="What to export")
+        parser.add_argument('output', help="File to write, e.g. logs.jsonl.gz or results.csv")
+        parser.add_argument('--format', choices=sorted(FORMATS), help="Defaults to the output file's extension")
+        parser.add_argument('--test-type', help="Only this test type")
+        parser.add_argument('--since', help="From this ISO date or datetime")
+        parser.add_argument('--until', help="Up to this ISO date (inclusive) or datetime")
+        parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE, help="Rows fetched per batch")
+        parser.add_argument('--backend-db', nargs='?', const=BACKEND_DB_PATH,
+                            help="Export from the backend SQLite database instead of the Django tables")
+
+    def handle(self, *args, **options):
+        try:
+            filters = dict(
+                test_type=options['test_type'],
+                since=parse_bound(options['since']),
+                until=parse_bound(options['until'], end=True),
+                batch_size=options['batch_size'],
+            )
+            if options['backend_db']:
+                columns, rows = sqlite_rows(options['backend_db'], options['kind'], **filters)
+            else:
+                columns, rows = model_rows(options['kind'], **filters)
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        count = export_to_file(columns, rows, options['output'], fmt=options['format'])
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} {options['kind']} to {options['output']}"))
@@ -0,0 +1,47 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from mocktestdata.mock_test_retention import (
+    BACKEND_DB_PATH, DEFAULT_BATCH_SIZE, DEFAULT_PAUSE, Archive, prune_django, prune_sqlite
+)
+
+
+class Command(BaseCommand):
+    help = "Delete mock test results and logs older than --days in small batches and release the freed space."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Days of data to keep")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows deleted per transaction")
+        parser.add_argument('--pause', type=float, default=DEFAULT_PAUSE, help="Seconds slept between batches")
+        parser.add_argument('--archive-dir', help="Write pruned rows to gzip-compressed JSONL files here first")
+        parser.add_argument('--vacuum-pages', type=int, help="Free pages released at most per database")
+        parser.add_argument('--no-vacuum', action='store_true', help="Prune only, keep the freed pages")
+        parser.add_argument('--convert-auto-vacuum', action='store_true',
+                            help="Switch the mock test databases to incremental auto-vacuum first "
+                                 "(one full VACUUM per database, which locks it while it runs)")
+        parser.add_argument('--db-path', default=BACKEND_DB_PATH,
+                            help="Mock test backend database")
+
+    def handle(self, *args, **options):
+        archive = Archive(options['archive_dir']) if options['archive_dir'] else None
+        settings = dict(
+            days_to_keep=options['days'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            archive=archive,
+            vacuum=not options['no_vacuum'],
+            vacuum_pages=options['vacuum_pages'],
+            convert_auto_vacuum=options['convert_auto_vacuum'],
+        )
+
+        if os.path.exists(options['db_path']):
+            counts = prune_sqlite(options['db_path'], **settings)
+            self.stdout.write(f"{options['db_path']}: {counts}")
+        counts = prune_django(**settings)
+        self.stdout.write(f"Django databases: {counts}")
+
+        if archive is not None:
+            for path in archive.paths.values():
+                self.stdout.write(f"Archived to {path}")
+        self.stdout.write(self.style.SUCCESS(f"Pruned mock test data older than {options['days']} days"))
@@ -0,0 +1,33 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mocktestdata.mock_test_health import HEALTH_DB_PATH, RING_SIZE, SAMPLE_INTERVAL, HealthRing, HealthSampler
+
+
+class Command(BaseCommand):
+    help = "Sample system health in the background and share it with the web workers through a ring in SQLite."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=SAMPLE_INTERVAL, help="Seconds between samples")
+        parser.add_argument('--size', type=int, default=RING_SIZE, help="Samples kept")
+        parser.add_argument('--db-path', default=HEALTH_DB_PATH, help="File the samples are shared through")
+
+    def handle(self, *args, **options):
+        try:
+            sampler = HealthSampler(
+                interval=options['interval'],
+                size=options['size'],
+                ring=HealthRing(options['db_path'], options['size']),
+            )
+        except ImportError:
+            raise CommandError("psutil is required for health sampling")
+
+        signal.signal(signal.SIGINT, sampler.stop)
+        signal.signal(signal.SIGTERM, sampler.stop)
+        self.stdout.write(self.style.SUCCESS(
+            f"Sampling health every {sampler.interval}s into {options['db_path']}"
+        ))
+        sampler.run()
+        sampler.ring.close()
+        self.stdout.write(self.style.SUCCESS("Health sampler stopped"))
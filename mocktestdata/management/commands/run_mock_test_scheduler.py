@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from mocktestdata.mock_test_scheduler import DEFAULT_POLL_INTERVAL, DEFAULT_WORKERS, MockTestScheduler
+
+
+class Command(BaseCommand):
+    help = "Run due mock test schedules; several schedulers can run side by side without running a test twice."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Tests run at the same time")
+        parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                            help="Seconds between polls for due schedules")
+        parser.add_argument('--once', action='store_true', help="Run what is due now and exit")
+
+    def handle(self, *args, **options):
+        scheduler = MockTestScheduler(
+            workers=options['workers'],
+            poll_interval=options['poll_interval'],
+            log=lambda message: self.stdout.write(message),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Mock test scheduler started ({scheduler.workers} workers, polling every {scheduler.poll_interval}s)"
+        ))
+        scheduler.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS("Mock test scheduler stopped"))
@@ -9,7 +9,6 @@ import sys
 import json
 import time
 import random
-import sqlite3
 from datetime import datetime
 from typing import Dict, List, Any
 import django
@@ -23,6 +22,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'matrix.settings')
 django.setup()
 
+from mocktestdata.mock_test_store import get_store
+
 class MockTestBackend:
     """Comprehensive Mock Test Backend for AI Resume Analyzer"""
     
@@ -35,39 +36,13 @@ class MockTestBackend:
     def init_database(self):
         """Initialize mock test database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create test results table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS test_results (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    test_type TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    message TEXT,
-                    details TEXT,
-                    execution_time REAL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create test logs table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS test_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    test_type TEXT NOT NULL,
-                    log_level TEXT NOT NULL,
-                    message TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
+            # Tables are created once per process; the connection is shared by every backend
+            self.store = get_store(self.db_path)
             self.log_info('Database', 'Mock test database initialized successfully')
             
         except Exception as e:
-            self.log_error('Database', f'Failed to initialize database: {str(e)}')
+            self.store = None
+            print(f"Logging error: Failed to initialize database: {str(e)}")
     
     def log_info(self, test_type: str, message: str):
         """Log info message"""
@@ -82,18 +57,10 @@ class MockTestBackend:
         self._log(test_type, 'WARNING', message)
     
     def _log(self, test_type: str, level: str, message: str):
-        """Internal logging method"""
+        """Internal logging method (buffered, see mock_test_store)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO test_logs (test_type, log_level, message)
-                VALUES (?, ?, ?)
-            ''', (test_type, level, message))
-            
-            conn.commit()
-            conn.close()
+            if self.store is not None:
+                self.store.log(test_type, level, message)
             
             print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] [{level}] {test_type}: {message}")
             
@@ -438,6 +405,25 @@ class MockTestBackend:
             
             return error_result
     
+    def run_test(self, test_type: str) -> Dict[str, Any]:
+        """Run one test by its MockTestResult test type"""
+        test_methods = {
+            'resume_analysis': self.test_resume_analysis,
+            'ai_model': self.test_ai_model,
+            'database': self.test_database,
+            'api': self.test_api,
+            'performance': self.test_performance,
+            'security': self.test_security,
+        }
+        if test_type not in test_methods:
+            return {
+                'status': 'error',
+                'message': f'Unknown test type: {test_type}',
+                'details': ['Test type not implemented'],
+                'execution_time': 0
+            }
+        return test_methods[test_type]()
+    
     # Helper methods for testing
     def _parse_resume_text(self, text: str) -> str:
         """Mock resume text parsing"""
@@ -458,16 +444,10 @@ class MockTestBackend:
     def _test_database_storage(self, text: str, score: float) -> bool:
         """Mock database storage test"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            self.store.execute('''
                 INSERT INTO test_results (test_type, status, message, details, execution_time)
                 VALUES (?, ?, ?, ?, ?)
-            ''', ('storage_test', 'success', 'Mock storage test', 0.1))
-            
-            conn.commit()
-            conn.close()
+            ''', ('storage_test', 'success', 'Mock storage test', '[]', 0.1))
             return True
         except Exception:
             return False
@@ -492,8 +472,7 @@ class MockTestBackend:
     def _test_database_connection(self) -> bool:
         """Mock database connection test"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.close()
+            self.store.query('SELECT 1')
             return True
         except Exception:
             return False
@@ -501,23 +480,17 @@ class MockTestBackend:
     def _test_crud_operations(self) -> bool:
         """Mock CRUD operations test"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Create
-            cursor.execute('CREATE TABLE IF NOT EXISTS test_crud (id INTEGER PRIMARY KEY, data TEXT)')
+            self.store.execute('CREATE TABLE IF NOT EXISTS test_crud (id INTEGER PRIMARY KEY, data TEXT)')
             
             # Read
-            cursor.execute('SELECT COUNT(*) FROM test_crud')
+            self.store.query('SELECT COUNT(*) FROM test_crud')
             
             # Update
-            cursor.execute('UPDATE test_crud SET data = ? WHERE id = 1', ('test_data',))
+            self.store.execute('UPDATE test_crud SET data = ? WHERE id = 1', ('test_data',))
             
             # Delete
-            cursor.execute('DELETE FROM test_crud WHERE id = 1')
-            
-            conn.commit()
-            conn.close()
+            self.store.execute('DELETE FROM test_crud WHERE id = 1')
             return True
         except Exception:
             return False
@@ -579,24 +552,15 @@ class MockTestBackend:
         return random.choice([True, True, True, False])  # 75% success rate
     
     def save_test_result(self, test_type: str, result: Dict[str, Any]):
-        """Save test result to database"""
+        """Save test result to database (buffered, see mock_test_store)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO test_results (test_type, status, message, details, execution_time)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
+            self.store.add_result(
                 test_type,
                 result['status'],
                 result['message'],
                 json.dumps(result['details']),
                 result.get('execution_time', 0)
-            ))
-            
-            conn.commit()
-            conn.close()
+            )
             
         except Exception as e:
             self.log_error('Database', f'Failed to save test result: {str(e)}')
@@ -604,32 +568,27 @@ class MockTestBackend:
     def get_test_results(self, test_type: str = None, limit: int = 10) -> List[Dict[str, Any]]:
         """Get test results from database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             if test_type:
-                cursor.execute('''
+                columns, rows = self.store.query('''
                     SELECT * FROM test_results 
                     WHERE test_type = ? 
                     ORDER BY timestamp DESC 
                     LIMIT ?
                 ''', (test_type, limit))
             else:
-                cursor.execute('''
+                columns, rows = self.store.query('''
                     SELECT * FROM test_results 
                     ORDER BY timestamp DESC 
                     LIMIT ?
                 ''', (limit,))
             
-            columns = [description[0] for description in cursor.description]
             results = []
             
-            for row in cursor.fetchall():
+            for row in rows:
                 result = dict(zip(columns, row))
                 result['details'] = json.loads(result['details']) if result['details'] else []
                 results.append(result)
             
-            conn.close()
             return results
             
         except Exception as e:
@@ -639,23 +598,16 @@ class MockTestBackend:
     def clear_test_results(self, test_type: str = None):
         """Clear test results from database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             if test_type:
-                cursor.execute('DELETE FROM test_results WHERE test_type = ?', (test_type,))
+                self.store.execute('DELETE FROM test_results WHERE test_type = ?', (test_type,))
             else:
-                cursor.execute('DELETE FROM test_results')
-            
-            conn.commit()
-            conn.close()
+                self.store.execute('DELETE FROM test_results')
             
             self.log_info('Database', f'Cleared test results for {test_type or "all tests"}')
             
         except Exception as e:
             self.log_error('Database', f'Failed to clear test results: {str(e)}')
 
-
 def main():
     """Main function to run mock tests"""
     backend = MockTestBackend()
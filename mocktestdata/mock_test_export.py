@@ -0,0 +1,223 @@
+"""
+Export for Mock Test System
+Streams results and logs in batches as JSONL or CSV, optionally gzip-compressed
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import zlib
+from datetime import date, datetime, time as dt_time, timezone as dt_timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Rows fetched from the database (and encoded) per batch
+EXPORT_BATCH_SIZE = 2000
+
+FORMATS = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Exportable Django tables: kind -> (model name, fields)
+MODEL_FIELDS = {
+    'results': ('MockTestResult', ('id', 'test_type', 'status', 'message', 'details', 'execution_time',
+                                   'metrics', 'created_at', 'updated_at')),
+    'logs': ('MockTestLog', ('id', 'test_type', 'log_level', 'message', 'created_at')),
+}
+
+# The same kinds in the backend database (see mock_test_store)
+SQLITE_TABLES = {
+    'results': 'test_results',
+    'logs': 'test_logs',
+}
+
+
+class ExportError(ValueError):
+    """Invalid export request (unknown kind or format, bad date)"""
+
+
+def parse_bound(value: Optional[str], end: bool = False) -> Optional[datetime]:
+    """
+    Date or datetime filter bound from an ISO string, as an aware datetime
+
+    A plain date as the end bound covers the whole day.
+    """
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"Invalid date: {value}")
+    if end and len(value) == 10:
+        moment = datetime.combine(moment.date(), dt_time.max)
+    if moment.tzinfo is None:
+        from django.utils import timezone
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def model_rows(kind: str, test_type: str = None, since: datetime = None, until: datetime = None,
+               batch_size: int = EXPORT_BATCH_SIZE) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """
+    (fields, rows) of MockTestResult or MockTestLog, oldest first
+
+    Filters are applied in SQL on the indexed test_type and created_at
+    columns; rows come from iterator(), which uses a server-side cursor
+    where the database has one and fetches batch_size rows at a time.
+    """
+    from . import mock_test_models
+
+    if kind not in MODEL_FIELDS:
+        raise ExportError(f"Unknown export: {kind}")
+    model_name, fields = MODEL_FIELDS[kind]
+    rows = getattr(mock_test_models, model_name).objects.all()
+    if test_type:
+        rows = rows.filter(test_type=test_type)
+    if since:
+        rows = rows.filter(created_at__gte=since)
+    if until:
+        rows = rows.filter(created_at__lte=until)
+    rows = rows.order_by('created_at', 'id').values(*fields)
+    return list(fields), rows.iterator(chunk_size=batch_size)
+
+
+def _sqlite_timestamp(moment: datetime) -> str:
+    return moment.astimezone(dt_timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def sqlite_rows(db_path: str, kind: str, test_type: str = None, since: datetime = None,
+                until: datetime = None,
+                batch_size: int = EXPORT_BATCH_SIZE) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """(columns, rows) of a backend database table, fetched batch_size rows at a time"""
+    if kind not in SQLITE_TABLES:
+        raise ExportError(f"Unknown export: {kind}")
+    table = SQLITE_TABLES[kind]
+    conditions, params = [], []
+    if test_type:
+        conditions.append('test_type = ?')
+        params.append(test_type)
+    if since:
+        conditions.append('timestamp >= ?')
+        params.append(_sqlite_timestamp(since))
+    if until:
+        conditions.append('timestamp <= ?')
+        params.append(_sqlite_timestamp(until))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    connection = sqlite3.connect(db_path)
+    cursor = connection.execute(f'SELECT * FROM {table} {where} ORDER BY timestamp, id', params)
+    columns = [description[0] for description in cursor.description]
+
+    def rows():
+        try:
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                for row in batch:
+                    yield dict(zip(columns, row))
+        finally:
+            connection.close()
+
+    return columns, rows()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class _Lines:
+    """File-like target for csv.writer that hands back what was written"""
+
+    def write(self, value):
+        return value
+
+
+def encode(columns: List[str], rows: Iterable[Dict[str, Any]], fmt: str,
+           batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Encode rows as JSONL or CSV (with a header), one chunk of text per batch"""
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format: {fmt}")
+    if fmt == 'csv':
+        writer = csv.writer(_Lines())
+        yield writer.writerow(columns)
+        line = lambda row: writer.writerow([_csv_value(row.get(column)) for column in columns])
+    else:
+        line = lambda row: json.dumps(row, default=_json_default, ensure_ascii=False) + '\n'
+
+    batch = []
+    for row in rows:
+        batch.append(line(row))
+        if len(batch) >= batch_size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """gzip-compress a stream of text chunks incrementally"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(columns: List[str], rows: Iterable[Dict[str, Any]], fmt: str = 'jsonl',
+                  compress: bool = False) -> Iterator[bytes]:
+    """Bytes of an export, produced batch by batch"""
+    chunks = encode(columns, rows, fmt)
+    if compress:
+        return gzip_chunks(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
+
+
+def export_filename(kind: str, fmt: str, compress: bool) -> str:
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return f"mock_test_{kind}_{stamp}.{fmt}" + ('.gz' if compress else '')
+
+
+class _Counted:
+    """Row iterator that counts what passed through it"""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+
+def export_to_file(columns: List[str], rows: Iterable[Dict[str, Any]], path: str, fmt: str = None,
+                   compress: bool = None) -> int:
+    """
+    Write an export to path; format and compression follow the file name
+    unless given. Returns the number of rows written.
+    """
+    if compress is None:
+        compress = path.endswith('.gz')
+    if fmt is None:
+        fmt = 'csv' if path.removesuffix('.gz').endswith('.csv') else 'jsonl'
+    counted = _Counted(rows)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        for chunk in export_stream(columns, counted, fmt, compress):
+            f.write(chunk)
+    return counted.count
@@ -0,0 +1,287 @@
+"""
+Health Sampler for Mock Test System
+Samples system health in the background into a ring buffer, shared through SQLite
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Seconds between samples
+SAMPLE_INTERVAL = 5.0
+
+# Samples kept (one hour at the default interval)
+RING_SIZE = 720
+
+# Seconds a computed health summary is served for
+HEALTH_CACHE_SECONDS = 1.0
+
+# Trend windows reported with each summary: label -> seconds
+TREND_WINDOWS = {'1m': 60, '5m': 300, '15m': 900}
+
+# File the sampler command shares its ring through
+HEALTH_DB_PATH = os.path.join(os.path.dirname(__file__), 'mock_test_health.db')
+
+# Same thresholds as the original blocking check
+CPU_WARNING = 80
+MEMORY_WARNING = 80
+DISK_WARNING = 90
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS health_samples (
+        slot INTEGER PRIMARY KEY,
+        seq INTEGER NOT NULL,
+        taken_at REAL NOT NULL,
+        sample TEXT NOT NULL
+    )
+'''
+
+
+def database_files() -> List[str]:
+    """SQLite files whose open handles are counted as database connections"""
+    paths = [os.path.join(os.path.dirname(__file__), 'mock_test.db')]
+    try:
+        from django.conf import settings
+        for database in settings.DATABASES.values():
+            if database.get('ENGINE', '').endswith('sqlite3'):
+                paths.append(str(database['NAME']))
+    except Exception:
+        pass
+    return sorted({os.path.realpath(path) for path in paths})
+
+
+class HealthRing:
+    """Fixed-size ring of samples in a SQLite file, one row per slot"""
+
+    def __init__(self, db_path: str = HEALTH_DB_PATH, size: int = RING_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._connection: Optional[sqlite3.Connection] = None
+        self._seq = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=1, check_same_thread=False, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def append(self, sample: Dict[str, Any]):
+        connection = self._connect()
+        if self._seq is None:
+            self._seq = connection.execute('SELECT COALESCE(MAX(seq), -1) FROM health_samples').fetchone()[0]
+        self._seq += 1
+        connection.execute(
+            'INSERT OR REPLACE INTO health_samples (slot, seq, taken_at, sample) VALUES (?, ?, ?, ?)',
+            (self._seq % self.size, self._seq, sample['taken_at'], json.dumps(sample))
+        )
+
+    def read(self, since: float = 0) -> List[Dict[str, Any]]:
+        """Samples taken after since, oldest first"""
+        if not os.path.exists(self.db_path):
+            return []
+        rows = self._connect().execute(
+            'SELECT sample FROM health_samples WHERE taken_at > ? ORDER BY seq', (since,)
+        ).fetchall()
+        return [json.loads(sample) for (sample,) in rows]
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class HealthSampler:
+    """
+    Background thread sampling health every interval seconds
+
+    CPU usage is measured over the time since the previous sample, so a
+    sample never blocks. Samples go to an in-memory ring and, if given, to
+    a shared HealthRing.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, size: int = RING_SIZE,
+                 ring: Optional[HealthRing] = None):
+        import psutil
+
+        self.psutil = psutil
+        self.interval = interval
+        self.samples = deque(maxlen=size)
+        self.ring = ring
+        self.db_files = database_files()
+        self._process = psutil.Process()
+        # The web workers (and the sampler command) run from the project directory
+        self._cwd = os.path.realpath(os.getcwd())
+        self._username = self._process.username()
+        self._previous_network = None
+        self._stop = threading.Event()
+        self._thread = None
+        # Starts the CPU measurement window of the first sample
+        psutil.cpu_percent(interval=None)
+
+    def _server_processes(self):
+        """Processes of this user running from the same directory as the sampler: the server's workers"""
+        for process in self.psutil.process_iter(['username', 'cwd']):
+            cwd = process.info.get('cwd')
+            if process.info.get('username') == self._username and cwd and os.path.realpath(cwd) == self._cwd:
+                yield process
+
+    def _open_database_handles(self) -> int:
+        """Open handles to the database files, over the server's processes"""
+        handles = 0
+        for process in self._server_processes():
+            try:
+                open_files = process.open_files()
+            except self.psutil.Error:
+                continue
+            handles += sum(1 for open_file in open_files if open_file.path in self.db_files)
+        return handles
+
+    def sample(self) -> Dict[str, Any]:
+        psutil = self.psutil
+        now = time.time()
+        memory = psutil.virtual_memory()
+        network = psutil.net_io_counters()
+        sample = {
+            'taken_at': now,
+            'cpu_usage': psutil.cpu_percent(interval=None),
+            'memory_usage': memory.percent,
+            'disk_usage': psutil.disk_usage('/').percent,
+            'network_io': {
+                'bytes_sent': network.bytes_sent,
+                'bytes_recv': network.bytes_recv,
+            },
+            'process_rss': self._process.memory_info().rss,
+            'db_connections': self._open_database_handles(),
+        }
+        if self._previous_network is not None:
+            taken_at, sent, received = self._previous_network
+            elapsed = max(now - taken_at, 1e-6)
+            sample['network_io']['sent_per_second'] = (network.bytes_sent - sent) / elapsed
+            sample['network_io']['recv_per_second'] = (network.bytes_recv - received) / elapsed
+        self._previous_network = (now, network.bytes_sent, network.bytes_recv)
+        return sample
+
+    def record(self) -> Dict[str, Any]:
+        sample = self.sample()
+        self.samples.append(sample)
+        if self.ring is not None:
+            try:
+                self.ring.append(sample)
+            except sqlite3.Error as e:
+                print(f"Health sample not shared: {str(e)}")
+        return sample
+
+    def run(self):
+        """Sample until stopped, the first time one interval after starting"""
+        # Waiting first gives the first sample a full CPU measurement window
+        while not self._stop.wait(self.interval):
+            try:
+                self.record()
+            except Exception as e:
+                print(f"Health sampling error: {str(e)}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name='mock-test-health-sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self, *args):
+        self._stop.set()
+
+
+def _window(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def stats(values):
+        return {'avg': sum(values) / len(values), 'max': max(values)} if values else {'avg': 0, 'max': 0}
+
+    return {
+        'samples': len(samples),
+        'cpu_usage': stats([s['cpu_usage'] for s in samples]),
+        'memory_usage': stats([s['memory_usage'] for s in samples]),
+        'process_rss': stats([s['process_rss'] for s in samples]),
+        'db_connections': stats([s['db_connections'] for s in samples]),
+        'sent_per_second': stats([s['network_io']['sent_per_second'] for s in samples
+                                  if 'sent_per_second' in s['network_io']]),
+        'recv_per_second': stats([s['network_io']['recv_per_second'] for s in samples
+                                  if 'recv_per_second' in s['network_io']]),
+    }
+
+
+def summarize(samples: List[Dict[str, Any]], now: float = None) -> Dict[str, Any]:
+    """Latest sample in the format of get_system_health, with trend windows"""
+    if not samples:
+        return {
+            'status': 'unknown',
+            'message': 'No health samples yet',
+            'timestamp': datetime.now().isoformat()
+        }
+    now = now or time.time()
+    latest = samples[-1]
+    healthy = (latest['cpu_usage'] < CPU_WARNING and latest['memory_usage'] < MEMORY_WARNING
+               and latest['disk_usage'] < DISK_WARNING)
+    return {
+        'status': 'healthy' if healthy else 'warning',
+        'cpu_usage': latest['cpu_usage'],
+        'memory_usage': latest['memory_usage'],
+        'disk_usage': latest['disk_usage'],
+        'network_io': latest['network_io'],
+        'process_rss': latest['process_rss'],
+        'db_connections': latest['db_connections'],
+        'sample_age': now - latest['taken_at'],
+        'trends': {
+            label: _window([s for s in samples if s['taken_at'] > now - seconds])
+            for label, seconds in TREND_WINDOWS.items()
+        },
+        'timestamp': datetime.fromtimestamp(latest['taken_at']).isoformat()
+    }
+
+
+_lock = threading.Lock()
+_sampler: Optional[HealthSampler] = None
+_shared_ring: Optional[HealthRing] = None
+_cache = (0.0, None)
+
+
+def _samples(now: float) -> List[Dict[str, Any]]:
+    """
+    Samples of the sampler command if it is running, else of a sampler
+    thread started in this process on first use (none until its first
+    interval has passed)
+    """
+    global _sampler, _shared_ring
+    if _shared_ring is None:
+        _shared_ring = HealthRing()
+    try:
+        shared = _shared_ring.read(now - max(TREND_WINDOWS.values()))
+    except sqlite3.Error:
+        shared = []
+    if shared and now - shared[-1]['taken_at'] < SAMPLE_INTERVAL * 3:
+        return shared
+
+    if _sampler is None:
+        _sampler = HealthSampler()
+        _sampler.start()
+    return list(_sampler.samples)
+
+
+def current_health() -> Dict[str, Any]:
+    """Latest health with trends; served from memory, never waits for a measurement"""
+    global _cache
+    now = time.time()
+    taken, health = _cache
+    if health is not None and now - taken < HEALTH_CACHE_SECONDS:
+        return health
+    with _lock:
+        taken, health = _cache
+        if health is None or now - taken >= HEALTH_CACHE_SECONDS:
+            health = summarize(_samples(now), now)
+            _cache = (now, health)
+    return health
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+HTTP Load Generator for Mock Test System
+Scripted user journeys against a running server, with latency percentiles
+
+Virtual users log in and walk through weighted journeys (take an exam
+with autosaves and a submit, browse the placement drives, upload a
+resume) over a shared keep-alive connection pool. A run has a warm-up
+phase whose requests are not counted, a ramp phase that brings the
+virtual users up linearly and a steady phase at full load. Only the
+standard library is used, so the tool runs wherever the site does:
+
+    python mocktestdata/mock_test_load.py --base-url http://127.0.0.1:8000 \\
+        --users 200 --ramp 60 --duration 300 --credentials users.csv
+
+The journeys and their paths can be replaced with --scenario (a JSON
+file with the layout of DEFAULT_JOURNEYS).
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import random
+import ssl
+import sys
+import time
+import uuid
+from http.cookies import SimpleCookie
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+DEFAULT_BASE_URL = 'http://127.0.0.1:8000'
+
+# Open connections per server, shared by every virtual user
+DEFAULT_POOL_SIZE = 100
+
+# Seconds before a request counts as failed
+REQUEST_TIMEOUT = 30
+
+# Latency histogram: 0.1 ms resolution, 2% wide buckets (percentiles within 1%)
+HISTOGRAM_MIN_MS = 0.1
+HISTOGRAM_GROWTH = 1.02
+
+# Journey -> weight and steps. Strings are formatted with the user's context
+# ({user}, {password}, {question_index}, {attempt}, {seq}, ...); a value that is exactly
+# "{name}" is replaced by the context value itself (lists, dicts, numbers).
+# Uploaded files are read from the given path, or stood in for by a
+# minimal PDF of that name when it does not exist.
+DEFAULT_JOURNEYS: Dict[str, Dict[str, Any]] = {
+    'exam': {
+        'weight': 6,
+        'steps': [
+            {'name': 'mock_test_home', 'method': 'GET', 'path': '/mock-test/'},
+            {'name': 'start_exam', 'method': 'GET', 'path': '/mock-test/start/language/python/0/'},
+            {'name': 'exam_page', 'method': 'GET', 'path': '/mock-test/exam/'},
+            # The mock test page saves each answer as it is given
+            {'name': 'autosave', 'method': 'POST', 'path': '/mock-test/save-progress/', 'repeat': 30,
+             'think': [2, 6], 'answer': 1,
+             'json': {'question_index': '{question_index}', 'selected_answer': '{selected_answer}'}},
+            {'name': 'submit_exam', 'method': 'POST', 'path': '/mock-test/submit/',
+             'json': {'answers': '{answers}', 'questions': []}},
+            {'name': 'exam_results', 'method': 'GET', 'path': '/mock-test/results/'},
+        ],
+    },
+    'browse_drives': {
+        'weight': 3,
+        'steps': [
+            {'name': 'user_home', 'method': 'GET', 'path': '/UserHome/'},
+            {'name': 'campus_drives', 'method': 'GET', 'path': '/campus-drives/', 'repeat': 3, 'think': [2, 6]},
+            {'name': 'plan_dashboard', 'method': 'GET', 'path': '/personalized-plan/dashboard/'},
+        ],
+    },
+    'upload_resume': {
+        'weight': 1,
+        'steps': [
+            {'name': 'upload_page', 'method': 'GET', 'path': '/upload/'},
+            {'name': 'upload_resume', 'method': 'POST', 'path': '/upload/', 'think': [5, 15],
+             'form': {'target_role': 'backend', 'agree_to_analysis': 'on'},
+             'files': {'resume_file': 'sample_resume.pdf'}},
+            {'name': 'my_resumes', 'method': 'GET', 'path': '/my-resumes/'},
+        ],
+    },
+}
+
+# Steps every virtual user runs once before its journeys
+DEFAULT_LOGIN = [
+    {'name': 'login_page', 'method': 'GET', 'path': '/user_login/'},
+    {'name': 'login', 'method': 'POST', 'path': '/UserLoginCheck/',
+     'form': {'userid': '{user}', 'password': '{password}'}},
+]
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (constant memory, mergeable)"""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        ms = max(seconds * 1000, HISTOGRAM_MIN_MS)
+        bucket = int(math.log(ms / HISTOGRAM_MIN_MS, HISTOGRAM_GROWTH))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def merge(self, other: 'LatencyHistogram'):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        """Latency in ms below which p percent of the requests finished"""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # Upper edge of the bucket, capped by the slowest request
+                return min(HISTOGRAM_MIN_MS * HISTOGRAM_GROWTH ** (bucket + 1), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 2) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50), 2),
+            'p95_ms': round(self.percentile(95), 2),
+            'p99_ms': round(self.percentile(99), 2),
+            'max_ms': round(self.max, 2),
+        }
+
+
+class LoadStats:
+    """Latency, throughput and errors per step"""
+
+    def __init__(self):
+        self.steps: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.started = None
+        self.finished = None
+        self.bytes_received = 0
+
+    def record(self, step: str, seconds: float, error: Optional[str], size: int = 0):
+        self.steps.setdefault(step, LatencyHistogram()).record(seconds)
+        self.bytes_received += size
+        if error:
+            step_errors = self.errors.setdefault(step, {})
+            step_errors[error] = step_errors.get(error, 0) + 1
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = max((self.finished or time.monotonic()) - (self.started or time.monotonic()), 1e-9)
+        overall = LatencyHistogram()
+        steps = {}
+        for name, histogram in sorted(self.steps.items()):
+            overall.merge(histogram)
+            errors = sum(self.errors.get(name, {}).values())
+            steps[name] = dict(
+                histogram.summary(),
+                rps=round(histogram.count / elapsed, 2),
+                errors=errors,
+                error_rate=round(errors / histogram.count * 100, 2) if histogram.count else 0.0,
+            )
+        total_errors = sum(sum(e.values()) for e in self.errors.values())
+        return {
+            'duration_s': round(elapsed, 2),
+            'overall': dict(
+                overall.summary(),
+                rps=round(overall.count / elapsed, 2),
+                errors=total_errors,
+                error_rate=round(total_errors / overall.count * 100, 2) if overall.count else 0.0,
+                mb_received=round(self.bytes_received / 1e6, 2),
+            ),
+            'steps': steps,
+            'errors': self.errors,
+        }
+
+
+class Response:
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status: int, headers: List[Tuple[str, str]], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def header(self, name: str) -> Optional[str]:
+        name = name.lower()
+        return next((value for key, value in self.headers if key == name), None)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one server"""
+
+    def __init__(self, base_url: str, size: int = DEFAULT_POOL_SIZE, timeout: float = REQUEST_TIMEOUT):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or (443 if self.scheme == 'https' else 80)
+        self.host_header = parts.netloc or self.host
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._ssl = ssl.create_default_context() if self.scheme == 'https' else None
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.opened = 0
+
+    async def _connection(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self._ssl)
+
+    async def request(self, method: str, path: str, headers: Dict[str, str], body: bytes = b'') -> Response:
+        async with self._slots:
+            reader, writer = await self._connection()
+            try:
+                response, keep_alive = await asyncio.wait_for(
+                    self._exchange(reader, writer, method, path, headers, body), self.timeout
+                )
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return response
+
+    async def _exchange(self, reader, writer, method, path, headers, body):
+        lines = [f'{method} {self.prefix}{path} HTTP/1.1', f'Host: {self.host_header}',
+                 'Connection: keep-alive', 'User-Agent: mock-test-load/1.0', f'Content-Length: {len(body)}']
+        lines.extend(f'{name}: {value}' for name, value in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError('connection closed by server')
+        status = int(status_line.split(b' ', 2)[1])
+        response_headers = []
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers.append((name.strip().lower(), value.strip()))
+        response = Response(status, response_headers, b'')
+
+        keep_alive = (response.header('connection') or '').lower() != 'close'
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return response, keep_alive
+        if (response.header('transfer-encoding') or '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            response.body = b''.join(chunks)
+        elif response.header('content-length') is not None:
+            response.body = await reader.readexactly(int(response.header('content-length')))
+        else:
+            response.body = await reader.read()
+            keep_alive = False
+        return response, keep_alive
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+def _render(value: Any, context: Dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in context:
+            return context[value[1:-1]]
+        return value.format_map(context)
+    if isinstance(value, dict):
+        return {key: _render(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_render(item, context) for item in value]
+    return value
+
+
+def _multipart(fields: Dict[str, str], files: Dict[str, str]) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, path in files.items():
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            # Minimal PDF so the upload is still exercised without a sample file
+            content = b'%PDF-1.4\n1 0 obj<<>>endobj\ntrailer<<>>\n%%EOF\n'
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{os.path.basename(path)}"\r\nContent-Type: application/octet-stream\r\n\r\n'.encode()
+            + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class VirtualUser:
+    """One simulated student: own cookies and CSRF token, shared connection pool"""
+
+    def __init__(self, pool: ConnectionPool, stats: LoadStats, user: str, password: str):
+        self.pool = pool
+        self.stats = stats
+        self.cookies: Dict[str, str] = {}
+        self.context: Dict[str, Any] = {'user': user, 'password': password}
+        self.recording = False
+
+    async def step(self, step: Dict[str, Any]):
+        context = self.context
+        headers = {'Accept': 'text/html,application/json'}
+        body = b''
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+        csrf = self.cookies.get('csrftoken')
+        if step['method'] != 'GET' and csrf:
+            headers['X-CSRFToken'] = csrf
+            headers['Referer'] = f'{self.pool.scheme}://{self.pool.host_header}{step["path"]}'
+
+        if 'json' in step:
+            body = json.dumps(_render(step['json'], context)).encode()
+            headers['Content-Type'] = 'application/json'
+        elif 'files' in step:
+            fields = dict(_render(step.get('form', {}), context), csrfmiddlewaretoken=csrf or '')
+            body, headers['Content-Type'] = _multipart(fields, step['files'])
+        elif 'form' in step:
+            fields = dict(_render(step['form'], context), csrfmiddlewaretoken=csrf or '')
+            body = urlencode(fields).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        started = time.perf_counter()
+        error, size = None, 0
+        try:
+            response = await self.pool.request(step['method'], _render(step['path'], context), headers, body)
+            size = len(response.body)
+            for key, value in response.headers:
+                if key == 'set-cookie':
+                    for name, morsel in SimpleCookie(value).items():
+                        self.cookies[name] = morsel.value
+            if response.status >= 400:
+                error = f'HTTP {response.status}'
+        except asyncio.TimeoutError:
+            error = 'timeout'
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            error = type(e).__name__
+        if self.recording:
+            self.stats.record(step['name'], time.perf_counter() - started, error, size)
+
+    async def run_steps(self, steps: List[Dict[str, Any]]):
+        for step in steps:
+            for _ in range(step.get('repeat', 1)):
+                think = step.get('think')
+                if think:
+                    await asyncio.sleep(random.uniform(*think))
+                if 'answer' in step:
+                    # Simulate answering questions between saves
+                    self._answer(step['answer'])
+                self.context['seq'] += 1
+                await self.step(step)
+
+    def new_journey(self, questions: int = 30):
+        self.context.update(attempt=uuid.uuid4().hex, seq=0, answers=[None] * questions,
+                            question_index=0, selected_answer=None)
+
+    def _answer(self, count: int):
+        answers = self.context['answers']
+        for _ in range(count):
+            position = random.randrange(len(answers))
+            answers[position] = random.randrange(4)
+            self.context.update(question_index=position, selected_answer=answers[position])
+
+
+async def _user_loop(user: VirtualUser, login: List[Dict[str, Any]], journeys: Dict[str, Dict[str, Any]],
+                     deadline: float):
+    names = list(journeys)
+    weights = [journeys[name].get('weight', 1) for name in names]
+    user.new_journey()
+    await user.run_steps(login)
+    while time.monotonic() < deadline:
+        user.new_journey()
+        await user.run_steps(journeys[random.choices(names, weights)[0]]['steps'])
+
+
+async def run_load_test(base_url: str = DEFAULT_BASE_URL, users: int = 50, duration: float = 60,
+                        ramp: float = 10, warmup: float = 10, pool_size: int = DEFAULT_POOL_SIZE,
+                        credentials: List[Tuple[str, str]] = None, journeys: Dict[str, Dict[str, Any]] = None,
+                        login: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run the journeys against a server and return the load report
+
+    Virtual users start evenly over the warm-up and ramp phases; requests
+    finished during warm-up are not counted. The steady phase lasts
+    `duration` seconds after the ramp.
+    """
+    journeys = journeys or DEFAULT_JOURNEYS
+    login = DEFAULT_LOGIN if login is None else login
+    credentials = credentials or [('loadtest', 'loadtest')]
+    pool = ConnectionPool(base_url, pool_size)
+    stats = LoadStats()
+
+    start = time.monotonic()
+    record_from = start + warmup
+    deadline = record_from + ramp + duration
+    virtual_users = []
+    tasks = []
+    for n in range(users):
+        # Users arrive linearly over warm-up and ramp
+        delay = (warmup + ramp) * n / max(users, 1)
+        await asyncio.sleep(max(0.0, start + delay - time.monotonic()))
+        user_name, password = credentials[n % len(credentials)]
+        user = VirtualUser(pool, stats, user_name, password)
+        user.recording = time.monotonic() >= record_from
+        virtual_users.append(user)
+        tasks.append(asyncio.ensure_future(_user_loop(user, login, journeys, deadline)))
+        if user.recording and stats.started is None:
+            # Users arriving during the ramp are measured from the start
+            for earlier in virtual_users:
+                earlier.recording = True
+            stats.started = record_from
+
+    await asyncio.sleep(max(0.0, record_from - time.monotonic()))
+    stats.started = record_from
+    for user in virtual_users:
+        user.recording = True
+
+    await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+    stats.finished = time.monotonic()
+    for user in virtual_users:
+        user.recording = False
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    pool.close()
+
+    report = stats.report()
+    report.update(base_url=base_url, users=users, ramp_s=ramp, warmup_s=warmup, connections_opened=pool.opened)
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"Load test against {report['base_url']}: {report['users']} users, "
+        f"{report['warmup_s']}s warm-up, {report['ramp_s']}s ramp, {report['duration_s']}s measured, "
+        f"{report['connections_opened']} connections opened",
+        '',
+        f"{'step':<20}{'requests':>10}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>10}{'errors':>8}",
+    ]
+    rows = list(report['steps'].items()) + [('TOTAL', report['overall'])]
+    for name, row in rows:
+        lines.append(
+            f"{name:<20}{row['count']:>10}{row['rps']:>9.1f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+            f"{row['p99_ms']:>9.1f}{row['max_ms']:>10.1f}{row['errors']:>8}"
+        )
+    if report['errors']:
+        lines.extend(['', 'Errors:'])
+        for step, errors in sorted(report['errors'].items()):
+            for error, count in sorted(errors.items(), key=lambda item: -item[1]):
+                lines.append(f"  {step}: {error} x{count}")
+    return '\n'.join(lines)
+
+
+def read_credentials(path: str) -> List[Tuple[str, str]]:
+    """(user id, password) rows of a CSV file"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [(row[0], row[1]) for row in csv.reader(f) if len(row) >= 2 and not row[0].startswith('#')]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Load test the site with scripted user journeys')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    parser.add_argument('--users', type=int, default=50, help='Virtual users at full load')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds measured at full load')
+    parser.add_argument('--ramp', type=float, default=10, help='Seconds to ramp up to full load (measured)')
+    parser.add_argument('--warmup', type=float, default=10, help='Seconds of unmeasured warm-up')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE, help='Connections kept open')
+    parser.add_argument('--credentials', help='CSV file of user id,password rows')
+    parser.add_argument('--scenario', help='JSON file with "login" steps and "journeys"')
+    parser.add_argument('--journey', action='append', help='Only run these journeys')
+    parser.add_argument('--json', dest='json_path', help='Also write the report as JSON to this file')
+    args = parser.parse_args(argv)
+
+    journeys, login = DEFAULT_JOURNEYS, DEFAULT_LOGIN
+    if args.scenario:
+        with open(args.scenario, encoding='utf-8') as f:
+            scenario = json.load(f)
+        journeys = scenario.get('journeys', journeys)
+        login = scenario.get('login', login)
+    if args.journey:
+        unknown = set(args.journey) - set(journeys)
+        if unknown:
+            parser.error(f"Unknown journeys: {', '.join(sorted(unknown))}")
+        journeys = {name: journeys[name] for name in args.journey}
+
+    report = asyncio.run(run_load_test(
+        base_url=args.base_url, users=args.users, duration=args.duration, ramp=args.ramp,
+        warmup=args.warmup, pool_size=args.pool_size, journeys=journeys, login=login,
+        credentials=read_credentials(args.credentials) if args.credentials else None,
+    ))
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['overall']['count'] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
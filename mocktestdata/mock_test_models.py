@@ -216,6 +216,8 @@ class MockTestSchedule(models.Model):
             models.Index(fields=['test_type']),
             models.Index(fields=['next_run']),
             models.Index(fields=['is_active']),
+            # Due-schedule poll of the scheduler (is_active and next_run <= now)
+            models.Index(fields=['is_active', 'next_run']),
         ]
     
     def __str__(self):
@@ -238,6 +240,11 @@ class MockTestReport(models.Model):
         default='summary'
     )
     content = models.TextField()
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Hash of the report request and the results it was generated from"
+    )
     file_path = models.CharField(
         max_length=500,
         blank=True
@@ -259,6 +266,7 @@ class MockTestReport(models.Model):
         indexes = [
             models.Index(fields=['report_type']),
             models.Index(fields=['generated_at']),
+            models.Index(fields=['content_hash']),
         ]
     
     def __str__(self):
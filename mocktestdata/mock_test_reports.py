@@ -0,0 +1,321 @@
+"""
+Report Engine for Mock Test System
+Renders reports from compiled templates as a stream and stores them by content hash
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db.models import Count, Max
+from django.template import Context, Engine
+from django.utils import timezone
+
+from .mock_test_models import MockTestReport, MockTestResult
+from .mock_test_stats import type_summary
+
+# Directory generated reports are stored in, one file per content hash
+REPORTS_DIR = os.path.join(os.path.dirname(__file__), 'reports')
+
+# Results fetched and rendered per chunk of a detailed report
+REPORT_BATCH_SIZE = 500
+
+# Reports up to this size are also kept in MockTestReport.content
+INLINE_CONTENT_BYTES = 1024 * 1024
+
+# Characters read per chunk when serving a stored report
+READ_CHUNK_SIZE = 64 * 1024
+
+REPORT_TYPES = ('summary', 'detailed', 'comparison')
+
+_engine = Engine()
+
+SUMMARY_TEMPLATE = _engine.from_string('''
+# Mock Test Summary Report
+
+Generated on: {{ generated_on }}
+
+## Overview
+- Total Tests: {{ overall.total_tests }}
+- Successful Tests: {{ overall.successful_tests }}
+- Failed Tests: {{ overall.failed_tests }}
+- Success Rate: {{ overall.success_rate|floatformat:1 }}%
+
+## Test Results by Type
+{% for stats in by_type %}
+### {{ stats.title }}
+- Total: {{ stats.total }}
+- Successful: {{ stats.successful }}
+- Failed: {{ stats.failed }}
+- Success Rate: {{ stats.success_rate|floatformat:1 }}%
+{% endfor %}''')
+
+COMPARISON_TEMPLATE = _engine.from_string('''
+# Comparison Mock Test Report
+
+Generated on: {{ generated_on }}
+
+## Performance Comparison
+{% for stats in by_type %}
+### {{ stats.title }}
+- Average Execution Time: {{ stats.avg_execution_time|floatformat:2 }}s
+- Success Rate: {{ stats.success_rate|floatformat:1 }}%
+- Total Runs: {{ stats.total }}
+{% endfor %}''')
+
+DETAILED_HEADER_TEMPLATE = _engine.from_string('''
+# Detailed Mock Test Report
+
+Generated on: {{ generated_on }}
+
+## Detailed Results
+''')
+
+DETAILED_RESULTS_TEMPLATE = _engine.from_string('''{% for result in results %}
+### {{ result.title }} - {{ result.created_at }}
+- Status: {{ result.status }}
+- Message: {{ result.message }}
+- Execution Time: {{ result.execution_time|default:0|floatformat:2 }}s
+- Details:
+{% for detail in result.details %}  - {{ detail }}
+{% endfor %}{% endfor %}''')
+
+HTML_HEADER_TEMPLATE = _engine.from_string('''
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Mock Test Report</title>
+            <style>
+                body { font-family: Arial, sans-serif; margin: 20px; }
+                .header { background: #f4f4f4; padding: 20px; border-radius: 5px; }
+                .test-result { margin: 10px 0; padding: 15px; border: 1px solid #ddd; border-radius: 5px; }
+                .success { border-left: 4px solid #4CAF50; }
+                .error { border-left: 4px solid #f44336; }
+                .running { border-left: 4px solid #ff9800; }
+                .metrics { background: #f9f9f9; padding: 10px; border-radius: 3px; }
+            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h1>Mock Test Report</h1>
+                <p>Generated on: {{ generated_on }}</p>
+            </div>
+''')
+
+HTML_RESULTS_TEMPLATE = _engine.from_string('''{% for result in results %}
+            <div class="test-result {{ result.status|default:'unknown' }}">
+                <h3>{{ result.test_type|default:'Unknown Test' }}</h3>
+                <p><strong>Status:</strong> {{ result.status|default:'Unknown' }}</p>
+                <p><strong>Message:</strong> {{ result.message|default:'No message' }}</p>
+                <p><strong>Execution Time:</strong> {{ result.execution_time|default:0|floatformat:2 }}s</p>
+                <div class="metrics">
+                    <h4>Details:</h4>
+                    <ul>
+{% for key, value in result.details %}                        <li>{% if key %}<strong>{{ key }}:</strong> {% endif %}{{ value }}</li>
+{% endfor %}                    </ul>
+                </div>
+            </div>
+{% endfor %}''')
+
+HTML_FOOTER = '''
+        </body>
+        </html>
+'''
+
+
+def _title(test_type: str) -> str:
+    return test_type.replace('_', ' ').title()
+
+
+def _markdown(data: Dict[str, Any]) -> Context:
+    """Context for the markdown reports, which are plain text and not escaped"""
+    return Context(data, autoescape=False)
+
+
+def _generated_on() -> str:
+    return timezone.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _details_list(details) -> List[Any]:
+    """Details as a list, like MockTestResult.get_details_list"""
+    if isinstance(details, str):
+        try:
+            return json.loads(details)
+        except json.JSONDecodeError:
+            return []
+    return details or []
+
+
+def _ran_types(results) -> List[Dict[str, Any]]:
+    """Per-type statistics of the test types with results, in TEST_TYPES order"""
+    by_type = type_summary(results)[1]
+    return [
+        dict(stats, title=_title(test_type))
+        for test_type, stats in by_type.items() if stats['total'] > 0
+    ]
+
+
+def render_report(report_type: str, results) -> Iterator[str]:
+    """
+    Report text in chunks
+
+    Summary and comparison reports come from one GROUP BY query; detailed
+    reports render the results as they are fetched, REPORT_BATCH_SIZE at a
+    time, so the time taken grows linearly with the number of results.
+    """
+    if report_type == 'summary':
+        overall, _ = type_summary(results)
+        yield SUMMARY_TEMPLATE.render(_markdown({
+            'generated_on': _generated_on(), 'overall': overall, 'by_type': _ran_types(results)
+        }))
+    elif report_type == 'comparison':
+        yield COMPARISON_TEMPLATE.render(_markdown({
+            'generated_on': _generated_on(), 'by_type': _ran_types(results)
+        }))
+    elif report_type == 'detailed':
+        yield DETAILED_HEADER_TEMPLATE.render(_markdown({'generated_on': _generated_on()}))
+        rows = results.order_by('-created_at', '-id').values(
+            'test_type', 'status', 'message', 'execution_time', 'details', 'created_at'
+        ).iterator(chunk_size=REPORT_BATCH_SIZE)
+        batch = []
+        for row in rows:
+            row['title'] = _title(row['test_type'])
+            row['details'] = _details_list(row['details'])
+            row['created_at'] = row['created_at'].strftime('%Y-%m-%d %H:%M:%S')
+            batch.append(row)
+            if len(batch) >= REPORT_BATCH_SIZE:
+                yield DETAILED_RESULTS_TEMPLATE.render(_markdown({'results': batch}))
+                batch = []
+        if batch:
+            yield DETAILED_RESULTS_TEMPLATE.render(_markdown({'results': batch}))
+    else:
+        raise ValueError(f"Unknown report type: {report_type}")
+
+
+def render_html_report(test_results: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """HTML report of result dictionaries in chunks"""
+    yield HTML_HEADER_TEMPLATE.render(Context({'generated_on': _generated_on()}))
+    batch = []
+    for result in test_results:
+        details = result.get('details', [])
+        if isinstance(details, dict):
+            details = list(details.items())
+        elif isinstance(details, list):
+            details = [(None, detail) for detail in details]
+        else:
+            details = []
+        batch.append(dict(result, details=details))
+        if len(batch) >= REPORT_BATCH_SIZE:
+            yield HTML_RESULTS_TEMPLATE.render(Context({'results': batch}))
+            batch = []
+    if batch:
+        yield HTML_RESULTS_TEMPLATE.render(Context({'results': batch}))
+    yield HTML_FOOTER
+
+
+def report_results(test_types: Optional[List[str]] = None):
+    if test_types:
+        return MockTestResult.objects.filter(test_type__in=test_types)
+    return MockTestResult.objects.all()
+
+
+def content_hash(report_type: str, test_types: Optional[List[str]], results) -> str:
+    """
+    Hash of a report request and the state of the results it covers
+
+    The state is the count, highest id and latest update of the selected
+    results, so any new, changed or deleted result gives a new hash.
+    """
+    state = results.aggregate(count=Count('id'), last_id=Max('id'), last_update=Max('updated_at'))
+    key = json.dumps({
+        'report_type': report_type,
+        'test_types': sorted(set(test_types or [])),
+        'results': state,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def read_report(report: MockTestReport) -> Iterator[str]:
+    """Stored report text in chunks"""
+    if report.file_path and os.path.exists(report.file_path):
+        with open(report.file_path, encoding='utf-8') as f:
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    else:
+        yield report.content
+
+
+def stored_report(digest: str) -> Optional[MockTestReport]:
+    """Latest report stored under a content hash whose text is still available"""
+    for report in MockTestReport.objects.filter(content_hash=digest).order_by('-generated_at')[:5]:
+        if report.content or (report.file_path and os.path.exists(report.file_path)):
+            return report
+    return None
+
+
+class ReportBuild:
+    """
+    One report request, iterated for its text
+
+    If a report with the same content hash is stored, iterating serves
+    it; otherwise the report is rendered, written to REPORTS_DIR as it is
+    produced and recorded as a MockTestReport once complete (report is
+    set then). A build abandoned halfway leaves nothing behind.
+    """
+
+    def __init__(self, report_type: str, test_types: Optional[List[str]] = None):
+        if report_type not in REPORT_TYPES:
+            raise ValueError(f"Unknown report type: {report_type}")
+        self.report_type = report_type
+        self.test_types = test_types or []
+        self.results = report_results(self.test_types)
+        self.content_hash = content_hash(report_type, self.test_types, self.results)
+        self.report = stored_report(self.content_hash)
+        self.cached = self.report is not None
+
+    def __iter__(self) -> Iterator[str]:
+        if self.cached:
+            yield from read_report(self.report)
+            return
+
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+        path = os.path.join(REPORTS_DIR, f'{self.content_hash}.md')
+        partial = f'{path}.{os.getpid()}.part'
+        inline: Optional[List[str]] = []
+        size = 0
+        try:
+            with open(partial, 'w', encoding='utf-8') as f:
+                for chunk in render_report(self.report_type, self.results):
+                    f.write(chunk)
+                    size += len(chunk.encode('utf-8'))
+                    if inline is not None:
+                        if size <= INLINE_CONTENT_BYTES:
+                            inline.append(chunk)
+                        else:
+                            inline = None
+                    yield chunk
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        self.report = MockTestReport.objects.create(
+            name=f"Mock Test Report - {self.report_type.title()}",
+            report_type=self.report_type,
+            content=''.join(inline) if inline is not None else '',
+            content_hash=self.content_hash,
+            file_path=path,
+            file_size=size,
+        )
+
+
+def build_report(report_type: str, test_types: Optional[List[str]] = None) -> Tuple[MockTestReport, bool]:
+    """Stored or newly generated report; returns (report, served from the store)"""
+    build = ReportBuild(report_type, test_types)
+    for _ in build:
+        pass
+    return build.report, build.cached
@@ -0,0 +1,229 @@
+"""
+Retention for Mock Test System
+Batched pruning of old results and logs, archiving and incremental vacuum
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Iterable, Optional
+
+# Rows deleted per transaction
+DEFAULT_BATCH_SIZE = 1000
+
+# Seconds slept between batches, so live writers get the lock in between
+DEFAULT_PAUSE = 0.05
+
+# Free pages released per incremental_vacuum step
+VACUUM_STEP_PAGES = 1000
+
+# Database written by MockTestBackend
+BACKEND_DB_PATH = os.path.join(os.path.dirname(__file__), 'mock_test.db')
+
+# Django database aliases holding only mock test data, the ones vacuumed by prune_django
+MOCK_TEST_DATABASES = ('mock_test_db',)
+
+# (table, timestamp column) pruned in the backend database (see mock_test_store)
+SQLITE_TABLES = (
+    ('test_results', 'timestamp'),
+    ('test_logs', 'timestamp'),
+)
+
+
+class Archive:
+    """Pruned rows appended to one gzip-compressed JSONL file per table and run"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        self.paths: Dict[str, str] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, table: str, rows: Iterable[Dict[str, Any]]):
+        path = self.paths.setdefault(table, os.path.join(self.directory, f'{table}-{self.stamp}.jsonl.gz'))
+        with gzip.open(path, 'at', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str, ensure_ascii=False) + '\n')
+
+
+def sqlite_cutoff(days_to_keep: int) -> str:
+    """Cutoff in the format of SQLite's CURRENT_TIMESTAMP (UTC)"""
+    return (datetime.now(dt_timezone.utc) - timedelta(days=days_to_keep)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def ensure_timestamp_index(connection: sqlite3.Connection, table: str, column: str):
+    connection.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})')
+
+
+def prune_sqlite_table(connection: sqlite3.Connection, table: str, column: str, cutoff: str,
+                       batch_size: int = DEFAULT_BATCH_SIZE, pause: float = DEFAULT_PAUSE,
+                       archive: Optional[Archive] = None) -> int:
+    """
+    Delete rows older than cutoff, batch_size rows per transaction
+
+    The oldest rows go first through the timestamp index; each batch is
+    archived (if requested) and deleted in its own short transaction.
+
+    Returns:
+        Rows deleted
+    """
+    ensure_timestamp_index(connection, table, column)
+    deleted = 0
+    while True:
+        with connection:
+            cursor = connection.execute(
+                f'SELECT rowid AS _rowid, * FROM {table} WHERE {column} < ? ORDER BY {column} LIMIT ?',
+                (cutoff, batch_size)
+            )
+            columns = [description[0] for description in cursor.description]
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            if archive is not None:
+                archive.write(table, (dict(zip(columns[1:], row[1:])) for row in rows))
+            connection.executemany(f'DELETE FROM {table} WHERE rowid = ?', ((row[0],) for row in rows))
+        deleted += len(rows)
+        if len(rows) < batch_size:
+            break
+        time.sleep(pause)
+    return deleted
+
+
+def enable_incremental_vacuum(connection: sqlite3.Connection) -> bool:
+    """
+    Switch a database to auto_vacuum=INCREMENTAL
+
+    An existing database needs one full VACUUM for the switch; returns
+    True if that happened.
+    """
+    if connection.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        return False
+    connection.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    connection.execute('VACUUM')
+    return True
+
+
+def incremental_vacuum(connection: sqlite3.Connection, max_pages: int = None,
+                       pause: float = DEFAULT_PAUSE) -> int:
+    """
+    Return free pages to the filesystem, VACUUM_STEP_PAGES at a time
+
+    Returns:
+        Pages released
+    """
+    if connection.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+        return 0
+    free = connection.execute('PRAGMA freelist_count').fetchone()[0]
+    if max_pages is not None:
+        free = min(free, max_pages)
+    released = 0
+    while released < free:
+        step = min(VACUUM_STEP_PAGES, free - released)
+        connection.execute(f'PRAGMA incremental_vacuum({step})').fetchall()
+        released += step
+        if released < free:
+            time.sleep(pause)
+    return released
+
+
+def prune_sqlite(db_path: str, days_to_keep: int = 30, batch_size: int = DEFAULT_BATCH_SIZE,
+                 pause: float = DEFAULT_PAUSE, archive: Optional[Archive] = None,
+                 vacuum: bool = True, vacuum_pages: int = None,
+                 convert_auto_vacuum: bool = False) -> Dict[str, int]:
+    """
+    Prune the backend database's results and logs, then release the freed space
+
+    Space is only released from a database already in incremental
+    auto-vacuum mode, unless convert_auto_vacuum allows the one full
+    VACUUM that switches it.
+    """
+    connection = sqlite3.connect(db_path, timeout=30)
+    try:
+        connection.execute('PRAGMA journal_mode=WAL')
+        cutoff = sqlite_cutoff(days_to_keep)
+        counts = {}
+        existing = {name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table, column in SQLITE_TABLES:
+            if table in existing:
+                counts[table] = prune_sqlite_table(connection, table, column, cutoff, batch_size, pause, archive)
+        if vacuum:
+            if convert_auto_vacuum:
+                counts['vacuum_converted'] = int(enable_incremental_vacuum(connection))
+            counts['pages_released'] = incremental_vacuum(connection, vacuum_pages, pause)
+        return counts
+    finally:
+        connection.close()
+
+
+def prune_model(model, date_field: str, cutoff: datetime, batch_size: int = DEFAULT_BATCH_SIZE,
+                pause: float = DEFAULT_PAUSE, archive: Optional[Archive] = None) -> int:
+    """
+    Delete a Django model's rows older than cutoff, batch_size per transaction
+
+    Returns:
+        Rows deleted
+    """
+    from django.db import router, transaction
+
+    using = router.db_for_write(model)
+    old_rows = model.objects.using(using).filter(**{f'{date_field}__lt': cutoff}).order_by(date_field)
+    deleted = 0
+    while True:
+        with transaction.atomic(using=using):
+            if archive is not None:
+                rows = list(old_rows.values()[:batch_size])
+                pks = [row[model._meta.pk.attname] for row in rows]
+                archive.write(model._meta.db_table, rows)
+            else:
+                pks = list(old_rows.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            model.objects.using(using).filter(pk__in=pks).delete()
+        deleted += len(pks)
+        if len(pks) < batch_size:
+            break
+        time.sleep(pause)
+    return deleted
+
+
+def vacuum_django_databases(aliases: Iterable[str], max_pages: int = None, pause: float = DEFAULT_PAUSE,
+                            convert_auto_vacuum: bool = False) -> Dict[str, int]:
+    """Incrementally vacuum the SQLite databases among these Django connections"""
+    from django.db import connections
+
+    released = {}
+    for alias in aliases:
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        connection.ensure_connection()
+        raw = connection.connection
+        if convert_auto_vacuum:
+            enable_incremental_vacuum(raw)
+        released[alias] = incremental_vacuum(raw, max_pages, pause)
+    return released
+
+
+def prune_django(days_to_keep: int = 30, batch_size: int = DEFAULT_BATCH_SIZE, pause: float = DEFAULT_PAUSE,
+                 archive: Optional[Archive] = None, vacuum: bool = True,
+                 vacuum_pages: int = None, convert_auto_vacuum: bool = False) -> Dict[str, Any]:
+    """Prune MockTestLog and MockTestResult rows, then vacuum the mock test SQLite databases"""
+    from django.conf import settings
+    from django.utils import timezone
+    from .mock_test_models import MockTestLog, MockTestResult
+    from .mock_test_stats import invalidate_statistics
+
+    cutoff = timezone.now() - timedelta(days=days_to_keep)
+    counts: Dict[str, Any] = {
+        'mock_test_logs': prune_model(MockTestLog, 'created_at', cutoff, batch_size, pause, archive),
+        'mock_test_results': prune_model(MockTestResult, 'created_at', cutoff, batch_size, pause, archive),
+    }
+    invalidate_statistics()
+    if vacuum:
+        # The shared default database is never vacuumed from here
+        aliases = [alias for alias in MOCK_TEST_DATABASES if alias in settings.DATABASES]
+        counts['pages_released'] = vacuum_django_databases(aliases, vacuum_pages, pause, convert_auto_vacuum)
+    return counts
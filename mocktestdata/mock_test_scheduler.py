@@ -0,0 +1,180 @@
+"""
+Scheduler for Mock Test System
+Runs due MockTestSchedule entries in a bounded worker pool
+"""
+
+import calendar
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .mock_test_models import MockTestResult, MockTestSchedule
+from .mock_test_stats import invalidate_statistics
+
+# Seconds between polls for due schedules
+DEFAULT_POLL_INTERVAL = 30
+
+# Tests run at the same time by one scheduler
+DEFAULT_WORKERS = 2
+
+SCHEDULE_STEPS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+
+
+def _add_month(moment: datetime) -> datetime:
+    year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+    day = min(moment.day, calendar.monthrange(year, month)[1])
+    return moment.replace(year=year, month=month, day=day)
+
+
+def next_run_after(schedule_type: str, previous: datetime, now: datetime) -> Optional[datetime]:
+    """
+    Next run of a recurring schedule, None for one-off schedules
+
+    Runs missed while no scheduler was running are skipped rather than
+    caught up, so a stopped scheduler does not come back to a burst.
+    """
+    if schedule_type == 'monthly':
+        next_run = _add_month(previous)
+        while next_run <= now:
+            next_run = _add_month(next_run)
+        return next_run
+    step = SCHEDULE_STEPS.get(schedule_type)
+    if step is None:
+        return None
+    missed = max(0, (now - previous) // step)
+    return previous + step * (missed + 1)
+
+
+def due_schedules(now: datetime, limit: int) -> List[Tuple[int, str, str, datetime]]:
+    """(id, test_type, schedule_type, next_run) of due schedules, oldest first"""
+    return list(
+        MockTestSchedule.objects.filter(is_active=True, next_run__lte=now)
+        .order_by('next_run')
+        .values_list('id', 'test_type', 'schedule_type', 'next_run')[:limit]
+    )
+
+
+def claim(schedule_id: int, schedule_type: str, next_run: datetime, now: datetime) -> bool:
+    """
+    Claim one run of a schedule
+
+    The claim is a compare-and-set on next_run: it moves next_run forward
+    (or deactivates a one-off schedule) only if nobody changed it since it
+    was read, so of several schedulers seeing the same due run exactly one
+    gets to execute it.
+    """
+    following = next_run_after(schedule_type, next_run, now)
+    changes: Dict[str, Any] = {'updated_at': now}
+    if following is None:
+        changes['is_active'] = False
+    else:
+        changes['next_run'] = following
+    return MockTestSchedule.objects.filter(
+        id=schedule_id, is_active=True, next_run=next_run
+    ).update(**changes) == 1
+
+
+def record_result(test_type: str, result: Dict[str, Any]):
+    """Store a run's result like run_test does (one current result per test type)"""
+    test_result = MockTestResult.objects.filter(test_type=test_type).order_by('-created_at').first()
+    if test_result is None:
+        test_result = MockTestResult(test_type=test_type)
+    test_result.status = result['status']
+    test_result.message = result['message']
+    test_result.details = result.get('details', [])
+    test_result.execution_time = result.get('execution_time', 0)
+    test_result.metrics = result.get('metrics', {})
+    test_result.save()
+    invalidate_statistics()
+
+
+def run_scheduled_test(schedule_id: int, test_type: str) -> Dict[str, Any]:
+    """Run one claimed test in a worker thread and record its result"""
+    from .mock_test_backend import MockTestBackend
+
+    close_old_connections()
+    try:
+        try:
+            result = MockTestBackend().run_test(test_type)
+        except Exception as e:
+            result = {
+                'status': 'error',
+                'message': f'Scheduled test failed: {str(e)}',
+                'details': ['Error in test execution'],
+                'execution_time': 0
+            }
+        record_result(test_type, result)
+        return result
+    finally:
+        # Worker threads must not keep database connections open between runs
+        close_old_connections()
+
+
+class MockTestScheduler:
+    """Poll loop claiming due schedules and running them in a worker pool"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 log=print):
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.log = log
+        self._stop = threading.Event()
+        self._running = 0
+        self._running_lock = threading.Lock()
+
+    def stop(self, *args):
+        self._stop.set()
+
+    def _finished(self, future, schedule_id: int, test_type: str):
+        with self._running_lock:
+            self._running -= 1
+        try:
+            result = future.result()
+            self.log(f"Schedule {schedule_id}: {test_type} {result['status']} - {result['message']}")
+        except Exception as e:
+            self.log(f"Schedule {schedule_id}: {test_type} could not be recorded - {str(e)}")
+
+    def poll(self, executor: ThreadPoolExecutor) -> int:
+        """Claim and start as many due runs as there are free workers; returns how many started"""
+        with self._running_lock:
+            free = self.workers - self._running
+        if free <= 0:
+            return 0
+
+        started = 0
+        now = timezone.now()
+        for schedule_id, test_type, schedule_type, next_run in due_schedules(now, free):
+            if not claim(schedule_id, schedule_type, next_run, now):
+                continue  # Another scheduler got it
+            with self._running_lock:
+                self._running += 1
+            future = executor.submit(run_scheduled_test, schedule_id, test_type)
+            future.add_done_callback(lambda f, s=schedule_id, t=test_type: self._finished(f, s, t))
+            started += 1
+        return started
+
+    def run(self, once: bool = False):
+        """Poll until stopped (SIGINT/SIGTERM), or one pass with once=True; waits for running tests"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='mock-test-scheduler') as executor:
+            while not self._stop.is_set():
+                try:
+                    self.poll(executor)
+                except Exception as e:
+                    self.log(f"Scheduler poll failed: {str(e)}")
+                finally:
+                    close_old_connections()
+                if once:
+                    break
+                self._stop.wait(self.poll_interval)
@@ -0,0 +1,168 @@
+"""
+Statistics Service for Mock Test System
+Per-type and overall result statistics from one GROUP BY query
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import Avg, Count, F, Max, Q, Window
+from django.db.models.functions import RowNumber
+
+from .mock_test_models import MockTestResult
+
+# Results listed under recent activity
+RECENT_ACTIVITY_LIMIT = 10
+
+
+def _rate(part: int, total: int) -> float:
+    return (part / total * 100) if total > 0 else 0
+
+
+def type_summary(results=None) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Overall and per-type counts in one conditional-aggregation query
+
+    Args:
+        results: MockTestResult queryset to summarize, all results by default
+
+    Returns:
+        (overall, by_type); every test type is present, with zero counts if it never ran
+    """
+    if results is None:
+        results = MockTestResult.objects.all()
+    rows = (
+        results.order_by()
+        .values('test_type')
+        .annotate(
+            total=Count('id'),
+            successful=Count('id', filter=Q(status='success')),
+            failed=Count('id', filter=Q(status='error')),
+            running=Count('id', filter=Q(status='running')),
+            timed=Count('execution_time'),
+            avg_execution_time=Avg('execution_time'),
+            last_run=Max('created_at'),
+        )
+    )
+    by_row = {row['test_type']: row for row in rows}
+
+    by_type = {}
+    overall = {'total_tests': 0, 'successful_tests': 0, 'failed_tests': 0, 'running_tests': 0}
+    timed = time_sum = 0
+    for test_type, _ in MockTestResult.TEST_TYPES:
+        row = by_row.get(test_type) or {}
+        total, successful = row.get('total', 0), row.get('successful', 0)
+        by_type[test_type] = {
+            'total': total,
+            'successful': successful,
+            'failed': row.get('failed', 0),
+            'success_rate': _rate(successful, total),
+            'avg_execution_time': row.get('avg_execution_time') or 0,
+            'last_run': row.get('last_run'),
+        }
+    for row in by_row.values():
+        overall['total_tests'] += row['total']
+        overall['successful_tests'] += row['successful']
+        overall['failed_tests'] += row['failed']
+        overall['running_tests'] += row['running']
+        timed += row['timed']
+        time_sum += (row['avg_execution_time'] or 0) * row['timed']
+    overall['success_rate'] = _rate(overall['successful_tests'], overall['total_tests'])
+    overall['avg_execution_time'] = (time_sum / timed) if timed > 0 else 0
+    return overall, by_type
+
+
+def latest_results() -> Dict[str, MockTestResult]:
+    """Most recent result of each test type, from one window query"""
+    ranked = MockTestResult.objects.annotate(
+        rank=Window(RowNumber(), partition_by=[F('test_type')], order_by=[F('created_at').desc(), F('id').desc()])
+    ).filter(rank=1)
+    return {result.test_type: result for result in ranked}
+
+
+def recent_activity(limit: int = RECENT_ACTIVITY_LIMIT) -> List[Dict[str, Any]]:
+    results = MockTestResult.objects.order_by('-created_at').values(
+        'test_type', 'status', 'execution_time', 'created_at'
+    )[:limit]
+    return [dict(result, created_at=result['created_at'].isoformat()) for result in results]
+
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Tuple[Tuple[Any, int], Any]] = {}
+
+
+def results_version() -> Tuple[Any, int]:
+    """
+    Stamp that changes whenever results are written or deleted
+
+    Any saved result moves the latest updated_at and any delete changes
+    the count, whichever process (web worker, scheduler, prune command)
+    made the change.
+    """
+    stamp = MockTestResult.objects.order_by().aggregate(latest=Max('updated_at'), count=Count('id'))
+    return stamp['latest'], stamp['count']
+
+
+def _cached(name: str, build):
+    """Value of build(), rebuilt when the results changed since it was cached"""
+    version = results_version()
+    cached = _cache.get(name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    value = build()
+    with _cache_lock:
+        _cache[name] = (version, value)
+    return value
+
+
+def _build_statistics() -> Dict[str, Any]:
+    overall, by_type = type_summary()
+    for stats in by_type.values():
+        stats.pop('last_run')
+    return {
+        'overall': overall,
+        'by_type': by_type,
+        'recent_activity': recent_activity(),
+    }
+
+
+def _build_status() -> Dict[str, Dict[str, Optional[str]]]:
+    latest = latest_results()
+    status_data = {}
+    for test_type, _ in MockTestResult.TEST_TYPES:
+        latest_result = latest.get(test_type)
+        status_data[test_type] = {
+            'status': latest_result.status if latest_result else 'never_run',
+            'last_run': latest_result.created_at.isoformat() if latest_result else None,
+            'message': latest_result.message if latest_result else 'No previous runs'
+        }
+    return status_data
+
+
+def get_test_statistics() -> Dict[str, Any]:
+    """Overall and per-type statistics plus recent activity (two queries, cached per results version)"""
+    return _cached('statistics', _build_statistics)
+
+
+def get_test_status() -> Dict[str, Dict[str, Optional[str]]]:
+    """Status of the latest run of each test type (one query, cached per results version)"""
+    return _cached('status', _build_status)
+
+
+def get_dashboard_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-type totals and last run time for the dashboard (one query, cached per results version)"""
+    return _cached('dashboard', lambda: {
+        test_type: {
+            'total': stats['total'],
+            'successful': stats['successful'],
+            'failed': stats['failed'],
+            'last_run': stats['last_run'],
+        }
+        for test_type, stats in type_summary()[1].items()
+    })
+
+
+def invalidate_statistics():
+    """Drop this process's cached statistics; other processes notice the change through results_version()"""
+    with _cache_lock:
+        _cache.clear()
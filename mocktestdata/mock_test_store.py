@@ -0,0 +1,221 @@
+"""
+Buffered SQLite Store for Mock Test System
+One connection per process and database file, batched log/result writes
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Records buffered before a flush is triggered
+FLUSH_BATCH_SIZE = 200
+
+# Seconds between background flushes of a partly filled buffer
+FLUSH_INTERVAL = 1.0
+
+# Records held at most; writers flush themselves when the buffer is full
+MAX_PENDING_RECORDS = 10000
+
+# Milliseconds a statement waits on another process's write lock
+BUSY_TIMEOUT_MS = 5000
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS test_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        test_type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        message TEXT,
+        details TEXT,
+        execution_time REAL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_test_results_timestamp ON test_results (timestamp);
+    CREATE TABLE IF NOT EXISTS test_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        test_type TEXT NOT NULL,
+        log_level TEXT NOT NULL,
+        message TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_test_logs_timestamp ON test_logs (timestamp);
+'''
+
+INSERTS = {
+    'test_logs': '''
+        INSERT INTO test_logs (test_type, log_level, message, timestamp)
+        VALUES (?, ?, ?, ?)
+    ''',
+    'test_results': '''
+        INSERT INTO test_results (test_type, status, message, details, execution_time, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''',
+}
+
+
+def _utc_timestamp() -> str:
+    """Current time in the format of SQLite's CURRENT_TIMESTAMP"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+
+class MockTestStore:
+    """
+    Shared connection to a mock test database
+
+    Log lines and test results are queued and written by a background
+    thread in one executemany transaction per table, every FLUSH_INTERVAL
+    seconds or once FLUSH_BATCH_SIZE records are pending. The database runs
+    in WAL mode with synchronous=NORMAL, so readers never block the writer
+    and a commit does not wait for an fsync. Reads flush first, so they see
+    everything written before them.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._pending: 'queue.Queue[Tuple[str, tuple]]' = queue.Queue(maxsize=MAX_PENDING_RECORDS)
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._flusher = None
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection inherited through fork is not usable in the child
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False, isolation_level=None
+            )
+            # Only takes effect on a new database; prune_mock_test_data --convert-auto-vacuum converts existing ones
+            connection.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+            connection.executescript(SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _start_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._run, name='mock-test-store-flusher', daemon=True)
+            self._flusher.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Mock test store flush error: {str(e)}")
+
+    def initialize(self):
+        """Open the connection and create the tables"""
+        with self._lock:
+            self._connect()
+
+    def add(self, table: str, row: Sequence[Any]):
+        """Queue a row for one of the INSERTS tables"""
+        record = (table, tuple(row))
+        try:
+            self._pending.put_nowait(record)
+        except queue.Full:
+            # Buffer full: write it out here rather than drop records
+            self.flush()
+            self._pending.put(record)
+        if self._pending.qsize() >= FLUSH_BATCH_SIZE:
+            self._wakeup.set()
+        self._start_flusher()
+
+    def log(self, test_type: str, level: str, message: str):
+        self.add('test_logs', (test_type, level, message, _utc_timestamp()))
+
+    def add_result(self, test_type: str, status: str, message: str, details: str, execution_time: float):
+        self.add('test_results', (test_type, status, message, details, execution_time, _utc_timestamp()))
+
+    def flush(self) -> int:
+        """Write all queued records; returns how many were written"""
+        with self._lock:
+            batches: Dict[str, List[tuple]] = {}
+            while True:
+                try:
+                    table, row = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+                batches.setdefault(table, []).append(row)
+            if not batches:
+                return 0
+
+            connection = self._connect()
+            connection.execute('BEGIN')
+            try:
+                for table, rows in batches.items():
+                    connection.executemany(INSERTS[table], rows)
+                connection.execute('COMMIT')
+            except sqlite3.Error:
+                connection.execute('ROLLBACK')
+                raise
+            return sum(len(rows) for rows in batches.values())
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> Tuple[List[str], List[tuple]]:
+        """Run a read after flushing; returns (column names, rows)"""
+        with self._lock:
+            self.flush()
+            cursor = self._connect().execute(sql, params)
+            columns = [description[0] for description in cursor.description or ()]
+            return columns, cursor.fetchall()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Run a write statement in its own transaction after flushing; returns the rows changed"""
+        with self._lock:
+            self.flush()
+            connection = self._connect()
+            connection.execute('BEGIN')
+            try:
+                changed = connection.execute(sql, params).rowcount
+                connection.execute('COMMIT')
+            except sqlite3.Error:
+                connection.execute('ROLLBACK')
+                raise
+            return changed
+
+    def close(self):
+        """Flush and close the connection (registered to run at exit)"""
+        self._closed = True
+        self._wakeup.set()
+        with self._lock:
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Mock test store flush error: {str(e)}")
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+_stores_lock = threading.Lock()
+_stores: Dict[str, MockTestStore] = {}
+
+
+def get_store(db_path: str) -> MockTestStore:
+    """Process-wide store of a database file, created and initialized on first use"""
+    db_path = os.path.abspath(db_path)
+    store = _stores.get(db_path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(db_path)
+            if store is None:
+                store = MockTestStore(db_path)
+                store.initialize()
+                _stores[db_path] = store
+    return store
+
+
+@atexit.register
+def _flush_stores():
+    for store in list(_stores.values()):
+        store.close()
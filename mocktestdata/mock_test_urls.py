@@ -23,6 +23,9 @@ urlpatterns = [
     path('logs/', mock_test_views.get_test_logs, name='get_test_logs'),
     path('logs/<str:test_type>/', mock_test_views.get_test_logs, name='get_test_logs_by_type'),
     
+    # Export
+    path('export/<str:kind>/', mock_test_views.export_test_data, name='export_test_data'),
+    
     # Test Configuration
     path('config/', mock_test_views.test_configuration, name='test_configuration'),
     
@@ -31,12 +34,15 @@ urlpatterns = [
     
     # Report Generation
     path('report/', mock_test_views.generate_report, name='generate_report'),
+    path('report/stream/', mock_test_views.stream_report, name='stream_report'),
+    path('report/<int:report_id>/', mock_test_views.download_report, name='download_report'),
     
     # Test Scheduling
     path('schedule/', mock_test_views.schedule_test, name='schedule_test'),
     
     # Test Status
     path('status/', mock_test_views.mock_test_status, name='mock_test_status'),
+    path('health/', mock_test_views.system_health, name='system_health'),
     
     # Clear Results
     path('clear/', mock_test_views.clear_test_results, name='clear_test_results'),
@@ -5,10 +5,9 @@ Helper functions and utilities for testing
 
 import os
 import json
-import time
 import random
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Any, Optional
 import django.db.models
 
@@ -243,61 +242,9 @@ def generate_test_report(test_results: List[Dict[str, Any]], report_format: str
         return output.getvalue()
     
     elif report_format == 'html':
-        html_content = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Mock Test Report</title>
-            <style>
-                body { font-family: Arial, sans-serif; margin: 20px; }
-                .header { background: #f4f4f4; padding: 20px; border-radius: 5px; }
-                .test-result { margin: 10px 0; padding: 15px; border: 1px solid #ddd; border-radius: 5px; }
-                .success { border-left: 4px solid #4CAF50; }
-                .error { border-left: 4px solid #f44336; }
-                .running { border-left: 4px solid #ff9800; }
-                .metrics { background: #f9f9f9; padding: 10px; border-radius: 3px; }
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Mock Test Report</h1>
-                <p>Generated on: {}</p>
-            </div>
-        """.format(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        from .mock_test_reports import render_html_report
         
-        for result in test_results:
-            status_class = result.get('status', 'unknown')
-            html_content += f"""
-            <div class="test-result {status_class}">
-                <h3>{result.get('test_type', 'Unknown Test')}</h3>
-                <p><strong>Status:</strong> {result.get('status', 'Unknown')}</p>
-                <p><strong>Message:</strong> {result.get('message', 'No message')}</p>
-                <p><strong>Execution Time:</strong> {result.get('execution_time', 0):.2f}s</p>
-                <div class="metrics">
-                    <h4>Details:</h4>
-                    <ul>
-        """
-            
-            details = result.get('details', [])
-            if isinstance(details, list):
-                for detail in details:
-                    html_content += f"                        <li>{detail}</li>\n"
-            elif isinstance(details, dict):
-                for key, value in details.items():
-                    html_content += f"                        <li><strong>{key}:</strong> {value}</li>\n"
-            
-            html_content += """
-                    </ul>
-                </div>
-            </div>
-        """
-        
-        html_content += """
-        </body>
-        </html>
-        """
-        
-        return html_content
+        return ''.join(render_html_report(test_results))
     
     else:
         return json.dumps({'error': 'Unsupported report format'})
@@ -339,25 +286,16 @@ def validate_test_configuration(config: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def cleanup_old_test_data(db_path: str, days_to_keep: int = 30) -> bool:
-    """Clean up old test data"""
+def cleanup_old_test_data(db_path: str, days_to_keep: int = 30, archive_dir: str = None) -> bool:
+    """Clean up old test data in batches, archiving it first if archive_dir is given"""
+    from .mock_test_retention import Archive, prune_sqlite
+
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Calculate cutoff date
-        cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-        
-        # Delete old test results
-        cursor.execute('DELETE FROM test_results WHERE timestamp < ?', (cutoff_date,))
-        
-        # Delete old test logs
-        cursor.execute('DELETE FROM test_logs WHERE timestamp < ?', (cutoff_date,))
-        
-        conn.commit()
-        conn.close()
+        archive = Archive(archive_dir) if archive_dir else None
+        counts = prune_sqlite(db_path, days_to_keep, archive=archive)
         
-        print(f"Cleaned up test data older than {days_to_keep} days")
+        print(f"Cleaned up test data older than {days_to_keep} days "
+              f"({counts.get('test_results', 0)} results, {counts.get('test_logs', 0)} logs)")
         return True
         
     except Exception as e:
@@ -366,30 +304,14 @@ def cleanup_old_test_data(db_path: str, days_to_keep: int = 30) -> bool:
 
 
 def export_test_data(db_path: str, export_path: str, test_type: str = None) -> bool:
-    """Export test data to file"""
+    """Export test results to a JSONL or CSV file (.gz compressed), streamed in batches"""
+    from .mock_test_export import export_to_file, sqlite_rows
+
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        if test_type:
-            cursor.execute('SELECT * FROM test_results WHERE test_type = ? ORDER BY timestamp DESC', (test_type,))
-        else:
-            cursor.execute('SELECT * FROM test_results ORDER BY timestamp DESC')
-        
-        results = cursor.fetchall()
-        conn.close()
+        columns, rows = sqlite_rows(db_path, 'results', test_type=test_type)
+        count = export_to_file(columns, rows, export_path)
         
-        # Convert to DataFrame-like structure
-        columns = [description[0][0] for description in cursor.description]
-        data = []
-        for row in results:
-            data.append(dict(zip(columns, row)))
-        
-        # Export to JSON
-        with open(export_path, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
-        
-        print(f"Exported {len(data)} test records to {export_path}")
+        print(f"Exported {count} test records to {export_path}")
         return True
         
     except Exception as e:
@@ -398,37 +320,11 @@ def export_test_data(db_path: str, export_path: str, test_type: str = None) -> b
 
 
 def get_system_health() -> Dict[str, Any]:
-    """Get system health status"""
+    """Get system health status (latest background sample with trends, see mock_test_health)"""
     try:
-        import psutil
-        
-        # CPU usage
-        cpu_percent = psutil.cpu_percent(interval=1)
-        
-        # Memory usage
-        memory = psutil.virtual_memory()
-        memory_percent = memory.percent
-        
-        # Disk usage
-        disk = psutil.disk_usage('/')
-        disk_percent = disk.percent
+        from .mock_test_health import current_health
         
-        # Network status
-        network = psutil.net_io_counters()
-        
-        health_status = {
-            'status': 'healthy' if cpu_percent < 80 and memory_percent < 80 and disk_percent < 90 else 'warning',
-            'cpu_usage': cpu_percent,
-            'memory_usage': memory_percent,
-            'disk_usage': disk_percent,
-            'network_io': {
-                'bytes_sent': network.bytes_sent,
-                'bytes_recv': network.bytes_recv
-            },
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        return health_status
+        return current_health()
         
     except ImportError:
         return {
@@ -438,57 +334,31 @@ def get_system_health() -> Dict[str, Any]:
         }
 
 
-def simulate_load_test(duration: int = 60, concurrent_users: int = 100) -> Dict[str, Any]:
-    """Simulate load test for testing purposes"""
-    import threading
-    import queue
-    import random
-    
-    results = queue.Queue()
-    threads = []
-    
-    def worker():
-        """Simulate user requests"""
-        start_time = time.time()
-        requests_made = 0
-        
-        while time.time() - start_time < duration:
-            # Simulate random response time
-            response_time = random.uniform(0.1, 2.0)
-            time.sleep(response_time)
-            requests_made += 1
-        
-        results.put({
-            'thread_id': threading.current_thread().ident,
-            'requests_made': requests_made,
-            'duration': time.time() - start_time,
-            'avg_response_time': random.uniform(0.1, 2.0)
-        })
-    
-    # Start worker threads
-    for i in range(concurrent_users):
-        thread = threading.Thread(target=worker)
-        threads.append(thread)
-        thread.start()
-    
-    # Wait for all threads to complete
-    for thread in threads:
-        thread.join()
-    
-    # Collect results
-    all_results = []
-    while not results.empty():
-        all_results.append(results.get())
+def simulate_load_test(duration: int = 60, concurrent_users: int = 100,
+                       base_url: str = 'http://127.0.0.1:8000') -> Dict[str, Any]:
+    """Run a load test against a running server (see mock_test_load)"""
+    import asyncio
+    from .mock_test_load import run_load_test
     
-    # Calculate statistics
-    total_requests = sum(r['requests_made'] for r in all_results)
-    avg_response_time = sum(r['avg_response_time'] for r in all_results) / len(all_results)
+    report = asyncio.run(run_load_test(
+        base_url=base_url,
+        users=concurrent_users,
+        duration=duration,
+        ramp=min(10, duration / 4),
+        warmup=min(10, duration / 4)
+    ))
+    overall = report['overall']
     
     return {
         'concurrent_users': concurrent_users,
-        'duration': duration,
-        'total_requests': total_requests,
-        'requests_per_second': total_requests / duration,
-        'avg_response_time': avg_response_time,
-        'thread_results': all_results
+        'duration': report['duration_s'],
+        'total_requests': overall['count'],
+        'requests_per_second': overall['rps'],
+        'avg_response_time': overall['mean_ms'] / 1000,
+        'p50_ms': overall['p50_ms'],
+        'p95_ms': overall['p95_ms'],
+        'p99_ms': overall['p99_ms'],
+        'error_rate': overall['error_rate'],
+        'steps': report['steps'],
+        'errors': report['errors']
     }
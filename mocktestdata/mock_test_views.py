@@ -5,14 +5,18 @@ API endpoints for running and managing mock tests
 
 import json
 import time
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.shortcuts import render
-from django.utils import timezone
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from django.db.models import Q
 from .mock_test_models import MockTestResult, MockTestLog, MockTestConfiguration, MockTestSchedule, MockTestReport
 from .mock_test_backend import MockTestBackend
+from .mock_test_export import FORMATS, ExportError, export_filename, export_stream, model_rows, parse_bound
+from .mock_test_reports import REPORT_TYPES, ReportBuild, build_report, read_report
+from .mock_test_stats import get_dashboard_stats, get_test_status, get_test_statistics as compute_test_statistics, invalidate_statistics
+from .mock_test_utils import get_system_health
 
 
 def mock_test_dashboard(request):
@@ -21,15 +25,7 @@ def mock_test_dashboard(request):
     recent_results = MockTestResult.objects.order_by('-created_at')[:10]
     
     # Get test statistics
-    test_stats = {}
-    for test_type, _ in MockTestResult.TEST_TYPES:
-        results = MockTestResult.objects.filter(test_type=test_type)
-        test_stats[test_type] = {
-            'total': results.count(),
-            'successful': results.filter(status='success').count(),
-            'failed': results.filter(status='error').count(),
-            'last_run': results.first().created_at if results.exists() else None
-        }
+    test_stats = get_dashboard_stats()
     
     context = {
         'recent_results': recent_results,
@@ -68,28 +64,11 @@ def run_test(request, test_type):
         test_result.message = f'{test_type.replace("_", " ").title()} test is running...'
         test_result.execution_time = 0
         test_result.save()
+    invalidate_statistics()
     
     try:
         # Run the appropriate test
-        if test_type == 'resume_analysis':
-            result = backend.test_resume_analysis()
-        elif test_type == 'ai_model':
-            result = backend.test_ai_model()
-        elif test_type == 'database':
-            result = backend.test_database()
-        elif test_type == 'api':
-            result = backend.test_api()
-        elif test_type == 'performance':
-            result = backend.test_performance()
-        elif test_type == 'security':
-            result = backend.test_security()
-        else:
-            result = {
-                'status': 'error',
-                'message': f'Unknown test type: {test_type}',
-                'details': ['Test type not implemented'],
-                'execution_time': 0
-            }
+        result = backend.run_test(test_type)
         
         # Update test result
         test_result.status = result['status']
@@ -98,6 +77,7 @@ def run_test(request, test_type):
         test_result.execution_time = result.get('execution_time', 0)
         test_result.metrics = result.get('metrics', {})
         test_result.save()
+        invalidate_statistics()
         
         return JsonResponse(result)
         
@@ -108,6 +88,7 @@ def run_test(request, test_type):
         test_result.details = ['Error in test execution']
         test_result.execution_time = time.time() - time.time()
         test_result.save()
+        invalidate_statistics()
         
         return JsonResponse({
             'status': 'error',
@@ -168,6 +149,7 @@ def clear_test_results(request):
         else:
             MockTestResult.objects.all().delete()
             message = 'Cleared all test results'
+        invalidate_statistics()
         
         return JsonResponse({
             'status': 'success',
@@ -219,6 +201,35 @@ def get_test_logs(request):
     })
 
 
+@require_http_methods(["GET"])
+def export_test_data(request, kind):
+    """Stream results or logs as a JSONL or CSV download"""
+    fmt = request.GET.get('format', 'jsonl')
+    compress = request.GET.get('gzip') in ('1', 'true')
+    try:
+        if fmt not in FORMATS:
+            raise ExportError(f"Unknown format: {fmt}")
+        columns, rows = model_rows(
+            kind,
+            test_type=request.GET.get('test_type'),
+            since=parse_bound(request.GET.get('since')),
+            until=parse_bound(request.GET.get('until'), end=True),
+        )
+    except ExportError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+    
+    # Rows are read and encoded batch by batch while the response is sent
+    response = StreamingHttpResponse(
+        export_stream(columns, rows, fmt, compress),
+        content_type='application/gzip' if compress else FORMATS[fmt]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(kind, fmt, compress)}"'
+    return response
+
+
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
 def test_configuration(request):
@@ -281,46 +292,8 @@ def test_configuration(request):
 @require_http_methods(["GET"])
 def get_test_statistics(request):
     """Get comprehensive test statistics"""
-    # Get overall statistics
-    total_tests = MockTestResult.objects.count()
-    successful_tests = MockTestResult.objects.filter(status='success').count()
-    failed_tests = MockTestResult.objects.filter(status='error').count()
-    running_tests = MockTestResult.objects.filter(status='running').count()
-    
-    # Get statistics by test type
-    type_stats = {}
-    for test_type, _ in MockTestResult.TEST_TYPES:
-        results = MockTestResult.objects.filter(test_type=test_type)
-        type_stats[test_type] = {
-            'total': results.count(),
-            'successful': results.filter(status='success').count(),
-            'failed': results.filter(status='error').count(),
-            'success_rate': (results.filter(status='success').count() / results.count() * 100) if results.count() > 0 else 0,
-            'avg_execution_time': results.aggregate(models.Avg('execution_time'))['execution_time__avg'] or 0
-        }
-    
-    # Get recent activity
-    recent_results = MockTestResult.objects.order_by('-created_at')[:10]
-    recent_activity = []
-    for result in recent_results:
-        recent_activity.append({
-            'test_type': result.test_type,
-            'status': result.status,
-            'execution_time': result.execution_time,
-            'created_at': result.created_at.isoformat()
-        })
-    
-    statistics = {
-        'overall': {
-            'total_tests': total_tests,
-            'successful_tests': successful_tests,
-            'failed_tests': failed_tests,
-            'running_tests': running_tests,
-            'success_rate': (successful_tests / total_tests * 100) if total_tests > 0 else 0
-        },
-        'by_type': type_stats,
-        'recent_activity': recent_activity
-    }
+    # One GROUP BY for the overall and per-type counts, one query for recent activity
+    statistics = compute_test_statistics()
     
     return JsonResponse({
         'status': 'success',
@@ -331,40 +304,28 @@ def get_test_statistics(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def generate_report(request):
-    """Generate test report"""
+    """Generate test report, or return the stored one if nothing changed since"""
     try:
         data = json.loads(request.body)
         report_type = data.get('report_type', 'summary')
         test_types = data.get('test_types', [])
         
-        # Get test results
-        if test_types:
-            results = MockTestResult.objects.filter(test_type__in=test_types)
-        else:
-            results = MockTestResult.objects.all()
-        
-        # Generate report content
-        if report_type == 'summary':
-            report_content = generate_summary_report(results)
-        elif report_type == 'detailed':
-            report_content = generate_detailed_report(results)
-        elif report_type == 'comparison':
-            report_content = generate_comparison_report(results)
-        else:
-            report_content = 'Invalid report type'
+        if report_type not in REPORT_TYPES:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'Invalid report type'
+            }, status=400)
         
-        # Save report
-        report = MockTestReport.objects.create(
-            name=f"Mock Test Report - {report_type.title()}",
-            report_type=report_type,
-            content=report_content
-        )
+        report, cached = build_report(report_type, test_types)
         
         return JsonResponse({
             'status': 'success',
-            'message': 'Report generated successfully',
+            'message': 'Report served from cache' if cached else 'Report generated successfully',
             'report_id': report.id,
-            'report_content': report_content
+            'cached': cached,
+            # Large reports are only kept as files; fetch them from download_url
+            'report_content': report.content,
+            'download_url': reverse('mock_test:download_report', args=[report.id])
         })
         
     except Exception as e:
@@ -374,88 +335,30 @@ def generate_report(request):
         }, status=500)
 
 
-def generate_summary_report(results):
-    """Generate summary report content"""
-    total_tests = results.count()
-    successful_tests = results.filter(status='success').count()
-    failed_tests = results.filter(status='error').count()
-    
-    content = f"""
-# Mock Test Summary Report
-
-Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## Overview
-- Total Tests: {total_tests}
-- Successful Tests: {successful_tests}
-- Failed Tests: {failed_tests}
-- Success Rate: {(successful_tests / total_tests * 100):.1f}%
-
-## Test Results by Type
-"""
-    
-    for test_type, _ in MockTestResult.TEST_TYPES:
-        type_results = results.filter(test_type=test_type)
-        if type_results.exists():
-            content += f"""
-### {test_type.replace('_', ' ').title()}
-- Total: {type_results.count()}
-- Successful: {type_results.filter(status='success').count()}
-- Failed: {type_results.filter(status='error').count()}
-- Success Rate: {(type_results.filter(status='success').count() / type_results.count() * 100):.1f}%
-"""
-    
-    return content
-
-
-def generate_detailed_report(results):
-    """Generate detailed report content"""
-    content = f"""
-# Detailed Mock Test Report
-
-Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## Detailed Results
-"""
-    
-    for result in results.order_by('-created_at'):
-        content += f"""
-### {result.test_type.replace('_', ' ').title()} - {result.created_at.strftime('%Y-%m-%d %H:%M:%S')}
-- Status: {result.status}
-- Message: {result.message}
-- Execution Time: {result.execution_time:.2f}s
-- Details:
-{chr(10).join(f"  - {detail}" for detail in result.get_details_list())}
-"""
+@require_http_methods(["GET"])
+def stream_report(request):
+    """Stream a report as it is rendered, or the stored one if nothing changed since"""
+    test_types = [t for t in request.GET.get('test_types', '').split(',') if t]
+    try:
+        build = ReportBuild(request.GET.get('report_type', 'summary'), test_types)
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
     
-    return content
-
+    response = StreamingHttpResponse(build, content_type='text/markdown; charset=utf-8')
+    response['X-Report-Cached'] = 'true' if build.cached else 'false'
+    return response
 
-def generate_comparison_report(results):
-    """Generate comparison report content"""
-    content = f"""
-# Comparison Mock Test Report
 
-Generated on: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## Performance Comparison
-"""
-    
-    # Group by test type and calculate averages
-    for test_type, _ in MockTestResult.TEST_TYPES:
-        type_results = results.filter(test_type=test_type)
-        if type_results.exists():
-            avg_time = type_results.aggregate(models.Avg('execution_time'))['execution_time__avg'] or 0
-            success_rate = (type_results.filter(status='success').count() / type_results.count() * 100) if type_results.count() > 0 else 0
-            
-            content += f"""
-### {test_type.replace('_', ' ').title()}
-- Average Execution Time: {avg_time:.2f}s
-- Success Rate: {success_rate:.1f}%
-- Total Runs: {type_results.count()}
-"""
-    
-    return content
+@require_http_methods(["GET"])
+def download_report(request, report_id):
+    """Stored report text"""
+    report = get_object_or_404(MockTestReport, id=report_id)
+    response = StreamingHttpResponse(read_report(report), content_type='text/markdown; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="mock_test_report_{report.id}.md"'
+    return response
 
 
 @csrf_exempt
@@ -489,16 +392,19 @@ def schedule_test(request):
 def mock_test_status(request):
     """Get current status of all tests"""
     # Get latest result for each test type
-    status_data = {}
-    for test_type, _ in MockTestResult.TEST_TYPES:
-        latest_result = MockTestResult.objects.filter(test_type=test_type).order_by('-created_at').first()
-        status_data[test_type] = {
-            'status': latest_result.status if latest_result else 'never_run',
-            'last_run': latest_result.created_at.isoformat() if latest_result else None,
-            'message': latest_result.message if latest_result else 'No previous runs'
-        }
+    status_data = get_test_status()
     
     return JsonResponse({
         'status': 'success',
-        'test_status': status_data
+        'test_status': status_data,
+        'system_health': get_system_health()
+    })
+
+
+@require_http_methods(["GET"])
+def system_health(request):
+    """Latest system health sample with 1, 5 and 15 minute trends"""
+    return JsonResponse({
+        'status': 'success',
+        'health': get_system_health()
     })
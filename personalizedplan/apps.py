@@ -4,3 +4,14 @@ class PersonalizedplanConfig(AppConfig):
     default_auto_field = 'id'
     name = 'personalizedplan'
     verbose_name = 'Personalized Plan'
+
+    def ready(self):
+        # Registers the check that reports a missing compiled question store
+        from . import checks
+
+        # Load the compiled question store once per process, before the first request
+        from .testsystem.question_catalog import get_question_catalog
+        try:
+            get_question_catalog()
+        except Exception as e:
+            print(f"Warning: Could not build question catalog - {e}")
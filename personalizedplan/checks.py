@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core import checks
+
+
+@checks.register()
+def check_compiled_question_store(app_configs, **kwargs):
+    """
+    Questions are only served from the compiled store, so a missing store
+    leaves every quiz and test empty. It is an error outside DEBUG.
+    """
+    from .testsystem.question_compiler import COMPILED_STORE_PATH, read_store
+
+    store = read_store(COMPILED_STORE_PATH)
+    if store is not None and store.get('banks'):
+        return []
+    level = checks.Warning if settings.DEBUG else checks.Error
+    return [level(
+        f"No usable compiled question store at {COMPILED_STORE_PATH}, no questions are served.",
+        hint="Run 'manage.py compile_question_banks' (with --no-sync before the first migrate).",
+        id='personalizedplan.E001' if level is checks.Error else 'personalizedplan.W001',
+    )]
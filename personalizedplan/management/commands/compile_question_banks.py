@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from personalizedplan.testsystem.question_compiler import COMPILED_STORE_PATH, compile_banks, write_store
+from personalizedplan.testsystem.question_store import sync_question_store
+
+
+class Command(BaseCommand):
+    help = "Compile the question banks into the normalized store and load it into the indexed question table."
+    # The system checks report the missing store this command builds
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=COMPILED_STORE_PATH, help="Path of the compiled store")
+        parser.add_argument('--strict', action='store_true', help="Fail instead of skipping invalid questions")
+        parser.add_argument('--no-sync', action='store_true', help="Only write the compiled store")
+
+    def handle(self, *args, **options):
+        store, errors = compile_banks()
+        for error in errors:
+            self.stderr.write(self.style.WARNING(error))
+        if errors and options['strict']:
+            raise CommandError(f"{len(errors)} invalid questions, store not written")
+
+        write_store(store, options['output'])
+        questions = sum(len(bank['questions']) for bank in store['banks'].values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Compiled {questions} questions from {len(store['banks'])} banks into {options['output']}"
+        ))
+
+        if not options['no_sync']:
+            counts = sync_question_store(store)
+            self.stdout.write(self.style.SUCCESS(
+                f"Question store: {counts['replaced']} banks replaced, {counts['removed']} removed, "
+                f"{counts['questions']} questions written"
+            ))
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:20
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('personalizedplan', '0002_assessmentsession'),
+        ('users', '0020_alter_resumeanalysislog_resume_documentkeyrequest_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamAttempt',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('test_type', models.CharField(max_length=20)),
+                ('title', models.CharField(max_length=200)),
+                ('question_file', models.CharField(help_text='Question file path relative to BASE_DIR', max_length=255)),
+                ('bank_version', models.CharField(max_length=32)),
+                ('question_ids', models.JSONField(default=list, help_text='Ordered question indexes within the file')),
+                ('answers', models.JSONField(default=list)),
+                ('correct_mask', models.CharField(default='', help_text="'1'/'0' per question", max_length=255)),
+                ('total_questions', models.IntegerField()),
+                ('correct_answers', models.IntegerField()),
+                ('score_percentage', models.FloatField()),
+                ('passed', models.BooleanField(default=False)),
+                ('feedback', models.JSONField(default=dict, help_text='Revised plan details shown on the results page')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='users.userregistration')),
+            ],
+            options={
+                'db_table': 'personalizedplan_exam_attempt',
+            },
+        ),
+    ]
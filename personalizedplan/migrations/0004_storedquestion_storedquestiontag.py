@@ -0,0 +1,48 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('personalizedplan', '0003_examattempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredQuestion',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('source', models.CharField(choices=[('mocktest', 'Mock Test'), ('quiz', 'Role Quiz'), ('readiness', 'Readiness Test')], max_length=20)),
+                ('bank', models.CharField(help_text='Bank file path relative to BASE_DIR', max_length=255)),
+                ('bank_version', models.CharField(max_length=32)),
+                ('position', models.IntegerField(help_text='Index of the question within its compiled bank')),
+                ('question_id', models.CharField(max_length=100)),
+                ('category', models.CharField(max_length=50)),
+                ('role', models.CharField(blank=True, default='', max_length=50)),
+                ('language', models.CharField(blank=True, default='', max_length=50)),
+                ('difficulty', models.CharField(max_length=10)),
+                ('question', models.JSONField(help_text='Normalized question')),
+            ],
+            options={
+                'db_table': 'personalizedplan_stored_question',
+                'indexes': [models.Index(fields=['source', 'category', 'difficulty'], name='stored_q_category_idx'), models.Index(fields=['role', 'difficulty'], name='stored_q_role_idx'), models.Index(fields=['language', 'difficulty'], name='stored_q_language_idx'), models.Index(fields=['source', 'question_id'], name='stored_q_question_id_idx')],
+                'unique_together': {('bank', 'position')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StoredQuestionTag',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tag', models.CharField(max_length=50)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_rows', to='personalizedplan.storedquestion')),
+            ],
+            options={
+                'db_table': 'personalizedplan_stored_question_tag',
+                'indexes': [models.Index(fields=['tag', 'question'], name='stored_q_tag_idx')],
+                'unique_together': {('question', 'tag')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('personalizedplan', '0004_storedquestion_storedquestiontag'),
+        ('users', '0020_alter_resumeanalysislog_resume_documentkeyrequest_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamProgress',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('attempt', models.CharField(help_text='Attempt key of the running test', max_length=64, unique=True)),
+                ('question_file', models.CharField(blank=True, default='', max_length=255)),
+                ('seq', models.PositiveIntegerField(default=0, help_text='Last applied change sequence number')),
+                ('answers', models.JSONField(default=dict, help_text='Question position -> selected option')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='users.userregistration')),
+            ],
+            options={
+                'db_table': 'personalizedplan_exam_progress',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('personalizedplan', '0005_examprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionBankVersion',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('bank', models.CharField(help_text='Bank file path relative to BASE_DIR', max_length=255)),
+                ('bank_version', models.CharField(max_length=32)),
+                ('questions', models.JSONField(default=list, help_text='Normalized questions, in bank order')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'personalizedplan_question_bank_version',
+                'unique_together': {('bank', 'bank_version')},
+            },
+        ),
+    ]
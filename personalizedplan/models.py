@@ -1,5 +1,6 @@
 from django.db import models
-from django.db.models import Sum
+from django.db.models import Count, Q, Sum
+from django.utils.functional import cached_property
 from users.models import UserRegistration
 import uuid
 
@@ -27,13 +28,30 @@ class PersonalizedPlan(models.Model):
     def __str__(self):
         return f"{self.user.userid} - {self.target_role_language} Plan"
 
+    @cached_property
+    def task_totals(self):
+        """
+        Task counts and XP of the plan in one query, kept for the life of
+        this instance (a request); refresh_task_totals() after changing tasks
+        """
+        totals = DailyTask.objects.filter(weekly_plan__personalized_plan=self).aggregate(
+            total_tasks=Count('id'),
+            tasks_completed=Count('id', filter=Q(status='completed')),
+            target_xp=Sum('xp_reward'),
+            total_xp_earned=Sum('xp_reward', filter=Q(status='completed')),
+        )
+        return {name: value or 0 for name, value in totals.items()}
+
+    def refresh_task_totals(self):
+        self.__dict__.pop('task_totals', None)
+
     @property
     def total_tasks(self):
-        return DailyTask.objects.filter(weekly_plan__personalized_plan=self).count()
+        return self.task_totals['total_tasks']
 
     @property
     def tasks_completed(self):
-        return DailyTask.objects.filter(weekly_plan__personalized_plan=self, status='completed').count()
+        return self.task_totals['tasks_completed']
 
     @property
     def completion_percentage(self):
@@ -44,16 +62,11 @@ class PersonalizedPlan(models.Model):
 
     @property
     def total_xp_earned(self):
-        return DailyTask.objects.filter(
-            weekly_plan__personalized_plan=self, 
-            status='completed'
-        ).aggregate(Sum('xp_reward'))['xp_reward__sum'] or 0
+        return self.task_totals['total_xp_earned']
 
     @property
     def target_xp(self):
-        return DailyTask.objects.filter(
-            weekly_plan__personalized_plan=self
-        ).aggregate(Sum('xp_reward'))['xp_reward__sum'] or 0
+        return self.task_totals['target_xp']
 
     @property
     def xp_progress_percentage(self):
@@ -62,13 +75,16 @@ class PersonalizedPlan(models.Model):
             return 0
         return (self.total_xp_earned / target) * 100
 
+    @staticmethod
+    def multiplier_for_streak(current_streak):
+        # Base multiplier 1.0, adds 0.1 for every 3 days of streak, max 2.0
+        multiplier = 1.0 + (int(current_streak / 3) * 0.1)
+        return min(round(multiplier, 1), 2.0)
+
     @property
     def streak_multiplier(self):
         try:
-            streak = self.user.userstreak
-            # Base multiplier 1.0, adds 0.1 for every 3 days of streak, max 2.0
-            multiplier = 1.0 + (int(streak.current_streak / 3) * 0.1)
-            return min(round(multiplier, 1), 2.0)
+            return self.multiplier_for_streak(self.user.userstreak.current_streak)
         except:
             return 1.0
 
@@ -315,3 +331,120 @@ class AssessmentSession(models.Model):
 
     def __str__(self):
         return f"{self.user.userid} - {self.target_role_language} Assessment"
+
+class ExamAttempt(models.Model):
+    """Graded test-system attempt; question texts are rebuilt from the question file"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(UserRegistration, on_delete=models.CASCADE, null=True, blank=True)
+    test_type = models.CharField(max_length=20)
+    title = models.CharField(max_length=200)
+    question_file = models.CharField(max_length=255, help_text="Question file path relative to BASE_DIR")
+    bank_version = models.CharField(max_length=32)
+    question_ids = models.JSONField(default=list, help_text="Ordered question indexes within the file")
+    answers = models.JSONField(default=list)
+    correct_mask = models.CharField(max_length=255, default='', help_text="'1'/'0' per question")
+    total_questions = models.IntegerField()
+    correct_answers = models.IntegerField()
+    score_percentage = models.FloatField()
+    passed = models.BooleanField(default=False)
+    feedback = models.JSONField(default=dict, help_text="Revised plan details shown on the results page")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'personalizedplan_exam_attempt'
+
+    def __str__(self):
+        return f"{self.title}: {self.correct_answers}/{self.total_questions}"
+
+class StoredQuestion(models.Model):
+    """Compiled question of any question bank, indexed for sampling (see testsystem.question_store)"""
+    SOURCE_CHOICES = [
+        ('mocktest', 'Mock Test'),
+        ('quiz', 'Role Quiz'),
+        ('readiness', 'Readiness Test'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    bank = models.CharField(max_length=255, help_text="Bank file path relative to BASE_DIR")
+    bank_version = models.CharField(max_length=32)
+    position = models.IntegerField(help_text="Index of the question within its compiled bank")
+    question_id = models.CharField(max_length=100)
+    category = models.CharField(max_length=50)
+    role = models.CharField(max_length=50, blank=True, default='')
+    language = models.CharField(max_length=50, blank=True, default='')
+    difficulty = models.CharField(max_length=10)
+    question = models.JSONField(help_text="Normalized question")
+
+    class Meta:
+        db_table = 'personalizedplan_stored_question'
+        unique_together = ['bank', 'position']
+        indexes = [
+            models.Index(fields=['source', 'category', 'difficulty'], name='stored_q_category_idx'),
+            models.Index(fields=['role', 'difficulty'], name='stored_q_role_idx'),
+            models.Index(fields=['language', 'difficulty'], name='stored_q_language_idx'),
+            models.Index(fields=['source', 'question_id'], name='stored_q_question_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.bank}#{self.position} ({self.question_id})"
+
+class StoredQuestionTag(models.Model):
+    """Tag of a StoredQuestion, one row per tag"""
+    id = models.BigAutoField(primary_key=True)
+    question = models.ForeignKey(StoredQuestion, on_delete=models.CASCADE, related_name='tag_rows')
+    tag = models.CharField(max_length=50)
+
+    class Meta:
+        db_table = 'personalizedplan_stored_question_tag'
+        unique_together = ['question', 'tag']
+        indexes = [
+            models.Index(fields=['tag', 'question'], name='stored_q_tag_idx'),
+        ]
+
+    def __str__(self):
+        return self.tag
+
+class QuestionBankVersion(models.Model):
+    """
+    Questions of one compiled version of a question bank
+
+    Tests and quizzes only keep question positions or ids and the bank
+    version they were drawn from; the versions they were drawn from are
+    archived here so a bank edit does not strand running tests and past
+    results (see testsystem.question_store).
+    """
+    id = models.BigAutoField(primary_key=True)
+    bank = models.CharField(max_length=255, help_text="Bank file path relative to BASE_DIR")
+    bank_version = models.CharField(max_length=32)
+    questions = models.JSONField(default=list, help_text="Normalized questions, in bank order")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'personalizedplan_question_bank_version'
+        unique_together = ['bank', 'bank_version']
+
+    def __str__(self):
+        return f"{self.bank}@{self.bank_version}"
+
+class ExamProgress(models.Model):
+    """
+    Autosaved answers of a running test (see testsystem.exam_progress)
+
+    One row per attempt holding only the answered positions; clients send
+    the answers changed since their last acknowledged save, numbered by seq.
+    """
+    id = models.BigAutoField(primary_key=True)
+    attempt = models.CharField(max_length=64, unique=True, help_text="Attempt key of the running test")
+    user = models.ForeignKey(UserRegistration, on_delete=models.CASCADE, null=True, blank=True)
+    question_file = models.CharField(max_length=255, blank=True, default='')
+    seq = models.PositiveIntegerField(default=0, help_text="Last applied change sequence number")
+    answers = models.JSONField(default=dict, help_text="Question position -> selected option")
+    updated_at = models.DateTimeField(auto_now=True)
+    submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'personalizedplan_exam_progress'
+
+    def __str__(self):
+        return f"{self.attempt}: {len(self.answers)} answers (seq {self.seq})"
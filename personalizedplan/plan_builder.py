@@ -0,0 +1,226 @@
+"""
+Generation of a new personalized plan.
+
+plan_graph() assembles the weekly plans and their daily tasks in memory,
+and generate_personalized_plan() writes them with one bulk insert per
+table inside a single transaction, so a plan is created completely or not
+at all in a handful of round-trips. The week topics of a plan depend only
+on the plan type, the target and the band of the assessment score, so the
+topic template of each combination is built once per process; weak areas
+are applied to a fresh copy for every plan.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+
+from .models import DailyTask, PersonalizedPlan, PlanProgress, WeeklyPlan
+
+WEEKS_PER_PLAN = 4
+DAYS_PER_WEEK = 7
+
+# Topic templates kept per process; targets are user input, so the cache is bounded
+TOPIC_TEMPLATE_CACHE_SIZE = 256
+
+_templates_lock = threading.Lock()
+_templates: Dict[Tuple[Any, str, Optional[str]], Dict[int, Tuple[str, Tuple[str, ...]]]] = {}
+
+
+def score_band(assessment_score=None) -> Optional[str]:
+    """Plan variant for an assessment score (a percentage), None without one"""
+    if assessment_score is None:
+        return None
+    score_percentage = float(assessment_score)
+    if score_percentage < 50:
+        # 1. Low Score (< 50%): Intensive Remediation Plan
+        return 'remediation'
+    if score_percentage < 80:
+        # 2. Medium Score (50-79%): Balanced Growth Plan
+        return 'balanced'
+    # 3. High Score (80%+): Accelerator Plan
+    return 'accelerator'
+
+
+def _topic_template(target: str, band: Optional[str]) -> Dict[int, Tuple[str, Tuple[str, ...]]]:
+    """Week number -> (skill focus, topics) before weak areas are applied"""
+    topics_structure = {
+        1: [f'{target} Fundamentals', []],
+        2: [f'Advanced {target} Concepts', []],
+        3: [f'{target} Best Practices', []],
+        4: [f'Professional {target} Development', []]
+    }
+
+    if band == 'remediation':
+        topics_structure[1] = [f'{target} Crash Course (Remediation)', [
+            f'{target} Absolute Basics: Syntax & Variables',
+            'Control Flow: Loops & Conditionals',
+            'Data Structures: Arrays & Objects',
+            'Functions & Scope Fundamentals',
+            'Error Handling Basics',
+            'Basic DOM Manipulation / IO',
+            'Mini Project: Calculator or To-Do List'
+        ]]
+        topics_structure[2] = [f'{target} Core Strengthening', [
+            'Object-Oriented Programming Basics',
+            'Modules & File Structure',
+            'Asynchronous Programming Basics',
+            'Working with APIs (Fetch/Requests)',
+            'Debugging Techniques 101',
+            'Code Style & Formatting',
+            'Mini Project: Data Fetcher'
+        ]]
+    elif band == 'balanced':
+        topics_structure[1] = [f'{target} Core Refresher', [
+            f'{target} Ecosystem & Environment Setup',
+            'Advanced Data Structures',
+            'Modern Syntax Features (ES6+/Python3+)',
+            'Functional Programming Concepts',
+            'Async Programming Deep Dive',
+            'Error Handling Patterns',
+            'Unit Testing Basics'
+        ]]
+        topics_structure[2] = [f'{target} Application Building', [
+            'State Management Strategies',
+            'Routing & Navigation',
+            'Form Handling & Validation',
+            'Authentication Flow Basics',
+            'API Integration Patterns',
+            'Performance Optimization Basics',
+            'Project: CRUD Application'
+        ]]
+    elif band == 'accelerator':
+        topics_structure[1] = [f'{target} Advanced Mastery', [
+            f'{target} Internals & Memory Management',
+            'Design Patterns (Singleton, Factory, Observer)',
+            'Performance Profiling & Optimization',
+            'Security Best Practices (OWASP)',
+            'Advanced Typing / Metaprogramming',
+            'Scalable Architecture Principles',
+            'Contribution to Open Source'
+        ]]
+        topics_structure[2] = [f'{target} System Design', [
+            'Microservices vs Monoliths',
+            'Database Design & ORM Optimization',
+            'Caching Strategies (Redis/Memcached)',
+            'Message Queues & Event Driven Arch',
+            'CI/CD Pipelines (GitHub Actions)',
+            'Docker & Containerization',
+            'Project: Scalable Backend Service'
+        ]]
+    else:
+        # Fallback default topics
+        topics_structure[1][1] = [f'{target} Basics', 'Setup & Env', 'Variables & Types', 'Control Flow', 'Functions', 'Data Structures', 'Basic IO']
+        topics_structure[2][1] = ['OOP Concepts', 'Modules', 'Error Handling', 'Async Basics', 'APIs', 'JSON Handling', 'Mini Project']
+
+    # Weeks 3 & 4 are the standard advanced/professional content
+    topics_structure[3][1] = ['Clean Code Principles', 'Refactoring Techniques', 'Documentation Standards', 'Code Review Etiquette', 'Agile/Scrum Basics', 'Git Workflow (Branching/Merging)', 'Career Readiness: Resume Prep']
+    topics_structure[4][1] = ['System Design Interviews', 'Algorithm Challenges', 'Behavioral Interview Prep', 'Mock Interview Practice', 'Portfolio Project Polish', 'Networking Strategies', 'Final Assessment Prep']
+
+    return {week: (skill_focus, tuple(topics)) for week, (skill_focus, topics) in topics_structure.items()}
+
+
+def topic_template(plan_type, target: str, band: Optional[str]) -> Dict[int, Tuple[str, Tuple[str, ...]]]:
+    """Cached topic template of a (plan type, target, score band)"""
+    key = (plan_type, target, band)
+    template = _templates.get(key)
+    if template is None:
+        template = _topic_template(target, band)
+        with _templates_lock:
+            if len(_templates) >= TOPIC_TEMPLATE_CACHE_SIZE:
+                _templates.clear()
+            _templates[key] = template
+    return template
+
+
+def get_week_topics(plan_type, target, assessment_score=None, weak_areas=None):
+    """Get topics for each week based on plan type, target, and assessment score"""
+    topics_structure = {
+        week: {'skill_focus': skill_focus, 'topics': list(topics)}
+        for week, (skill_focus, topics) in topic_template(plan_type, target, score_band(assessment_score)).items()
+    }
+
+    # Incorporate Weak Areas if available (Inject into Week 1 & 2)
+    # weak_areas is expected to be a dict or list of topic strings
+    if weak_areas:
+        weak_topics_list = []
+        if isinstance(weak_areas, dict):
+            weak_topics_list = list(weak_areas.keys())
+        elif isinstance(weak_areas, list):
+            weak_topics_list = weak_areas
+
+        # Inject up to 3 weak topics into Week 1
+        for i, weak_topic in enumerate(weak_topics_list[:3]):
+            if i < len(topics_structure[1]['topics']):
+                topics_structure[1]['topics'][i] = f"Focus Area: {weak_topic} (Review)"
+
+        # Inject next 3 weak topics into Week 2
+        for i, weak_topic in enumerate(weak_topics_list[3:6]):
+            if i < len(topics_structure[2]['topics']):
+                topics_structure[2]['topics'][i] = f"Deep Dive: {weak_topic} (Practice)"
+
+    return topics_structure
+
+
+def plan_graph(plan: PersonalizedPlan, plan_type, target, assessment_score=None,
+               weak_areas=None) -> Tuple[List[WeeklyPlan], List[DailyTask]]:
+    """Unsaved weekly plans and daily tasks of a new plan"""
+    week_topics = get_week_topics(plan_type, target, assessment_score, weak_areas)
+
+    weeks, tasks = [], []
+    for week_num in range(1, WEEKS_PER_PLAN + 1):
+        # Ensure we have topics for this week
+        if week_num not in week_topics:
+            continue
+
+        week_plan = WeeklyPlan(
+            personalized_plan=plan,
+            week_number=week_num,
+            skill_focus=week_topics[week_num]['skill_focus'],
+            topics=week_topics[week_num]['topics'],
+            status='locked' if week_num > 1 else 'in_progress'
+        )
+        weeks.append(week_plan)
+
+        topics_list = week_topics[week_num]['topics']
+        for day_num in range(1, DAYS_PER_WEEK + 1):
+            # Handle case where we might have fewer topics than days
+            if day_num <= len(topics_list):
+                topic_name = topics_list[day_num-1]
+                description = f"Focus on mastering {topic_name}. Review core concepts and complete practical exercises."
+            else:
+                topic_name = f"{target} Practice Day {day_num}"
+                description = f"General practice and review of this week's concepts."
+
+            tasks.append(DailyTask(
+                weekly_plan=week_plan,
+                day_number=day_num,
+                topic=topic_name,
+                description=description,
+                status='unlocked' if week_num == 1 and day_num == 1 else 'locked'
+            ))
+    return weeks, tasks
+
+
+def generate_personalized_plan(plan, plan_type, target, assessment_score=None, weak_areas=None):
+    """
+    Generate 3-4 week personalized plan based on assessment
+
+    The weeks, their tasks and the initial progress record are written in
+    one transaction (the plan too, if it is not saved yet).
+    """
+    weeks, tasks = plan_graph(plan, plan_type, target, assessment_score, weak_areas)
+    with transaction.atomic():
+        if plan._state.adding:
+            plan.save()
+        # bulk_create sets the weeks' primary keys, which the tasks pick up
+        WeeklyPlan.objects.bulk_create(weeks)
+        DailyTask.objects.bulk_create(tasks)
+
+        # Create initial progress record
+        PlanProgress.objects.create(
+            user=plan.user,
+            personalized_plan=plan,
+            current_week=1,
+            current_day=1
+        )
+    return plan
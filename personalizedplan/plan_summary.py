@@ -0,0 +1,213 @@
+"""
+Dashboard summary of a user's personalized plan.
+
+PlanSummary collects what the dashboard page and its stats API show in a
+handful of queries: the XP and streak records, the active plan, the
+plan's per-week task totals from one GROUP BY over its weekly plans (which
+also fills the plan's memoized task_totals, so its completion and XP
+properties cost nothing afterwards), one read of the daily activity that
+serves both the heatmap and the plan streak, and one aggregate over the
+assessment results. Values are computed on first use and kept for the
+life of the summary, i.e. one request.
+"""
+from datetime import timedelta
+from typing import Any, Dict, List, Set, Tuple
+
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .models import AssessmentResult, DailyActivity, PersonalizedPlan, UserStreak, UserXP, WeeklyPlan, XPReward
+
+# Radar axes of the four plan weeks
+RADAR_WEEKS = {
+    1: "Fundamentals",
+    2: "Advanced",
+    3: "Best Practices",
+    4: "Professionalism"
+}
+
+HEATMAP_DAYS = 30
+
+# Streak length that counts as full consistency on the radar
+CONSISTENCY_STREAK_DAYS = 14
+
+# Circumference of the plan completion circle on the dashboard
+PLAN_CIRCLE_CIRCUMFERENCE = 502.4
+
+RECENT_REWARDS_LIMIT = 10
+
+
+def week_totals(plan: PersonalizedPlan) -> Tuple[Dict[int, Dict[str, int]], int]:
+    """
+    Task totals of each week of a plan and the number of weeks, from one GROUP BY
+
+    Weeks are keyed by week number (the first week with a number wins, as
+    on the radar); the plan-wide sums are stored as the plan's task_totals.
+    """
+    rows = (
+        WeeklyPlan.objects.filter(personalized_plan=plan)
+        .values('id', 'week_number')
+        .annotate(
+            total=Count('dailytask'),
+            completed=Count('dailytask', filter=Q(dailytask__status='completed')),
+            target_xp=Sum('dailytask__xp_reward'),
+            earned_xp=Sum('dailytask__xp_reward', filter=Q(dailytask__status='completed')),
+        )
+        .order_by('week_number', 'created_at')
+    )
+    weeks = {}
+    plan_totals = {'total_tasks': 0, 'tasks_completed': 0, 'target_xp': 0, 'total_xp_earned': 0}
+    for row in rows:
+        totals = {
+            'total': row['total'],
+            'completed': row['completed'],
+            'target_xp': row['target_xp'] or 0,
+            'earned_xp': row['earned_xp'] or 0,
+        }
+        weeks.setdefault(row['week_number'], totals)
+        plan_totals['total_tasks'] += totals['total']
+        plan_totals['tasks_completed'] += totals['completed']
+        plan_totals['target_xp'] += totals['target_xp']
+        plan_totals['total_xp_earned'] += totals['earned_xp']
+    plan.__dict__['task_totals'] = plan_totals
+    return weeks, len(rows)
+
+
+def plan_streak(active_dates: Set, plan_start, today) -> int:
+    """Consecutive active days up to today or yesterday, not before the plan started"""
+    if today in active_dates:
+        check_date = today
+    elif (today - timedelta(days=1)) in active_dates:
+        check_date = today - timedelta(days=1)
+    else:
+        return 0
+    streak = 0
+    while check_date >= plan_start and check_date in active_dates:
+        streak += 1
+        check_date -= timedelta(days=1)
+    return streak
+
+
+class PlanSummary:
+    """Dashboard data of one user, shared by the dashboard page and the stats API"""
+
+    def __init__(self, user, today=None):
+        self.user = user
+        self.today = today or timezone.now().date()
+        self.user_xp, _ = UserXP.objects.get_or_create(user=user)
+        self.user_streak, _ = UserStreak.objects.get_or_create(user=user)
+        self.active_plan = PersonalizedPlan.objects.filter(user=user, status='active').first()
+        self.weeks, self.week_count = week_totals(self.active_plan) if self.active_plan else ({}, 0)
+
+    @property
+    def heatmap_start(self):
+        return self.today - timedelta(days=HEATMAP_DAYS - 1)
+
+    @cached_property
+    def active_dates(self) -> Set:
+        """Active days since the plan started or the heatmap begins, whichever is earlier"""
+        if not self.active_plan:
+            return set()
+        start = min(self.heatmap_start, self.active_plan.created_at.date())
+        return set(DailyActivity.objects.filter(
+            user=self.user,
+            is_active=True,
+            date__gte=start,
+            date__lte=self.today
+        ).values_list('date', flat=True))
+
+    @cached_property
+    def current_plan_streak(self) -> int:
+        if not self.active_plan:
+            return 0
+        return plan_streak(self.active_dates, self.active_plan.created_at.date(), self.today)
+
+    @property
+    def heatmap(self) -> List[Dict[str, Any]]:
+        """Last HEATMAP_DAYS days; only days within the current plan count as active"""
+        plan_start = self.active_plan.created_at.date() if self.active_plan else None
+        heatmap_data = []
+        for i in range(HEATMAP_DAYS):
+            date_cursor = self.heatmap_start + timedelta(days=i)
+            heatmap_data.append({
+                'date': date_cursor,
+                'is_active': plan_start is not None and date_cursor >= plan_start and date_cursor in self.active_dates
+            })
+        return heatmap_data
+
+    @property
+    def streak_multiplier(self) -> float:
+        return PersonalizedPlan.multiplier_for_streak(self.user_streak.current_streak)
+
+    @property
+    def completion_percentage(self) -> float:
+        if not self.active_plan:
+            return 0
+        return self.active_plan.completion_percentage
+
+    @property
+    def plan_circle_offset(self) -> float:
+        if not self.active_plan:
+            return PLAN_CIRCLE_CIRCUMFERENCE
+        return PLAN_CIRCLE_CIRCUMFERENCE - (self.completion_percentage / 100) * PLAN_CIRCLE_CIRCUMFERENCE
+
+    def chart(self):
+        """(labels, values) of the skill radar"""
+        labels, values = [], []
+        for week_number, label in RADAR_WEEKS.items():
+            labels.append(label)
+            week = self.weeks.get(week_number)
+            values.append(int((week['completed'] / week['total']) * 100) if week and week['total'] > 0 else 0)
+
+        labels.append("Consistency")
+        values.append(min(int((self.user_streak.current_streak / CONSISTENCY_STREAK_DAYS) * 100), 100))
+
+        labels.append("Experience")
+        values.append(self.user_xp.level_progress)  # Already 0-100
+        return labels, values
+
+    @cached_property
+    def test_stats(self) -> Dict[str, int]:
+        """Number of assessments taken and their rounded average score"""
+        stats = AssessmentResult.objects.filter(user=self.user).aggregate(total=Count('id'), avg=Avg('score'))
+        return {'total_tests': stats['total'], 'avg_score': round(stats['avg'] or 0)}
+
+    def recent_rewards(self):
+        """XP rewards since the active plan started (unevaluated)"""
+        if not self.active_plan:
+            return []
+        return XPReward.objects.filter(
+            user_xp=self.user_xp,
+            created_at__gte=self.active_plan.created_at
+        ).order_by('-created_at')[:RECENT_REWARDS_LIMIT]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Stats API payload"""
+        data = {
+            'user_xp': {
+                'current_level': self.user_xp.current_level,
+                'total_xp': self.user_xp.total_xp,
+                'level_progress': self.user_xp.level_progress,
+            },
+            'user_streak': {
+                'current_streak': self.user_streak.current_streak,
+                'longest_streak': self.user_streak.longest_streak,
+                'total_days_active': self.user_streak.total_days_active,
+            },
+        }
+        plan = self.active_plan
+        if plan:
+            data['active_plan'] = {
+                'current_week': plan.current_week,
+                'current_day': plan.current_day,
+                'total_xp_earned': plan.total_xp_earned,
+                'target_xp': plan.target_xp,
+                'xp_progress_percentage': plan.xp_progress_percentage,
+                'completion_percentage': plan.completion_percentage,
+                'streak_multiplier': self.streak_multiplier,
+                'tasks_completed': plan.tasks_completed,
+                'total_tasks': plan.total_tasks,
+                'current_plan_streak': self.current_plan_streak,
+            }
+        return data
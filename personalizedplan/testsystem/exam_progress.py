@@ -0,0 +1,121 @@
+"""
+Delta-based autosave of running tests.
+
+The exam page keeps the answers changed since its last acknowledged save
+and posts them every PROGRESS_SYNC_INTERVAL seconds (and when the page is
+hidden) as {attempt, seq, changes}, where seq increases with every post
+and changes maps question positions to the selected option (None when
+cleared). A post carries every change not yet acknowledged, so a post
+with a lower seq than the one already applied holds nothing newer and is
+dropped. Changes are coalesced into one compact ExamProgress row per
+attempt, which is read back to restore the answers when the page is
+reloaded and to grade the test on submit.
+"""
+from typing import Any, Dict, List, Optional
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from personalizedplan.models import ExamProgress
+
+# Seconds the exam page waits to batch answer changes into one save
+PROGRESS_SYNC_INTERVAL = 10
+
+
+def parse_changes(changes: Any, length: int) -> Dict[str, Optional[int]]:
+    """
+    Validated answer changes of a post
+
+    Returns:
+        Position (as a string, the JSON key) -> option index or None;
+        entries outside the test or with a malformed answer are dropped
+    """
+    if not isinstance(changes, dict):
+        return {}
+    parsed = {}
+    for position, answer in changes.items():
+        try:
+            index = int(position)
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= index < length:
+            continue
+        if answer is None:
+            parsed[str(index)] = None
+        elif isinstance(answer, int) and not isinstance(answer, bool) and answer >= 0:
+            parsed[str(index)] = answer
+    return parsed
+
+
+def record_progress(attempt: str, seq: int, changes: Dict[str, Optional[int]],
+                    user=None, question_file: str = '') -> Optional[int]:
+    """
+    Apply a post's changes to the attempt's progress row
+
+    Returns:
+        The seq the row is at afterwards (the client's acknowledgement),
+        or None if the attempt was already submitted or the database failed
+    """
+    try:
+        with transaction.atomic():
+            progress, _ = ExamProgress.objects.select_for_update().get_or_create(
+                attempt=attempt, defaults={'user': user, 'question_file': question_file}
+            )
+            if progress.submitted_at is not None:
+                return None
+            if seq <= progress.seq:
+                return progress.seq
+
+            for position, answer in changes.items():
+                if answer is None:
+                    progress.answers.pop(position, None)
+                else:
+                    progress.answers[position] = answer
+            progress.seq = seq
+            progress.save(update_fields=['answers', 'seq', 'updated_at'])
+            return progress.seq
+    except DatabaseError as e:
+        print(f"Warning: Could not save test progress for {attempt} - {e}")
+        return None
+
+
+def saved_progress(attempt: str, length: int) -> Dict[str, Any]:
+    """
+    Saved answers of a running attempt, to restore the exam page
+
+    Returns:
+        {'answers': one entry per question (None if unanswered), 'seq': last applied seq}
+    """
+    answers: List[Optional[int]] = [None] * length
+    try:
+        progress = ExamProgress.objects.filter(attempt=attempt, submitted_at__isnull=True).first()
+    except DatabaseError as e:
+        print(f"Warning: Could not read test progress for {attempt} - {e}")
+        progress = None
+    if progress is None:
+        return {'answers': answers, 'seq': 0}
+
+    for position, answer in progress.answers.items():
+        index = int(position)
+        if 0 <= index < length:
+            answers[index] = answer
+    return {'answers': answers, 'seq': progress.seq}
+
+
+def submit_progress(attempt: str, seq: int, changes: Dict[str, Optional[int]],
+                    length: int) -> Optional[List[Optional[int]]]:
+    """
+    Apply the final changes of an attempt and close its progress row
+
+    Returns:
+        The attempt's answers, or None if they could not be read (the
+        caller then grades the answers posted with the submission)
+    """
+    if record_progress(attempt, seq, changes) is None:
+        return None
+    answers = saved_progress(attempt, length)['answers']
+    try:
+        ExamProgress.objects.filter(attempt=attempt).update(submitted_at=timezone.now())
+    except DatabaseError as e:
+        print(f"Warning: Could not close test progress for {attempt} - {e}")
+    return answers
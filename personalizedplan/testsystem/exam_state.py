@@ -0,0 +1,205 @@
+"""
+Compact exam state for the test system.
+
+A running test is kept in the session as (question file, file version,
+seed, ordered question indexes) instead of the full question payloads.
+Questions are rebuilt on demand from the question catalog (or from the
+archived version of a file edited since the test was drawn), and graded
+answers are stored as one ExamAttempt row so the results page does not
+need them in the session either.
+"""
+import os
+import random
+import secrets
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from resumeanalysis.item_analysis import get_question_stats
+from resumeanalysis.quiz_generator import balanced_sample
+from .grading import AnswerKey, Grade, get_answer_key
+from .question_catalog import get_question_catalog
+from .question_store import archive_bank_version, archived_questions, recent_exam_questions, sample_questions
+
+# Questions per test when the file has more than this
+QUESTIONS_PER_TEST = 30
+
+
+def load_question_file(file_path: str) -> Tuple[str, tuple]:
+    """
+    Parsed questions of a file and the file version they were parsed from.
+
+    Questions are served from the question catalog, i.e. the compiled
+    store, without touching the filesystem; bank files are only read by
+    compile_question_banks.
+
+    Raises:
+        FileNotFoundError: If the file is not a compiled bank
+    """
+    catalog_entry = get_question_catalog().get(file_path)
+    if catalog_entry is None:
+        raise FileNotFoundError(f"{file_path} is not in the compiled question store")
+    return catalog_entry.version, catalog_entry.questions
+
+
+def _relative_path(file_path: str) -> str:
+    return os.path.relpath(file_path, str(settings.BASE_DIR))
+
+
+def _absolute_path(relative_path: str) -> str:
+    return os.path.join(str(settings.BASE_DIR), relative_path)
+
+
+def new_exam_state(file_path: str, count: int = QUESTIONS_PER_TEST, user=None) -> Dict[str, Any]:
+    """
+    Draw a test from a question file and return its compact session state
+
+    The draw goes through the indexed question store and skips questions
+    of the user's last attempts on the same file; the catalog is sampled
+    directly when the store does not hold this version of the file.
+
+    Raises:
+        ValueError: If the file has no questions
+    """
+    version, questions = load_question_file(file_path)
+    if not questions:
+        raise ValueError("No questions found in the selected file.")
+
+    seed = secrets.randbits(31)
+    rng = random.Random(seed)
+    stats = get_question_stats('exam')
+    relative = _relative_path(file_path)
+    # The test outlives this version of the file if the bank is edited meanwhile
+    archive_bank_version(relative, version, questions)
+    ids = None
+    if len(questions) <= count:
+        ids = list(range(len(questions)))
+    else:
+        try:
+            drawn = sample_questions(
+                count, bank=relative, bank_version=version,
+                exclude=recent_exam_questions(user, relative), stats=stats, rng=rng
+            )
+            if len(drawn) == count:
+                ids = [q.position for q in drawn]
+                rng.shuffle(ids)
+        except DatabaseError as e:
+            print(f"Warning: Question store unavailable, sampling the catalog - {e}")
+
+    if ids is None and stats:
+        # Spread the draw over measured difficulty once the questions have item statistics
+        positions = {id(q): i for i, q in enumerate(questions)}
+        ids = [positions[id(q)] for q in balanced_sample(questions, count, stats, rng)]
+        rng.shuffle(ids)
+    elif ids is None:
+        ids = rng.sample(range(len(questions)), count)
+
+    return {
+        'file': relative,
+        'version': version,
+        'seed': seed,
+        'ids': ids,
+        # Key of the attempt's autosaved answers, see exam_progress
+        'attempt': secrets.token_hex(16),
+    }
+
+
+def bank_questions(relative: str, version: str) -> Optional[tuple]:
+    """
+    Questions of a version of a question file
+
+    The catalog serves the current version; a version the file was edited
+    away from is read from the archive, see archive_bank_version().
+    Returns None if the version is neither.
+    """
+    try:
+        current_version, questions = load_question_file(_absolute_path(relative))
+    except OSError:
+        current_version, questions = None, ()
+    if current_version == version:
+        return questions
+    return archived_questions(relative, version)
+
+
+def exam_questions(state: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Questions of a test, in order, rebuilt from its compact state
+
+    The questions come from the version of the file the test was drawn
+    from, even if the file changed since. Returns None if that version is
+    no longer available.
+    """
+    try:
+        questions = bank_questions(state['file'], state.get('version'))
+    except KeyError:
+        return None
+    if questions is None:
+        return None
+    try:
+        return [questions[i] for i in state['ids']]
+    except (IndexError, TypeError):
+        return None
+
+
+def current_exam_questions(session) -> Optional[List[Dict[str, Any]]]:
+    """Questions of the session's running test, if any"""
+    state = session.get('current_test_state')
+    if state:
+        return exam_questions(state)
+    # Sessions started before the compact state stored full questions
+    return session.get('current_test_questions')
+
+
+def grade_exam(state: Dict[str, Any], questions: List[Dict[str, Any]], answers: List[Any]) -> Grade:
+    """Grade a running test against the cached answer key of its question file"""
+    if state and state.get('file'):
+        try:
+            version, bank = load_question_file(_absolute_path(state['file']))
+        except OSError:
+            version, bank = None, ()
+        if version == state.get('version'):
+            return get_answer_key(state['file'], version, bank).grade(state['ids'], answers)
+    # Tests drawn from an earlier version of the file are graded against the
+    # archived questions they showed, and sessions started before the compact
+    # state carry the questions themselves
+    return AnswerKey(questions).grade(range(len(questions)), answers)
+
+
+def question_text(question: Dict[str, Any]) -> str:
+    return question.get('question_text', question.get('question', ''))
+
+
+def attempt_results(attempt) -> Dict[str, Any]:
+    """Results page context for a graded ExamAttempt"""
+    questions = exam_questions({
+        'file': attempt.question_file,
+        'version': attempt.bank_version,
+        'ids': attempt.question_ids,
+    }) or []
+
+    results_detail = []
+    for i, question in enumerate(questions):
+        results_detail.append({
+            'question_number': i + 1,
+            'question': question_text(question),
+            'is_correct': attempt.correct_mask[i:i + 1] == '1',
+            'user_answer': attempt.answers[i] if i < len(attempt.answers) else None,
+            'correct_answer': question.get('correct_answer'),
+            'tags': question.get('tags', [])
+        })
+
+    results = {
+        'type': attempt.test_type,
+        'total_questions': attempt.total_questions,
+        'correct_answers': attempt.correct_answers,
+        'wrong_answers': attempt.total_questions - attempt.correct_answers,
+        'score_percentage': attempt.score_percentage,
+        'topic': attempt.title,
+        'passed': attempt.passed,
+        'message': "Test Passed!" if attempt.passed else "Test Failed. Keep practicing!",
+        'results_detail': results_detail,
+        'is_revised': False,
+    }
+    results.update(attempt.feedback or {})
+    return results
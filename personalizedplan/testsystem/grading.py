@@ -0,0 +1,204 @@
+"""
+Vectorized grading for test submissions.
+
+An AnswerKey turns a question bank into a correct-option array and
+question x category / question x tag membership matrices, built once per
+bank version. A submission (or a batch of equally long submissions) is
+graded by indexing the key with its question ids and comparing arrays;
+per-category and per-tag counts come out of the same pass as matrix
+products, so weak topics need no second walk over the questions.
+"""
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from django.db import DatabaseError
+from django.db.models import Count
+
+# Answer value for skipped or malformed answers; never equals a correct option
+UNANSWERED = -1
+# Correct option of questions without a usable answer key; never matches an answer
+NO_KEY = -2
+# Options are 0-based indexes below this, so every valid one fits the int16 arrays
+OPTION_LIMIT = int(np.iinfo(np.int16).max)
+
+# Question counts of the readiness test categories when the question store is not loaded
+READINESS_DEFAULT_TOTALS = {'aptitude': 9, 'reasoning': 9, 'english': 6, 'core': 36}
+
+
+def _option(value: Any, missing: int, options: int = OPTION_LIMIT) -> int:
+    """Option index 0 <= value < options, else missing"""
+    if isinstance(value, bool) or value is None:
+        return missing
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if not isinstance(value, int):
+        return missing
+    return value if 0 <= value < min(options, OPTION_LIMIT) else missing
+
+
+def _option_count(question: Dict[str, Any]) -> int:
+    options = question.get('options')
+    return len(options) if isinstance(options, (list, tuple, dict)) and options else OPTION_LIMIT
+
+
+class AnswerKey:
+    """Correct options and category/tag membership of a question bank"""
+
+    def __init__(self, questions: Sequence[Dict[str, Any]]):
+        n = len(questions)
+        # A key outside the question's options is no key, so answers beyond them never match
+        self.correct = np.fromiter(
+            (_option(q.get('correct_answer'), NO_KEY, _option_count(q)) for q in questions), dtype=np.int16, count=n
+        )
+
+        categories, tags = {}, {}
+        category_cells, tag_cells = [], []
+        for i, question in enumerate(questions):
+            category = question.get('category') or 'general'
+            category_cells.append((i, categories.setdefault(category, len(categories))))
+            for rank, tag in enumerate(dict.fromkeys(question.get('tags') or ())):
+                tag_cells.append((i, tags.setdefault(tag, len(tags)), rank))
+
+        self.categories = tuple(categories)
+        self.tags = tuple(tags)
+        self.category_matrix = np.zeros((n, len(categories)), dtype=np.int32)
+        self.tag_matrix = np.zeros((n, len(tags)), dtype=np.int32)
+        # Position of each tag in its question's tag list, for stable weak-topic ordering
+        self.tag_rank = np.zeros((n, len(tags)), dtype=np.int16)
+        if category_cells:
+            rows, columns = zip(*category_cells)
+            self.category_matrix[rows, columns] = 1
+        if tag_cells:
+            rows, columns, ranks = zip(*tag_cells)
+            self.tag_matrix[rows, columns] = 1
+            self.tag_rank[rows, columns] = ranks
+
+    def __len__(self):
+        return len(self.correct)
+
+    @staticmethod
+    def answer_array(answers: Sequence[Any], length: int) -> np.ndarray:
+        """Answers as an int16 array of the test's length (missing and malformed answers are UNANSWERED)"""
+        array = np.full(length, UNANSWERED, dtype=np.int16)
+        values = [_option(a, UNANSWERED) for a in list(answers)[:length]]
+        array[:len(values)] = values
+        return array
+
+    def grade_batch(self, question_ids: np.ndarray, answers: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Grade equally long submissions at once
+
+        Args:
+            question_ids: (submissions x questions) bank indexes
+            answers: (submissions x questions) selected options, UNANSWERED if skipped
+
+        Returns:
+            Dict of arrays: correct (submissions x questions, bool),
+            correct_count (submissions,), category_total / category_correct
+            (submissions x categories), tag_total / tag_wrong
+            (submissions x tags)
+        """
+        question_ids = np.asarray(question_ids, dtype=np.int64)
+        correct = np.asarray(answers) == self.correct[question_ids]
+
+        categories = self.category_matrix[question_ids]
+        tags = self.tag_matrix[question_ids]
+        return {
+            'correct': correct,
+            'correct_count': correct.sum(axis=1),
+            'category_total': categories.sum(axis=1),
+            'category_correct': np.einsum('sq,sqc->sc', correct.astype(np.int32), categories),
+            'tag_total': tags.sum(axis=1),
+            'tag_wrong': np.einsum('sq,sqt->st', (~correct).astype(np.int32), tags),
+        }
+
+    def grade(self, question_ids: Sequence[int], answers: Sequence[Any]) -> 'Grade':
+        """Grade one submission"""
+        ids = np.asarray(question_ids, dtype=np.int64)
+        result = self.grade_batch(ids[None, :], self.answer_array(answers, len(ids))[None, :])
+        return Grade(self, ids, {name: values[0] for name, values in result.items()})
+
+
+class Grade:
+    """Result of grading one submission"""
+
+    def __init__(self, key: AnswerKey, question_ids: np.ndarray, result: Dict[str, np.ndarray]):
+        self.key = key
+        self.question_ids = question_ids
+        self.correct = result['correct']
+        self.correct_count = int(result['correct_count'])
+        self.total = len(question_ids)
+        self._result = result
+
+    @property
+    def percentage(self) -> float:
+        return (self.correct_count / self.total) * 100 if self.total > 0 else 0
+
+    @property
+    def correct_mask(self) -> str:
+        """'1'/'0' per question, as stored on ExamAttempt"""
+        return (self.correct.astype(np.uint8) + ord('0')).tobytes().decode('ascii')
+
+    def wrong_positions(self) -> List[int]:
+        """Positions (within the test) of the questions answered wrong or skipped"""
+        return np.flatnonzero(~self.correct).tolist()
+
+    def category_scores(self) -> Dict[str, Dict[str, int]]:
+        """Category -> correct and total counts for the categories in the test"""
+        totals = self._result['category_total']
+        corrects = self._result['category_correct']
+        return {
+            self.key.categories[c]: {'correct': int(corrects[c]), 'total': int(totals[c])}
+            for c in np.flatnonzero(totals).tolist()
+        }
+
+    def weak_tags(self, limit: int = 3) -> List[str]:
+        """
+        Tags most often missed, most frequent first
+
+        Ties go to the tag missed earliest in the test (then earliest in that
+        question's tags), as when counting the missed questions' tags in order.
+        """
+        wrong_counts = self._result['tag_wrong']
+        if not wrong_counts.any():
+            return []
+        tags = self.key.tag_matrix[self.question_ids]
+        n = len(self.question_ids)
+        missed = (~self.correct)[:, None] & (tags > 0)
+        first_missed = np.where(missed, np.arange(n)[:, None], n).min(axis=0)
+        columns = np.arange(len(wrong_counts))
+        rank = self.key.tag_rank[self.question_ids[np.minimum(first_missed, n - 1)], columns]
+        order = np.lexsort((rank, first_missed, -wrong_counts))
+        return [self.key.tags[t] for t in order[:limit].tolist() if wrong_counts[t] > 0]
+
+
+_keys_lock = threading.Lock()
+_keys: Dict[Tuple[str, str], AnswerKey] = {}
+
+
+def get_answer_key(bank: str, version: str, questions: Sequence[Dict[str, Any]]) -> AnswerKey:
+    """AnswerKey of a bank version, built on first use and shared by the process"""
+    key = _keys.get((bank, version))
+    if key is None:
+        key = AnswerKey(questions)
+        with _keys_lock:
+            # Older versions of the same bank are no longer graded against
+            for cached in [k for k in _keys if k[0] == bank]:
+                del _keys[cached]
+            _keys[(bank, version)] = key
+    return key
+
+
+def readiness_category_totals() -> Dict[str, int]:
+    """Questions per readiness test category, counted in the question store"""
+    from personalizedplan.models import StoredQuestion
+    try:
+        totals = dict(
+            StoredQuestion.objects.filter(source='readiness')
+            .values_list('category').annotate(count=Count('id'))
+        )
+    except DatabaseError as e:
+        print(f"Warning: Could not count readiness questions - {e}")
+        totals = {}
+    return {category: totals.get(category) or default for category, default in READINESS_DEFAULT_TOTALS.items()}
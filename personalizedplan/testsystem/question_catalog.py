@@ -0,0 +1,184 @@
+"""
+Catalog of the mock test question files used by the test system.
+
+The compiled question store (see question_compiler) is loaded once at app
+ready, see PersonalizedplanConfig, together with each bank's topics, tags
+and an inverted index from topic keywords to banks. Resolving a test
+topic to a file and reading its questions are then dictionary lookups;
+the store is only stat'ed every CATALOG_CHECK_INTERVAL seconds to pick up
+a recompile.
+"""
+import os
+import re
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Optional
+
+from .question_compiler import COMPILED_STORE_PATH, QUESTIONS_ROOT, absolute_path, load_compiled_store
+
+# Seconds between mtime checks of the compiled store
+CATALOG_CHECK_INTERVAL = 5
+
+# Mapping of common topics to file paths
+TOPIC_FILES = {
+    'python': ('languages', 'python', 'python_fundamentals.json'),
+    'java': ('languages', 'java', 'java_core.json'),
+    'javascript': ('languages', 'javascript', 'javascript_es6.json'),
+    'cpp': ('languages', 'cpp', 'cpp_stl.json'),
+    'frontend': ('roles', 'frontend', 'frontend_html_css.json'),
+    'html': ('roles', 'frontend', 'frontend_html_css.json'),
+    'css': ('roles', 'frontend', 'frontend_html_css.json'),
+    'react': ('roles', 'frontend', 'frontend_html_css.json'), # React specifically fallback to frontend
+    'backend': ('roles', 'backend', 'backend_django.json'),
+    'django': ('roles', 'backend', 'backend_django.json'),
+    'node': ('roles', 'backend', 'backend_nodejs.json'),
+    'sql': ('roles', 'backend', 'backend_django.json'), # SQL fallback
+    'datascience': ('roles', 'datascience', 'datascience_python.json'),
+    'data science': ('roles', 'datascience', 'datascience_python.json'),
+    'devops': ('roles', 'devops', 'devops_docker.json'),
+    'fullstack': ('roles', 'backend', 'backend_django.json'), # Fullstack fallback to backend
+}
+
+DEFAULT_TOPIC_FILE = ('languages', 'python', 'python_fundamentals.json')
+
+# Resolved topics remembered per catalog
+MAX_RESOLVED_TOPICS = 4096
+
+
+def keywords(text: str) -> set:
+    """Lower-case word tokens of a topic, path or tag (digits-only tokens dropped)"""
+    return {word for word in re.split(r'[^a-z0-9+#]+', text.lower()) if word and not word.isdigit()}
+
+
+class QuestionFile:
+    """One compiled question bank"""
+
+    __slots__ = ('path', 'version', 'questions', 'topics', 'tags')
+
+    def __init__(self, path: str, version: str, questions: Iterable[Dict[str, Any]]):
+        self.path = path
+        self.version = version
+        self.questions = tuple(q for q in questions if isinstance(q, dict))
+        self.topics = frozenset(
+            str(q['category']).lower() for q in self.questions if q.get('category')
+        )
+        self.tags = frozenset(
+            str(tag).lower() for q in self.questions for tag in (q.get('tags') or ())
+        )
+
+    def __repr__(self):
+        return f"<QuestionFile {os.path.relpath(self.path, QUESTIONS_ROOT)} questions={len(self.questions)}>"
+
+    def keywords(self) -> set:
+        words = keywords(os.path.splitext(os.path.relpath(self.path, QUESTIONS_ROOT))[0])
+        for value in self.topics | self.tags:
+            words |= keywords(value)
+        return words
+
+
+class QuestionCatalog:
+    """Immutable snapshot of the question tree with a keyword -> files index"""
+
+    def __init__(self, files: Dict[str, QuestionFile], mtimes: Dict[str, int]):
+        self.files = MappingProxyType(dict(files))
+        self.mtimes = MappingProxyType(dict(mtimes))
+
+        by_keyword: Dict[str, list] = {}
+        for path in sorted(self.files):
+            for word in self.files[path].keywords():
+                by_keyword.setdefault(word, []).append(path)
+        self.by_keyword = MappingProxyType({word: tuple(paths) for word, paths in by_keyword.items()})
+        self._resolved: Dict[str, str] = {}
+
+    def __repr__(self):
+        return f"<QuestionCatalog files={len(self.files)} keywords={len(self.by_keyword)}>"
+
+    def get(self, file_path: str) -> Optional[QuestionFile]:
+        return self.files.get(os.path.normpath(file_path))
+
+    def resolve(self, topic: str) -> str:
+        """Most relevant question file for a topic; resolutions are remembered"""
+        topic_lower = (topic or '').lower().strip()
+        path = self._resolved.get(topic_lower)
+        if path is None:
+            path = self._resolve(topic_lower)
+            if len(self._resolved) < MAX_RESOLVED_TOPICS:
+                self._resolved[topic_lower] = path
+        return path
+
+    def _resolve(self, topic_lower: str) -> str:
+        # Priority check for exact matches first
+        if topic_lower in TOPIC_FILES:
+            return os.path.join(QUESTIONS_ROOT, *TOPIC_FILES[topic_lower])
+
+        # Try direct mapping with partial match
+        for key, path_tuple in TOPIC_FILES.items():
+            if key in topic_lower:
+                return os.path.join(QUESTIONS_ROOT, *path_tuple)
+
+        if topic_lower:
+            # Files named after the topic
+            for path in sorted(self.files):
+                if topic_lower in os.path.basename(path).lower():
+                    return path
+
+            # Files sharing the most keywords with the topic
+            hits: Dict[str, int] = {}
+            for word in keywords(topic_lower):
+                for path in self.by_keyword.get(word, ()):
+                    hits[path] = hits.get(path, 0) + 1
+            if hits:
+                return max(sorted(hits), key=hits.get)
+
+        # Default fallback
+        return os.path.join(QUESTIONS_ROOT, *DEFAULT_TOPIC_FILE)
+
+
+def _store_mtimes() -> Dict[str, int]:
+    """mtime of the compiled store (empty when there is none)"""
+    try:
+        return {COMPILED_STORE_PATH: os.stat(COMPILED_STORE_PATH).st_mtime_ns}
+    except OSError:
+        return {}
+
+
+_catalog_lock = threading.Lock()
+_catalog: Optional[QuestionCatalog] = None
+_catalog_last_check = 0.0
+
+
+def get_question_catalog(force: bool = False) -> QuestionCatalog:
+    """
+    Return the process-wide question catalog.
+
+    The compiled store is stat'ed at most every CATALOG_CHECK_INTERVAL
+    seconds and reloaded when it changed; banks whose checksum did not
+    change keep their entries, and the catalog is swapped atomically so
+    readers never see a half-built index.
+    """
+    global _catalog, _catalog_last_check
+
+    now = time.monotonic()
+    if not force and _catalog is not None and now - _catalog_last_check < CATALOG_CHECK_INTERVAL:
+        return _catalog
+
+    with _catalog_lock:
+        _catalog_last_check = now
+        mtimes = _store_mtimes()
+        if force or _catalog is None or dict(_catalog.mtimes) != mtimes:
+            previous = _catalog
+            files = {}
+            for relative, bank in load_compiled_store()['banks'].items():
+                if bank.get('source') != 'mocktest':
+                    continue
+                path = absolute_path(relative)
+                version = bank['checksum'][:16]
+                cached = previous.files.get(path) if previous is not None and not force else None
+                if cached is not None and cached.version == version:
+                    files[path] = cached
+                else:
+                    files[path] = QuestionFile(path, version, bank['questions'])
+            _catalog = QuestionCatalog(files, mtimes)
+
+    return _catalog
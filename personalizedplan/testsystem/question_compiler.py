@@ -0,0 +1,347 @@
+"""
+Compilation of the question banks.
+
+The banks live in three layouts: mock test banks under
+mocktestdata/questions (plus two legacy files), role quiz banks under
+resumeanalysis/questions/<category>/questions.json and readiness test
+banks under radinesstest/questions. They come as JSON files (a list, or
+a dict with a 'questions' list) and as legacy numbered text files, and
+name the answer key 'correct_answer', 'correct' or 'correct_index' (an
+index, an option letter or the option text). compile_question_banks
+parses all of them once, validates every question and writes a single
+normalized store that the runtime loaders read through
+load_compiled_store(); it is the only reader of the bank files, and
+nothing is parsed on the request path.
+
+Normalized question:
+    id, category, difficulty, question_text, options, correct_answer
+    (0-based option index), explanation, tags
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+QUESTIONS_ROOT = os.path.normpath(os.path.join(str(settings.BASE_DIR), 'mocktestdata', 'questions'))
+QUIZ_QUESTIONS_ROOT = os.path.normpath(os.path.join(str(settings.BASE_DIR), 'resumeanalysis', 'questions'))
+READINESS_QUESTIONS_ROOT = os.path.normpath(os.path.join(str(settings.BASE_DIR), 'radinesstest', 'questions'))
+
+COMPILED_STORE_PATH = os.path.normpath(os.path.join(str(settings.BASE_DIR), 'mocktestdata', 'compiled_questions.json'))
+
+# Bump when the normalized question layout changes
+STORE_FORMAT = 2
+
+QUESTION_FILE_EXTENSIONS = ('.json', '.txt')
+
+# Banks outside QUESTIONS_ROOT that are still compiled (relative to BASE_DIR)
+LEGACY_BANKS = (
+    ('mocktestdata', 'pythonquestions.json'),
+    ('assets', 'static', 'mocktestdata', 'pythonquestions.txt'),
+)
+
+# Quiz categories that are roles (the others are shared by every role quiz)
+QUIZ_ROLES = ('frontend', 'backend', 'devops', 'datascience')
+
+LANGUAGES = ('python', 'java', 'javascript', 'cpp')
+
+ANSWER_KEYS = ('correct_answer', 'correct', 'correct_index')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+_QUESTION_LINE = re.compile(r'^\d+\.\s*')
+_OPTION_LINE = re.compile(r'^(?:[a-dA-D]\)|[+-])\s*')
+_ANSWER_LINE = re.compile(r'^(?:correct answer|answer):\s*(.*)$', re.IGNORECASE)
+
+
+def relative_path(path: str) -> str:
+    return os.path.relpath(path, str(settings.BASE_DIR))
+
+
+def absolute_path(relative: str) -> str:
+    return os.path.normpath(os.path.join(str(settings.BASE_DIR), relative))
+
+
+def _bank_files(root: str) -> List[str]:
+    paths = []
+    for current, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(QUESTION_FILE_EXTENSIONS):
+                paths.append(os.path.join(current, name))
+    return paths
+
+
+def bank_sources() -> List[str]:
+    """Absolute paths of every question bank, in a stable order"""
+    paths = _bank_files(QUESTIONS_ROOT)
+    for parts in LEGACY_BANKS:
+        path = absolute_path(os.path.join(*parts))
+        if os.path.isfile(path):
+            paths.append(path)
+    paths.extend(_bank_files(QUIZ_QUESTIONS_ROOT))
+    paths.extend(_bank_files(READINESS_QUESTIONS_ROOT))
+    return paths
+
+
+def bank_metadata(path: str) -> Dict[str, str]:
+    """
+    Exam source, default category, role and language of a bank, from its location
+
+    mocktestdata/questions/roles/<role>/..., .../languages/<language>/...,
+    resumeanalysis/questions/<category>/questions.json and
+    radinesstest/questions/<category>.json
+    """
+    path = os.path.normpath(path)
+    directory = os.path.dirname(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    stem_category = re.sub(r'(?:_?questions)?[_\d]*$', '', stem).lower() or stem.lower()
+
+    if directory == QUIZ_QUESTIONS_ROOT or directory.startswith(QUIZ_QUESTIONS_ROOT + os.sep):
+        category = os.path.basename(directory).lower()
+        return {
+            'source': 'quiz',
+            'category': category,
+            'role': category if category in QUIZ_ROLES else '',
+            'language': '',
+        }
+    if directory == READINESS_QUESTIONS_ROOT:
+        return {'source': 'readiness', 'category': stem.lower(), 'role': '', 'language': ''}
+
+    meta = {'source': 'mocktest', 'category': stem_category, 'role': '', 'language': ''}
+    if directory.startswith(QUESTIONS_ROOT + os.sep):
+        parts = os.path.relpath(directory, QUESTIONS_ROOT).split(os.sep)
+        if len(parts) >= 2 and parts[0] in ('roles', 'languages'):
+            meta['role' if parts[0] == 'roles' else 'language'] = parts[1].lower()
+            meta['category'] = parts[1].lower()
+    elif stem_category in LANGUAGES:
+        # Legacy banks next to the question tree
+        meta['language'] = stem_category
+    return meta
+
+
+def parse_text_questions(content: str) -> List[Dict[str, Any]]:
+    """Parse the legacy numbered text format (question, lettered options, 'Correct Answer: X')"""
+    questions = []
+    current_question = None
+
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line or line.startswith('View Answer') or line.startswith('Explanation:'):
+            continue
+
+        if _QUESTION_LINE.match(line):
+            if current_question and current_question['question'] and current_question['options']:
+                questions.append(current_question)
+            current_question = {
+                'question': _QUESTION_LINE.sub('', line),
+                'options': [],
+                'correct': None
+            }
+            continue
+
+        if current_question is None:
+            continue
+
+        answer = _ANSWER_LINE.match(line)
+        if answer:
+            current_question['correct'] = answer.group(1).strip()
+        elif _OPTION_LINE.match(line):
+            current_question['options'].append(_OPTION_LINE.sub('', line).strip())
+
+    if current_question and current_question['question'] and current_question['options']:
+        questions.append(current_question)
+
+    return questions
+
+
+def parse_bank(content: str, file_ext: str) -> List[Dict[str, Any]]:
+    """Raw questions of a bank file"""
+    if file_ext.lower() != '.json':
+        return parse_text_questions(content)
+    data = json.loads(content)
+    # Handle different JSON structures
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and isinstance(data.get('questions'), list):
+        return data['questions']
+    raise ValueError("expected a list of questions or a dict with a 'questions' list")
+
+
+def answer_index(value: Any, options: List[str]) -> Optional[int]:
+    """0-based option index of an answer given as an index, an option letter or the option text"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    text = str(value).strip()
+    if len(text) == 1 and text.upper() in 'ABCD':
+        return ord(text.upper()) - ord('A')
+    if text.isdigit():
+        # An index stored as a string (text banks are handled by the caller, they are 1-based)
+        return int(text)
+    if text in options:
+        return options.index(text)
+    return None
+
+
+def normalize_question(raw: Dict[str, Any], default_id: str, default_category: str,
+                       legacy_text: bool = False) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Validate a raw question and convert it to the normalized layout
+
+    Returns:
+        (question, None) or (None, reason it was rejected)
+    """
+    if not isinstance(raw, dict):
+        return None, "not an object"
+
+    text = str(raw.get('question_text') or raw.get('question') or raw.get('text') or '').strip()
+    if not text:
+        return None, "no question text"
+
+    options = raw.get('options')
+    if isinstance(options, dict):
+        options = [options[key] for key in sorted(options)]
+    if not isinstance(options, list) or len(options) < 2:
+        return None, "fewer than two options"
+    options = [str(option).strip() for option in options]
+
+    answer = next((raw[key] for key in ANSWER_KEYS if raw.get(key) is not None), None)
+    if legacy_text and isinstance(answer, str) and answer.isdigit():
+        index = int(answer) - 1
+    else:
+        index = answer_index(answer, options)
+    if index is None or not 0 <= index < len(options):
+        return None, f"answer key {answer!r} does not match an option"
+
+    difficulty = str(raw.get('difficulty') or 'medium').lower()
+    tags = raw.get('tags') or []
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(',')]
+
+    return {
+        'id': str(raw.get('id') or default_id),
+        'category': str(raw.get('category') or default_category).lower(),
+        'difficulty': difficulty if difficulty in DIFFICULTIES else 'medium',
+        'question_text': text,
+        'options': options,
+        'correct_answer': index,
+        'explanation': str(raw.get('explanation') or ''),
+        'tags': [str(tag).lower() for tag in tags if str(tag).strip()],
+    }, None
+
+
+def compile_bank(path: str) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Compile one bank file
+
+    Returns:
+        (compiled bank, list of validation errors)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    stem, ext = os.path.splitext(os.path.basename(path))
+    meta = bank_metadata(path)
+
+    errors = []
+    try:
+        raw_questions = parse_bank(data.decode('utf-8'), ext)
+    except (UnicodeDecodeError, ValueError) as e:
+        raw_questions = []
+        errors.append(f"{relative_path(path)}: {e}")
+
+    questions, seen = [], {}
+    for n, raw in enumerate(raw_questions, start=1):
+        question, reason = normalize_question(
+            raw, f"{stem}_{n:03d}", meta['category'], legacy_text=ext.lower() != '.json'
+        )
+        if question is None:
+            errors.append(f"{relative_path(path)}: question {n}: {reason}")
+            continue
+        previous = seen.get(question['id'])
+        if previous is not None:
+            # Repeated copies of a question are dropped; conflicting ones are reported
+            if previous != question:
+                errors.append(f"{relative_path(path)}: question {n}: duplicate id {question['id']}")
+            continue
+        seen[question['id']] = question
+        questions.append(question)
+
+    bank = dict(meta)
+    bank['checksum'] = hashlib.sha1(data).hexdigest()
+    bank['questions'] = questions
+    return bank, errors
+
+
+def compile_banks(paths: Iterable[str] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """Compile banks (all of bank_sources() by default) into one store"""
+    banks, errors = {}, []
+    for path in (bank_sources() if paths is None else paths):
+        bank, bank_errors = compile_bank(path)
+        banks[relative_path(path)] = bank
+        errors.extend(bank_errors)
+    return {
+        'format': STORE_FORMAT,
+        'compiled_at': timezone.now().isoformat(),
+        'banks': banks,
+    }, errors
+
+
+def write_store(store: Dict[str, Any], path: str = COMPILED_STORE_PATH):
+    """Write a compiled store atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(store, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def read_store(path: str = COMPILED_STORE_PATH) -> Optional[Dict[str, Any]]:
+    """The compiled store, or None if it is missing, unreadable or of another format"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            store = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read compiled question store {path} - {e}")
+        return None
+    if not isinstance(store, dict) or store.get('format') != STORE_FORMAT:
+        print(f"Warning: Compiled question store {path} has an old format, run compile_question_banks")
+        return None
+    return store
+
+
+_store_lock = threading.Lock()
+_store_cache: Tuple[Optional[int], Optional[Dict[str, Any]]] = (None, None)
+
+
+def load_compiled_store() -> Dict[str, Any]:
+    """
+    The compiled store the runtime loaders share, re-read when the file changes
+
+    Without a usable store there are no banks: the bank files themselves
+    are only read by compile_question_banks.
+    """
+    global _store_cache
+    try:
+        mtime = os.stat(COMPILED_STORE_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    cached_mtime, store = _store_cache
+    if store is not None and cached_mtime == mtime:
+        return store
+
+    with _store_lock:
+        cached_mtime, store = _store_cache
+        if store is None or cached_mtime != mtime:
+            store = read_store(COMPILED_STORE_PATH) if mtime is not None else None
+            if store is None:
+                print("Warning: No usable compiled question store, no questions are served. "
+                      "Run 'manage.py compile_question_banks' to build it.")
+                store = {'format': STORE_FORMAT, 'banks': {}}
+            _store_cache = (mtime, store)
+    return store
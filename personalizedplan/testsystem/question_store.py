@@ -0,0 +1,263 @@
+"""
+Indexed question store shared by every exam type.
+
+compile_question_banks loads the compiled banks into StoredQuestion (one
+row per question, indexed by source/category/difficulty, role, language
+and question id) and StoredQuestionTag. sample_questions() picks a test
+from the index columns alone, excluding questions the user saw in their
+last few attempts, and only then fetches the chosen rows' payloads.
+
+Every bank version a test or quiz is drawn from is also archived in
+QuestionBankVersion, so archived_questions() can rebuild a running test
+or a past result after its bank was edited and recompiled.
+"""
+import random
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+
+from personalizedplan.models import ExamAttempt, QuestionBankVersion, StoredQuestion, StoredQuestionTag
+from resumeanalysis.models import QuizResponse, RoleQuiz
+from resumeanalysis.quiz_generator import balanced_sample
+from .question_compiler import LANGUAGES, read_store
+
+# Attempts whose questions are kept out of the next draw
+RECENT_ATTEMPTS = 3
+
+TAG_MAX_LENGTH = 50
+
+# Archived bank versions kept in memory per process
+ARCHIVED_BANK_CACHE_SIZE = 32
+
+
+def _stored_questions(relative: str, bank: Dict[str, Any]) -> List[StoredQuestion]:
+    version = bank['checksum'][:16]
+    rows = []
+    for position, question in enumerate(bank['questions']):
+        language = bank.get('language') or (question['category'] if question['category'] in LANGUAGES else '')
+        rows.append(StoredQuestion(
+            source=bank['source'],
+            bank=relative,
+            bank_version=version,
+            position=position,
+            question_id=question['id'],
+            category=bank['category'],
+            role=bank.get('role', ''),
+            language=language,
+            difficulty=question['difficulty'],
+            question=question,
+        ))
+    return rows
+
+
+def sync_question_store(store: Dict[str, Any] = None, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Load a compiled store (the one on disk by default) into StoredQuestion
+
+    Banks whose checksum did not change are left alone; changed banks are
+    replaced (their new version archived) and banks no longer compiled are
+    removed, in one transaction.
+
+    Returns:
+        Counts of banks replaced, banks removed and questions written
+    """
+    if store is None:
+        store = read_store()
+        if store is None:
+            raise ValueError("No compiled question store, run compile_question_banks first")
+
+    stored_versions = dict(StoredQuestion.objects.values_list('bank', 'bank_version').distinct())
+    changed = {
+        relative: bank for relative, bank in store['banks'].items()
+        if stored_versions.get(relative) != bank['checksum'][:16]
+    }
+    removed = [relative for relative in stored_versions if relative not in store['banks']]
+
+    written = 0
+    with transaction.atomic():
+        QuestionBankVersion.objects.bulk_create([
+            QuestionBankVersion(bank=relative, bank_version=bank['checksum'][:16], questions=bank['questions'])
+            for relative, bank in changed.items()
+        ], batch_size=batch_size, ignore_conflicts=True)
+        StoredQuestion.objects.filter(bank__in=list(changed) + removed).delete()
+        for relative, bank in changed.items():
+            rows = StoredQuestion.objects.bulk_create(_stored_questions(relative, bank), batch_size=batch_size)
+            StoredQuestionTag.objects.bulk_create([
+                StoredQuestionTag(question=row, tag=tag[:TAG_MAX_LENGTH])
+                for row in rows for tag in dict.fromkeys(row.question.get('tags', ()))
+            ], batch_size=batch_size, ignore_conflicts=True)
+            written += len(rows)
+
+    return {'replaced': len(changed), 'removed': len(removed), 'questions': written}
+
+
+_archive_lock = threading.Lock()
+_archived_versions = set()
+_archived_banks: Dict[Tuple[str, str], tuple] = {}
+
+
+def archive_bank_version(bank: str, bank_version: str, questions: Sequence[Dict[str, Any]]):
+    """
+    Archive the questions of a bank version a test or quiz is drawn from
+
+    Each version is written once; later calls in the same process are
+    free.
+    """
+    key = (bank, bank_version)
+    if key in _archived_versions:
+        return
+    try:
+        QuestionBankVersion.objects.bulk_create(
+            [QuestionBankVersion(bank=bank, bank_version=bank_version, questions=list(questions))],
+            ignore_conflicts=True
+        )
+    except DatabaseError as e:
+        print(f"Warning: Could not archive question bank {bank} version {bank_version} - {e}")
+        return
+    with _archive_lock:
+        _archived_versions.add(key)
+
+
+def archived_questions(bank: str, bank_version: str) -> Optional[tuple]:
+    """Questions of an archived bank version, or None if it was never archived"""
+    key = (bank, bank_version)
+    questions = _archived_banks.get(key)
+    if questions is not None:
+        return questions
+    try:
+        stored = QuestionBankVersion.objects.filter(bank=bank, bank_version=bank_version).values_list(
+            'questions', flat=True
+        ).first()
+    except DatabaseError as e:
+        print(f"Warning: Could not read question bank {bank} version {bank_version} - {e}")
+        return None
+    if stored is None:
+        return None
+    questions = tuple(stored)
+    with _archive_lock:
+        if len(_archived_banks) >= ARCHIVED_BANK_CACHE_SIZE:
+            _archived_banks.clear()
+        _archived_banks[key] = questions
+        _archived_versions.add(key)
+    return questions
+
+
+def recent_exam_questions(user, bank: str = None, attempts: int = RECENT_ATTEMPTS) -> List[int]:
+    """StoredQuestion ids of the test-system questions in a user's last attempts"""
+    if user is None or attempts <= 0:
+        return []
+    recent = ExamAttempt.objects.filter(user=user)
+    if bank is not None:
+        recent = recent.filter(question_file=bank)
+    try:
+        condition = Q()
+        for question_file, positions in recent.order_by('-created_at').values_list('question_file', 'question_ids')[:attempts]:
+            condition |= Q(bank=question_file, position__in=positions or [])
+        if not condition:
+            return []
+        return list(StoredQuestion.objects.filter(condition).values_list('id', flat=True))
+    except DatabaseError as e:
+        print(f"Warning: Could not read recent test questions - {e}")
+        return []
+
+
+def recent_quiz_questions(user, attempts: int = RECENT_ATTEMPTS) -> List[int]:
+    """StoredQuestion ids of the role quiz questions answered in a user's last quizzes"""
+    if user is None or attempts <= 0:
+        return []
+    try:
+        quiz_ids = list(RoleQuiz.objects.filter(user=user).order_by('-created_at').values_list('id', flat=True)[:attempts])
+        if not quiz_ids:
+            return []
+        question_ids = QuizResponse.objects.filter(quiz_id__in=quiz_ids).values('session_question_id')
+        return list(
+            StoredQuestion.objects.filter(source='quiz', question_id__in=question_ids).values_list('id', flat=True)
+        )
+    except DatabaseError as e:
+        print(f"Warning: Could not read recent quiz questions - {e}")
+        return []
+
+
+def sample_questions(count: int, *, source: str = None, bank: str = None, bank_version: str = None,
+                     category: str = None, role: str = None, language: str = None, difficulty: str = None,
+                     tags: Sequence[str] = None, mix: Dict[str, int] = None, exclude: Iterable[int] = (),
+                     stats: Dict[str, tuple] = None, rng: random.Random = None) -> List[StoredQuestion]:
+    """
+    Draw questions from the store
+
+    Args:
+        count: Number of questions to draw
+        source, bank, bank_version, category, role, language, difficulty: Filters (None = any)
+        tags: Only questions with at least one of these tags
+        mix: Questions per difficulty, e.g. {'easy': 10, 'medium': 15, 'hard': 5};
+            shortfalls are made up from the other difficulties
+        exclude: StoredQuestion ids to leave out while enough others remain,
+            see recent_exam_questions() and recent_quiz_questions()
+        stats: Item statistics (question id -> responses, p_value, discrimination);
+            without a mix, spreads the draw over measured difficulty
+        rng: Random source
+
+    Returns:
+        The drawn StoredQuestion rows, in draw order (empty if nothing matches)
+    """
+    rng = rng or random
+    rows = StoredQuestion.objects.all()
+    for field, value in (('source', source), ('bank', bank), ('bank_version', bank_version),
+                         ('category', category), ('role', role), ('language', language),
+                         ('difficulty', difficulty)):
+        if value is not None:
+            rows = rows.filter(**{field: value})
+    if tags:
+        rows = rows.filter(tag_rows__tag__in=list(tags)).distinct()
+
+    # Only index columns are read to pick the questions
+    candidates = [
+        {'pk': pk, 'id': question_id, 'difficulty': level}
+        for pk, question_id, level in rows.order_by('id').values_list('id', 'question_id', 'difficulty')
+    ]
+    excluded = set(exclude or ())
+    if excluded:
+        fresh = [c for c in candidates if c['pk'] not in excluded]
+        if len(fresh) >= count:
+            candidates = fresh
+        else:
+            # Not enough unseen questions: top up with previously seen ones
+            seen = [c for c in candidates if c['pk'] in excluded]
+            rng.shuffle(seen)
+            candidates = fresh + seen[:count - len(fresh)]
+
+    if len(candidates) <= count:
+        picked = list(candidates)
+    elif mix:
+        picked = _sample_mix(candidates, count, mix, rng)
+    elif stats:
+        picked = balanced_sample(candidates, count, stats, rng)
+    else:
+        picked = rng.sample(candidates, count)
+
+    by_pk = StoredQuestion.objects.in_bulk([c['pk'] for c in picked])
+    return [by_pk[c['pk']] for c in picked if c['pk'] in by_pk]
+
+
+def _sample_mix(candidates: List[Dict[str, Any]], count: int, mix: Dict[str, int],
+                rng: random.Random) -> List[Dict[str, Any]]:
+    pools: Dict[str, list] = {}
+    for candidate in candidates:
+        pools.setdefault(candidate['difficulty'], []).append(candidate)
+    for pool in pools.values():
+        rng.shuffle(pool)
+
+    picked = []
+    for level, wanted in mix.items():
+        pool = pools.get(level, [])
+        take = min(wanted, len(pool), count - len(picked))
+        picked.extend(pool[:take])
+        del pool[:take]
+
+    leftovers = [c for pool in pools.values() for c in pool]
+    rng.shuffle(leftovers)
+    picked.extend(leftovers[:count - len(picked)])
+    return picked
+
@@ -8,6 +8,7 @@ urlpatterns = [
     path('start-initial/<str:category>/', views.start_initial_assessment, name='start_initial'),
     path('interface/', views.exam_interface, name='exam_interface'),
     path('api/questions/', views.get_test_data, name='get_questions'),
+    path('save-progress/', views.save_progress, name='save_progress'),
     path('submit/', views.submit_test, name='submit_test'),
     path('results/', views.exam_results, name='exam_results'),
 ]
@@ -1,120 +1,21 @@
 import json
-import random
-import os
-import re
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
 from django.http import JsonResponse, HttpResponse
-from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.views.decorators.http import require_http_methods
-from django.conf import settings
 from django.contrib import messages
-from personalizedplan.models import WeeklyPlan, AssessmentResult, WeakTopicDiagnosis, UserXP, XPReward, PersonalizedPlan, DailyTask, AssessmentSession
+from personalizedplan.models import WeeklyPlan, AssessmentResult, WeakTopicDiagnosis, UserXP, XPReward, PersonalizedPlan, DailyTask, AssessmentSession, ExamAttempt
 from resumeanalysis.models import TestAttempt
 from users.models import UserRegistration
 from personalizedplan.views import session_login_required
+from .exam_state import new_exam_state, current_exam_questions, attempt_results, grade_exam, question_text
+from .exam_progress import PROGRESS_SYNC_INTERVAL, parse_changes, record_progress, saved_progress, submit_progress
+from .question_catalog import get_question_catalog
 
 def get_questions_file_path(topic):
     """Helper to find the most relevant question file based on topic"""
-    base_dir = os.path.join(str(settings.BASE_DIR), 'mocktestdata', 'questions')
-    topic_lower = topic.lower()
-    
-    # Mapping of common topics to file paths
-    mapping = {
-        'python': ('languages', 'python', 'python_fundamentals.json'),
-        'java': ('languages', 'java', 'java_core.json'),
-        'javascript': ('languages', 'javascript', 'javascript_es6.json'),
-        'cpp': ('languages', 'cpp', 'cpp_stl.json'),
-        'frontend': ('roles', 'frontend', 'frontend_html_css.json'),
-        'html': ('roles', 'frontend', 'frontend_html_css.json'),
-        'css': ('roles', 'frontend', 'frontend_html_css.json'),
-        'react': ('roles', 'frontend', 'frontend_html_css.json'), # React specifically fallback to frontend
-        'backend': ('roles', 'backend', 'backend_django.json'),
-        'django': ('roles', 'backend', 'backend_django.json'),
-        'node': ('roles', 'backend', 'backend_nodejs.json'),
-        'sql': ('roles', 'backend', 'backend_django.json'), # SQL fallback
-        'datascience': ('roles', 'datascience', 'datascience_python.json'),
-        'data science': ('roles', 'datascience', 'datascience_python.json'),
-        'devops': ('roles', 'devops', 'devops_docker.json'),
-        'fullstack': ('roles', 'backend', 'backend_django.json'), # Fullstack fallback to backend
-    }
-    
-    # Priority check for exact matches first
-    if topic_lower in mapping:
-        return os.path.join(base_dir, *mapping[topic_lower])
-    
-    # Try direct mapping with partial match
-    for key, path_tuple in mapping.items():
-        if key in topic_lower:
-            return os.path.join(base_dir, *path_tuple)
-            
-    # Fallback: Search for file with matching name
-    for root, dirs, files in os.walk(base_dir):
-        for file in files:
-            if topic_lower in file.lower():
-                return os.path.join(root, file)
-                
-    # Default fallback
-    return os.path.join(base_dir, 'languages', 'python', 'python_fundamentals.json')
-
-def parse_questions(content, file_ext='.json'):
-    """Parse questions from file content"""
-    if file_ext == '.json':
-        try:
-            data = json.loads(content)
-            # Handle different JSON structures
-            if isinstance(data, list):
-                return data
-            elif isinstance(data, dict) and 'questions' in data:
-                return data['questions']
-            else:
-                return []
-        except json.JSONDecodeError:
-            return []
-    else:
-        # Text file parsing (legacy format support)
-        questions = []
-        lines = content.split('\n')
-        current_question = None
-        
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('View Answer') or line.startswith('Explanation:'):
-                continue
-                
-            if re.match(r'^\d+\.\s*', line):
-                if current_question and current_question['question'] and current_question['options']:
-                    questions.append(current_question)
-                
-                question_text = re.sub(r'^\d+\.\s*', '', line)
-                current_question = {
-                    'question': question_text,
-                    'options': [],
-                    'correct': None
-                }
-                
-            elif re.match(r'^[a-dA-D]\)\s*', line) or re.match(r'^[+-]\s*', line):
-                if current_question:
-                    option_text = re.sub(r'^[a-dA-D]\)\s*', '', line).strip()
-                    option_text = re.sub(r'^[+-]\s*', '', option_text).strip()
-                    current_question['options'].append(option_text)
-                    
-            elif line.lower().startswith('correct answer:') or line.lower().startswith('answer:'):
-                if current_question:
-                    answer_text = re.sub(r'.*correct answer:\s*', '', line, flags=re.IGNORECASE)
-                    answer_text = re.sub(r'.*answer:\s*', '', answer_text, flags=re.IGNORECASE)
-                    answer_text = answer_text.strip().upper()
-                    
-                    if answer_text == 'A': current_question['correct'] = 0
-                    elif answer_text == 'B': current_question['correct'] = 1
-                    elif answer_text == 'C': current_question['correct'] = 2
-                    elif answer_text == 'D': current_question['correct'] = 3
-                    elif answer_text.isdigit(): current_question['correct'] = int(answer_text) - 1
-        
-        if current_question and current_question['question'] and current_question['options']:
-            questions.append(current_question)
-        
-        return questions
+    return get_question_catalog().resolve(topic)
 
 @session_login_required
 def start_initial_assessment(request, category):
@@ -141,24 +42,16 @@ def start_initial_assessment(request, category):
     # Find appropriate question file
     file_path = get_questions_file_path(category)
     
-    if not os.path.exists(file_path):
+    if get_question_catalog().get(file_path) is None:
         messages.error(request, "Assessment content not found.")
         return redirect('personalizedplan:start')
         
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            _, ext = os.path.splitext(file_path)
-            questions = parse_questions(content, ext)
-            
-        # Select 30 random questions or all if less than 30
-        if not questions:
-            raise ValueError("No questions found in the selected file.")
-            
-        selected_questions = questions if len(questions) <= 30 else random.sample(questions, 30)
-        
-        # Store in session
-        request.session['current_test_questions'] = selected_questions
+        # Select 30 random questions or all if less than 30; only their indexes go in the session
+        request.session['current_test_state'] = new_exam_state(
+            file_path, user=UserRegistration.objects.filter(userid=request.session.get('userid')).first()
+        )
+        request.session.pop('current_test_questions', None)
         request.session['current_test_context'] = {
             'type': 'initial_assessment',
             'id': 'initial',
@@ -188,24 +81,16 @@ def start_weekly_test(request, week_id):
     # Find appropriate question file
     file_path = get_questions_file_path(week_plan.skill_focus)
     
-    if not os.path.exists(file_path):
+    if get_question_catalog().get(file_path) is None:
         messages.error(request, "Test content not found.")
         return redirect('personalizedplan:plan_detail', plan_id=week_plan.personalized_plan.id)
         
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            _, ext = os.path.splitext(file_path)
-            questions = parse_questions(content, ext)
-            
-        # Select 30 random questions or all if less than 30
-        if not questions:
-            raise ValueError("No questions found in the selected file.")
-
-        selected_questions = questions if len(questions) <= 30 else random.sample(questions, 30)
-        
-        # Store in session
-        request.session['current_test_questions'] = selected_questions
+        # Select 30 random questions or all if less than 30; only their indexes go in the session
+        request.session['current_test_state'] = new_exam_state(
+            file_path, user=UserRegistration.objects.filter(userid=request.session.get('userid')).first()
+        )
+        request.session.pop('current_test_questions', None)
         request.session['current_test_context'] = {
             'type': 'weekly',
             'id': str(week_id),
@@ -221,20 +106,57 @@ def start_weekly_test(request, week_id):
         return redirect('personalizedplan:plan_detail', plan_id=week_plan.personalized_plan.id)
 
 @session_login_required
+@ensure_csrf_cookie
 def exam_interface(request):
     """Render the exam interface"""
     test_context = request.session.get('current_test_context')
-    questions = request.session.get('current_test_questions')
+    questions = current_exam_questions(request.session)
     
     if not test_context or not questions:
         messages.error(request, "No active test found. Please start an assessment from the beginning.")
         return redirect('personalizedplan:start')
         
+    # Answers autosaved before a reload are restored on the page
+    attempt = (request.session.get('current_test_state') or {}).get('attempt')
+    progress = saved_progress(attempt, len(questions)) if attempt else {'answers': [], 'seq': 0}
+        
     return render(request, 'personalizedplan/testsystem/exam_interface.html', {
         'test_context': test_context,
-        'questions_json': json.dumps(questions)
+        'questions_json': json.dumps(questions),
+        'progress_json': json.dumps({
+            'attempt': attempt,
+            'seq': progress['seq'],
+            'answers': progress['answers'],
+            'interval': PROGRESS_SYNC_INTERVAL,
+        }),
     })
 
+@session_login_required
+@require_http_methods(["POST"])
+def save_progress(request):
+    """Apply the answer changes posted by the exam page since its last acknowledged save"""
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+
+    state = request.session.get('current_test_state') or {}
+    attempt = state.get('attempt')
+    if not attempt or data.get('attempt') != attempt:
+        return JsonResponse({'status': 'error', 'message': 'No active test found'}, status=409)
+    try:
+        seq = int(data.get('seq'))
+    except (TypeError, ValueError):
+        return JsonResponse({'status': 'error', 'message': 'Invalid sequence number'}, status=400)
+
+    acked = record_progress(
+        attempt, seq, parse_changes(data.get('changes'), len(state.get('ids', []))),
+        user=request.user, question_file=state.get('file', '')
+    )
+    if acked is None:
+        return JsonResponse({'status': 'error', 'message': 'Progress not saved'}, status=409)
+    return JsonResponse({'status': 'success', 'seq': acked})
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def submit_test(request):
@@ -242,59 +164,54 @@ def submit_test(request):
     try:
         data = json.loads(request.body)
         user_answers = data.get('answers', [])
-        questions = request.session.get('current_test_questions', [])
+        questions = current_exam_questions(request.session) or []
         test_context = request.session.get('current_test_context')
         
         if not questions or not test_context:
             return JsonResponse({'status': 'error', 'message': 'Session expired'}, status=400)
             
-        # Calculate results
-        correct_count = 0
-        total_questions = len(questions)
-        results = []
-        
-        for i, question in enumerate(questions):
-            user_answer = user_answers[i] if i < len(user_answers) else None
-            correct_answer = question.get('correct_answer')
-            is_correct = user_answer == correct_answer
-            
-            if is_correct:
-                correct_count += 1
-                
-            results.append({
-                'question_number': i + 1,
-                'question': question.get('question_text', question.get('question', '')),
-                'is_correct': is_correct,
-                'user_answer': user_answer,
-                'correct_answer': correct_answer,
-                'tags': question.get('tags', [])
-            })
+        # Grade against the question file's cached answer key
+        state = request.session.get('current_test_state') or {}
+        if state.get('attempt') and data.get('attempt') == state['attempt']:
+            # The autosaved answers plus the page's unsaved changes are the submitted answers
+            try:
+                seq = int(data.get('seq'))
+            except (TypeError, ValueError):
+                seq = 0
+            saved = submit_progress(state['attempt'], seq, parse_changes(data.get('changes'), len(questions)), len(questions))
+            if saved is not None:
+                user_answers = saved
+        grade = grade_exam(state, questions, user_answers)
+        correct_count = grade.correct_count
+        total_questions = grade.total
+        missed_questions = [question_text(questions[i]) for i in grade.wrong_positions()]
             
         # Calculate score
-        score_percentage = (correct_count / total_questions) * 100 if total_questions > 0 else 0
+        score_percentage = grade.percentage
         
         # Determine pass/fail (70% threshold)
         passed = score_percentage >= 70
-        message = "Test Passed!" if passed else "Test Failed. Keep practicing!"
         
-        # Save results to session for the results page
-        request.session['exam_results'] = {
-            'type': test_context.get('type', 'weekly'),
-            'total_questions': total_questions,
-            'correct_answers': correct_count,
-            'wrong_answers': total_questions - correct_count,
-            'score_percentage': score_percentage,
-            'topic': test_context.get('title', 'Weekly Test'),
-            'passed': passed,
-            'message': message,
-            'results_detail': results,
-            'is_revised': False,  # Default
-        }
+        # Save graded answers for the results page; the session only keeps the attempt id
+        attempt = ExamAttempt.objects.create(
+            user=UserRegistration.objects.filter(userid=request.session.get('userid')).first(),
+            test_type=test_context.get('type', 'weekly'),
+            title=test_context.get('title', 'Weekly Test'),
+            question_file=state.get('file', ''),
+            bank_version=state.get('version', ''),
+            question_ids=state.get('ids', []),
+            answers=[user_answers[i] if i < len(user_answers) else None for i in range(total_questions)],
+            correct_mask=grade.correct_mask,
+            total_questions=total_questions,
+            correct_answers=correct_count,
+            score_percentage=score_percentage,
+            passed=passed,
+        )
+        request.session['exam_results'] = {'attempt_id': str(attempt.id)}
         
         # Save to database
         try:
             # Get UserRegistration correctly from session userid
-            from users.models import UserRegistration
             user_reg = get_object_or_404(UserRegistration, userid=request.session.get('userid'))
             
             if test_context.get('type') == 'initial_assessment':
@@ -381,23 +298,15 @@ def submit_test(request):
                 week_plan.extra_days_added += extra_days
                 
                 # Create WeakTopicDiagnosis
-                # Extract failed topics from tags
-                failed_tags = []
-                for res in results:
-                    if not res['is_correct'] and res.get('tags'):
-                        failed_tags.extend(res['tags'])
-                
-                # Count and sort most frequent failed tags
-                from collections import Counter
-                tag_counts = Counter(failed_tags)
-                top_failed_topics = [tag for tag, count in tag_counts.most_common(3)]
+                # Most frequent tags of the missed questions, counted while grading
+                top_failed_topics = grade.weak_tags(3)
                 
                 weak_details = {
                     'focus_area': test_context.get('title', 'Weekly Test'),
                     'score': f"{score_percentage:.1f}%",
                     'threshold': "70%",
                     'suggestion': f"Focus on these key areas: {', '.join(top_failed_topics) if top_failed_topics else 'General Review'}.",
-                    'missed_concepts': [q['question'][:50] + "..." for q in results if not q['is_correct']][:5],
+                    'missed_concepts': [text[:50] + "..." for text in missed_questions][:5],
                     'top_topics': top_failed_topics
                 }
                 
@@ -419,8 +328,7 @@ def submit_test(request):
                         task_topic = f"Revised Plan Day {i+1}: {current_topic.replace('-', ' ').title()} Mastery"
                         task_desc = f"REVISED STUDY PLAN: Deep dive into {current_topic.replace('-', ' ')}. This area showed weakness in your last test. Review documentation and practice coding examples."
                     else:
-                        missed_qs = [q['question'] for q in results if not q['is_correct']]
-                        focus_q = missed_qs[i % len(missed_qs)] if missed_qs else "General Review"
+                        focus_q = missed_questions[i % len(missed_questions)] if missed_questions else "General Review"
                         task_topic = f"Revised Plan Day {i+1}: {test_context.get('title', 'Weekly Test')} Focus"
                         task_desc = f"REVISED STUDY PLAN: Deep dive into concepts you missed. Focus on: {focus_q[:120]}..."
                     
@@ -438,14 +346,14 @@ def submit_test(request):
                 week_plan.status = 'failed'
                 week_plan.save()
                 
-                # Update session for results page feedback
-                request.session['exam_results'].update({
+                # Store feedback for the results page
+                attempt.feedback = {
                     'is_revised': True,
                     'extra_days': extra_days,
                     'revised_tasks': revised_tasks,
                     'diagnosis': weak_details
-                })
-                request.session.modified = True
+                }
+                attempt.save(update_fields=['feedback'])
                 
                 # Effort XP
                 xp_amount = correct_count * 5
@@ -473,7 +381,7 @@ def submit_test(request):
 @session_login_required
 def get_test_data(request):
     """API to get current test questions for the frontend"""
-    questions = request.session.get('current_test_questions')
+    questions = current_exam_questions(request.session)
     context = request.session.get('current_test_context')
     
     if not questions or not context:
@@ -487,9 +395,11 @@ def get_test_data(request):
 @session_login_required
 def exam_results(request):
     """Render the results page"""
-    results = request.session.get('exam_results')
-    if not results:
+    attempt_id = (request.session.get('exam_results') or {}).get('attempt_id')
+    attempt = ExamAttempt.objects.filter(id=attempt_id).first() if attempt_id else None
+    if not attempt:
         return redirect('personalizedplan:dashboard')
+    results = attempt_results(attempt)
         
     return render(request, 'personalizedplan/testsystem/results.html', {
         'results': results
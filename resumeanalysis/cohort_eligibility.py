@@ -0,0 +1,280 @@
+"""
+Cohort eligibility for placement cells.
+
+Loads the latest completed quiz (and the resume analysis it was taken
+with) of every student in a cell into NumPy arrays and scores all
+students against all roles at once, using the same 40/60 resume/quiz
+weighting and role relevance weights as EligibilityCalculator. Reports
+are cached per cell and recomputed only when a student of the cell
+completes another quiz.
+"""
+import csv
+import io
+import threading
+from typing import Any, Dict, Sequence
+
+import numpy as np
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from Careerlytics.models import PlacementCellStudent
+from users.models import UserRegistration
+from .eligibility_calculator import (
+    ELIGIBILITY_THRESHOLD, QUIZ_WEIGHT, RECOMMENDATION_THRESHOLD, RESUME_WEIGHT, ROLE_RELEVANCE,
+)
+from .models import RoleQuiz
+from .skill_taxonomy import SkillIndex, get_skill_index
+
+# Alternative roles recommended per student
+MAX_RECOMMENDATIONS = 3
+
+
+class CohortEligibility:
+    """Vectorized students x roles eligibility and recommendation scoring"""
+
+    def __init__(self, taxonomy: SkillIndex = None):
+        role_weights = (taxonomy or get_skill_index()).role_weights
+        self.roles = tuple(role_weights)
+        role_index = {role: i for i, role in enumerate(self.roles)}
+
+        # Role skill incidence (skills x roles)
+        self.skill_index = {}
+        for config in role_weights.values():
+            for skill in config['skills']:
+                self.skill_index.setdefault(skill, len(self.skill_index))
+        self.role_skills = np.zeros((len(self.skill_index), len(self.roles)), dtype=np.float64)
+        for j, config in enumerate(role_weights.values()):
+            for skill in set(config['skills']):
+                self.role_skills[self.skill_index[skill], j] = 1.0
+        self.role_skill_counts = self.role_skills.sum(axis=0)
+
+        # alternatives[i, j]: role j is an alternative for students targeting role i
+        self.alternatives = np.zeros((len(self.roles), len(self.roles)), dtype=bool)
+        for i, config in enumerate(role_weights.values()):
+            for alt_role in config['alternative_roles']:
+                if alt_role in role_index:
+                    self.alternatives[i, role_index[alt_role]] = True
+
+        relevance = [ROLE_RELEVANCE.get(role, ROLE_RELEVANCE['frontend']) for role in self.roles]
+        self.general_weight = np.array([r['general_ability'] for r in relevance], dtype=np.float64)
+        self.tech_weight = np.array([r['tech_fundamentals'] for r in relevance], dtype=np.float64)
+        self.role_weight = np.array([r['role_specific'] for r in relevance], dtype=np.float64)
+
+        self._role_index = role_index
+
+    def skill_matrix(self, skill_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """Student x skill incidence for the skills any role asks for"""
+        skill_index = self.skill_index
+        rows, columns = [], []
+        for i, skills in enumerate(skill_lists):
+            for skill in skills or ():
+                column = skill_index.get(skill)
+                if column is not None:
+                    rows.append(i)
+                    columns.append(column)
+        matrix = np.zeros((len(skill_lists), len(skill_index)), dtype=np.float64)
+        matrix[rows, columns] = 1.0
+        return matrix
+
+    def compute(self, ats: np.ndarray, general: np.ndarray, tech: np.ndarray, role_specific: np.ndarray,
+                total: np.ndarray, target_roles: Sequence[str], student_skills: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Score every student against every role
+
+        Args:
+            ats, general, tech, role_specific, total: Per-student scores (0-100)
+            target_roles: Role each student's quiz targeted
+            student_skills: Output of skill_matrix()
+
+        Returns:
+            Dict of arrays: target_eligibility and is_eligible (students,),
+            eligibility and match (students x roles), recommended
+            (students x MAX_RECOMMENDATIONS role indexes, -1 for none)
+        """
+        n = len(ats)
+        ats, general, tech, role_specific, total = (
+            np.asarray(a, dtype=np.float64) for a in (ats, general, tech, role_specific, total)
+        )
+        target = np.fromiter((self._role_index.get(role, -1) for role in target_roles), dtype=np.int64, count=n)
+        has_target = target >= 0
+        is_target = np.zeros((n, len(self.roles)), dtype=bool)
+        is_target[np.flatnonzero(has_target), target[has_target]] = True
+
+        # Skill overlap as a percentage of each role's skill list
+        overlap = student_skills @ self.role_skills
+        counts = np.where(self.role_skill_counts > 0, self.role_skill_counts, 1.0)
+        skill_match = np.where(self.role_skill_counts > 0, overlap / counts * 100, 0.0)
+
+        # Quiz adjustment: the real role score for the target role, skill match as proxy elsewhere
+        role_score = np.where(is_target, role_specific[:, None], skill_match)
+        adjustment = (
+            general[:, None] * self.general_weight +
+            tech[:, None] * self.tech_weight +
+            role_score * self.role_weight
+        )
+
+        target_eligibility = ats * RESUME_WEIGHT + total * QUIZ_WEIGHT
+        eligibility = ats[:, None] * RESUME_WEIGHT + adjustment * QUIZ_WEIGHT
+        eligibility[is_target] = np.repeat(target_eligibility, is_target.sum(axis=1))
+
+        match = np.round(np.minimum(100, skill_match * 0.4 + adjustment * 0.6), 1)
+
+        candidates = np.zeros_like(is_target)
+        candidates[has_target] = self.alternatives[target[has_target]]
+        candidates &= match >= RECOMMENDATION_THRESHOLD
+        ranked = np.argsort(np.where(candidates, -match, np.inf), axis=1, kind='stable')
+        ranked = ranked[:, :MAX_RECOMMENDATIONS]
+        recommended = np.where(np.take_along_axis(candidates, ranked, axis=1), ranked, -1)
+
+        return {
+            'target_eligibility': target_eligibility,
+            'is_eligible': target_eligibility >= ELIGIBILITY_THRESHOLD,
+            'eligibility': eligibility,
+            'match': match,
+            'recommended': recommended,
+        }
+
+
+def warning_levels(eligibility: np.ndarray) -> np.ndarray:
+    """Vectorized EligibilityCalculator._get_warning_level"""
+    return np.select(
+        [eligibility >= 75, eligibility >= ELIGIBILITY_THRESHOLD],
+        ['Low Risk - job ready', 'Medium Risk - trainable'],
+        default='High Risk - career mismatch'
+    )
+
+
+def _cell_users(placement_cell):
+    members = list(
+        PlacementCellStudent.objects.filter(placement_cell=placement_cell, is_active=True)
+        .values_list('student_id', 'email')
+    )
+    student_ids = [sid for sid, _ in members if sid]
+    emails = [email for _, email in members if email]
+    return UserRegistration.objects.filter(Q(student_id__in=student_ids) | Q(email__in=emails)).values('pk')
+
+
+def _completed_quizzes(placement_cell):
+    return RoleQuiz.objects.filter(
+        user__in=_cell_users(placement_cell), status='completed', resume_analysis__isnull=False
+    )
+
+
+def build_cohort_report(placement_cell, taxonomy: SkillIndex = None) -> Dict[str, Any]:
+    """Eligibility of every student of a cell (by their latest completed quiz) for every role"""
+    rows = (
+        _completed_quizzes(placement_cell)
+        .order_by('user_id', 'completed_at')
+        .values_list(
+            'user_id', 'user__userid', 'user__email', 'target_role',
+            'general_ability_score', 'tech_fundamentals_score', 'role_specific_score', 'total_score',
+            'resume_analysis__ats_score', 'resume_analysis__skills_extracted',
+        )
+    )
+    # Ordered by completion, so each student's latest quiz wins
+    latest = {row[0]: row for row in rows.iterator()}
+    students = list(latest.values())
+
+    engine = CohortEligibility(taxonomy)
+    columns = list(zip(*students)) if students else [()] * 10
+    result = engine.compute(
+        ats=np.array(columns[8], dtype=np.float64),
+        general=np.array(columns[4], dtype=np.float64),
+        tech=np.array(columns[5], dtype=np.float64),
+        role_specific=np.array(columns[6], dtype=np.float64),
+        total=np.array(columns[7], dtype=np.float64),
+        target_roles=columns[3],
+        student_skills=engine.skill_matrix(columns[9]),
+    )
+
+    roles = engine.roles
+    target_eligibility = np.round(result['target_eligibility'], 1).tolist()
+    is_eligible = result['is_eligible'].tolist()
+    levels = warning_levels(result['target_eligibility']).tolist()
+    eligibility = np.round(result['eligibility'], 1).tolist()
+    match = result['match'].tolist()
+    recommended = result['recommended'].tolist()
+
+    report_rows = []
+    for i, student in enumerate(students):
+        report_rows.append({
+            'user_id': student[0],
+            'userid': student[1],
+            'email': student[2],
+            'target_role': student[3],
+            'ats_score': student[8],
+            'quiz_score': student[7],
+            'target_eligibility': target_eligibility[i],
+            'is_eligible': is_eligible[i],
+            'warning_level': levels[i],
+            'eligibility': dict(zip(roles, eligibility[i])),
+            'match': dict(zip(roles, match[i])),
+            'recommended_roles': [roles[j] for j in recommended[i] if j >= 0],
+        })
+
+    eligible_by_role = (result['eligibility'] >= ELIGIBILITY_THRESHOLD).sum(axis=0).tolist()
+    mean_by_role = (
+        np.round(result['eligibility'].mean(axis=0), 1).tolist() if students else [0.0] * len(roles)
+    )
+    return {
+        'placement_cell_id': placement_cell.pk,
+        'generated_at': timezone.now().isoformat(),
+        'roles': list(roles),
+        'total_students': len(students),
+        'summary': {
+            role: {'eligible': eligible_by_role[j], 'mean_eligibility': mean_by_role[j]}
+            for j, role in enumerate(roles)
+        },
+        'students': report_rows,
+    }
+
+
+_reports: Dict[Any, tuple] = {}
+_reports_lock = threading.Lock()
+
+
+def _report_signature(placement_cell, taxonomy_version: str):
+    stats = _completed_quizzes(placement_cell).aggregate(count=Count('id'), latest=Max('completed_at'))
+    return (stats['count'], stats['latest'], taxonomy_version)
+
+
+def get_cohort_report(placement_cell, force: bool = False) -> Dict[str, Any]:
+    """
+    Cached cohort report for a placement cell
+
+    One aggregate query checks whether any quiz was completed since the
+    report was built; the matrix is only recomputed when one was.
+    """
+    taxonomy = get_skill_index()
+    signature = _report_signature(placement_cell, taxonomy.version)
+    cached = _reports.get(placement_cell.pk)
+    if not force and cached is not None and cached[0] == signature:
+        return cached[1]
+
+    report = build_cohort_report(placement_cell, taxonomy)
+    with _reports_lock:
+        _reports[placement_cell.pk] = (signature, report)
+    return report
+
+
+def cohort_report_csv(report: Dict[str, Any]) -> str:
+    """Flatten a cohort report into CSV, one row per student"""
+    roles = report['roles']
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(
+        ['userid', 'email', 'target_role', 'ats_score', 'quiz_score', 'target_eligibility', 'is_eligible',
+         'warning_level'] +
+        [f'eligibility_{role}' for role in roles] +
+        [f'match_{role}' for role in roles] +
+        ['recommended_roles']
+    )
+    for row in report['students']:
+        writer.writerow(
+            [row['userid'], row['email'], row['target_role'], row['ats_score'], row['quiz_score'],
+             row['target_eligibility'], row['is_eligible'], row['warning_level']] +
+            [row['eligibility'][role] for role in roles] +
+            [row['match'][role] for role in roles] +
+            [';'.join(row['recommended_roles'])]
+        )
+    return output.getvalue()
@@ -1,33 +1,53 @@
 import json
 from typing import Dict, List, Tuple, Any
 from .models import ResumeAnalysis, RoleQuiz, RoleEligibility, RecommendedRole
+from .skill_taxonomy import SkillIndex, get_skill_index
+
+# Weighted calculation (40% resume, 60% quiz) per paratoconresume.txt
+RESUME_WEIGHT = 0.4
+QUIZ_WEIGHT = 0.6
+
+# >= 55 is Medium Risk/Trainable per paratoconresume.txt
+ELIGIBILITY_THRESHOLD = 55
+
+# Minimum match percentage for an alternative role to be recommended
+RECOMMENDATION_THRESHOLD = 40
+
+# Map quiz categories to role relevance
+ROLE_RELEVANCE = {
+    'frontend': {
+        'general_ability': 0.3,
+        'tech_fundamentals': 0.3,
+        'role_specific': 0.4
+    },
+    'backend': {
+        'general_ability': 0.3,
+        'tech_fundamentals': 0.3,
+        'role_specific': 0.4
+    },
+    'fullstack': {
+        'general_ability': 0.3,
+        'tech_fundamentals': 0.3,
+        'role_specific': 0.4
+    },
+    'devops': {
+        'general_ability': 0.3,
+        'tech_fundamentals': 0.3,
+        'role_specific': 0.4
+    },
+    'datascience': {
+        'general_ability': 0.3,
+        'tech_fundamentals': 0.3,
+        'role_specific': 0.4
+    }
+}
 
 class EligibilityCalculator:
     """Calculate role eligibility and generate recommendations"""
     
-    def __init__(self):
-        self.role_weights = {
-            'frontend': {
-                'skills': ['html', 'css', 'javascript', 'react', 'vue', 'typescript', 'responsive-design'],
-                'alternative_roles': ['backend', 'fullstack', 'devops', 'datascience']
-            },
-            'backend': {
-                'skills': ['python', 'java', 'nodejs', 'api', 'database', 'microservices'],
-                'alternative_roles': ['frontend', 'fullstack', 'devops', 'datascience']
-            },
-            'fullstack': {
-                'skills': ['html', 'css', 'javascript', 'react', 'python', 'nodejs', 'database', 'api'],
-                'alternative_roles': ['frontend', 'backend', 'devops', 'datascience']
-            },
-            'devops': {
-                'skills': ['docker', 'kubernetes', 'aws', 'ci-cd', 'monitoring', 'infrastructure'],
-                'alternative_roles': ['backend', 'fullstack', 'frontend', 'datascience']
-            },
-            'datascience': {
-                'skills': ['python', 'machine-learning', 'statistics', 'data-analysis', 'pandas', 'numpy'],
-                'alternative_roles': ['backend', 'fullstack', 'frontend', 'devops']
-            }
-        }
+    def __init__(self, taxonomy: SkillIndex = None):
+        # Role skill lists and alternative roles come from the skill taxonomy
+        self.role_weights = (taxonomy or get_skill_index()).role_weights
     
     def calculate_role_eligibility(self, resume_analysis: ResumeAnalysis, quiz: RoleQuiz) -> Dict[str, Any]:
         """
@@ -41,12 +61,12 @@ class EligibilityCalculator:
             Dictionary with eligibility scores and recommendations
         """
         # Weighted calculation (40% resume, 60% quiz) per paratoconresume.txt
-        resume_weighted = resume_analysis.ats_score * 0.4
-        quiz_weighted = quiz.total_score * 0.6
+        resume_weighted = resume_analysis.ats_score * RESUME_WEIGHT
+        quiz_weighted = quiz.total_score * QUIZ_WEIGHT
         total_eligibility = resume_weighted + quiz_weighted
         
         # Determine eligibility (>= 55 is Medium Risk/Trainable per paratoconresume.txt)
-        is_eligible = total_eligibility >= 55
+        is_eligible = total_eligibility >= ELIGIBILITY_THRESHOLD
         
         # Generate recommendations
         recommended_roles = self._generate_recommendations(
@@ -98,7 +118,7 @@ class EligibilityCalculator:
                 user_skills, required_skills, quiz, alt_role, proxy_role_score=skill_match_percentage
             )
             
-            if match_percentage >= 40:  # Only include meaningful recommendations
+            if match_percentage >= RECOMMENDATION_THRESHOLD:  # Only include meaningful recommendations
                 recommendations.append({
                     'role_name': alt_role,
                     'match_percentage': round(match_percentage, 1),
@@ -111,36 +131,7 @@ class EligibilityCalculator:
     
     def _get_quiz_adjustment(self, quiz: RoleQuiz, role: str, proxy_role_score: float = None) -> float:
         """Get quiz performance adjustment for alternative role"""
-        # Map quiz categories to role relevance
-        role_relevance = {
-            'frontend': {
-                'general_ability': 0.3,
-                'tech_fundamentals': 0.3,
-                'role_specific': 0.4
-            },
-            'backend': {
-                'general_ability': 0.3,
-                'tech_fundamentals': 0.3,
-                'role_specific': 0.4
-            },
-            'fullstack': {
-                'general_ability': 0.3,
-                'tech_fundamentals': 0.3,
-                'role_specific': 0.4
-            },
-            'devops': {
-                'general_ability': 0.3,
-                'tech_fundamentals': 0.3,
-                'role_specific': 0.4
-            },
-            'datascience': {
-                'general_ability': 0.3,
-                'tech_fundamentals': 0.3,
-                'role_specific': 0.4
-            }
-        }
-        
-        relevance = role_relevance.get(role, role_relevance['frontend'])
+        relevance = ROLE_RELEVANCE.get(role, ROLE_RELEVANCE['frontend'])
         
         # Use proxy score if provided (for alternative roles), otherwise use actual quiz score
         role_score = proxy_role_score if proxy_role_score is not None else quiz.role_specific_score
@@ -0,0 +1,327 @@
+"""
+Item analysis for quiz and test questions.
+
+Graded responses are streamed one attempt at a time and folded into
+running sums per question: response and correct counts, the sums needed
+for the corrected point-biserial (item score vs. the rest of the
+attempt's score), and how often each wrong option was picked. Only the
+attempts completed since the last run are read, and memory is bounded by
+the number of distinct questions, not the number of responses.
+
+The derived p-values and discrimination are stored in QuestionStat and
+read back by the question samplers through get_question_stats(), which
+is a cached dictionary lookup at request time.
+"""
+import hashlib
+import itertools
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from Careerlytics.models import ReadinessTestResult
+from .models import QuizResponse, TestAnswer, QuestionStat, ItemAnalysisCheckpoint
+
+SOURCES = ('quiz', 'test', 'exam', 'readiness')
+
+# Seconds a process keeps the stats it read before querying again
+STATS_CACHE_SECONDS = 300
+
+# Responses a question needs before its statistics are trusted for selection
+MIN_RESPONSES = 30
+
+# (attempt id, question id, selected option, is correct)
+Response = Tuple[Any, str, Optional[int], bool]
+
+
+class ItemAccumulator:
+    """Running sums for one question"""
+
+    __slots__ = ('responses', 'correct', 'scored_responses', 'scored_correct',
+                 'rest_score_sum', 'rest_score_sq_sum', 'cross_sum', 'wrong_option_counts')
+
+    def __init__(self):
+        self.responses = 0
+        self.correct = 0
+        self.scored_responses = 0
+        self.scored_correct = 0
+        self.rest_score_sum = 0.0
+        self.rest_score_sq_sum = 0.0
+        self.cross_sum = 0.0
+        self.wrong_option_counts = {}
+
+    def add(self, is_correct: bool, selected: Optional[int], rest_score: Optional[float]):
+        x = 1 if is_correct else 0
+        self.responses += 1
+        self.correct += x
+        if not is_correct and selected is not None:
+            key = str(selected)
+            self.wrong_option_counts[key] = self.wrong_option_counts.get(key, 0) + 1
+        if rest_score is not None:
+            self.scored_responses += 1
+            self.scored_correct += x
+            self.rest_score_sum += rest_score
+            self.rest_score_sq_sum += rest_score * rest_score
+            self.cross_sum += x * rest_score
+
+    def merge_into(self, stat: QuestionStat):
+        """Add these sums to a stored QuestionStat and refresh its derived fields"""
+        stat.responses += self.responses
+        stat.correct += self.correct
+        stat.scored_responses += self.scored_responses
+        stat.scored_correct += self.scored_correct
+        stat.rest_score_sum += self.rest_score_sum
+        stat.rest_score_sq_sum += self.rest_score_sq_sum
+        stat.cross_sum += self.cross_sum
+        wrong = dict(stat.wrong_option_counts or {})
+        for option, count in self.wrong_option_counts.items():
+            wrong[option] = wrong.get(option, 0) + count
+        stat.wrong_option_counts = wrong
+        refresh_derived(stat)
+
+
+def refresh_derived(stat: QuestionStat):
+    """Recompute p-value, discrimination and distractor rates from the running sums"""
+    n = stat.responses
+    stat.p_value = round(stat.correct / n, 4) if n else None
+
+    m = stat.scored_responses
+    sx, sy = stat.scored_correct, stat.rest_score_sum
+    var_x = m * sx - sx * sx
+    var_y = m * stat.rest_score_sq_sum - sy * sy
+    if m > 1 and var_x > 0 and var_y > 1e-12:
+        stat.discrimination = round((m * stat.cross_sum - sx * sy) / math.sqrt(var_x * var_y), 4)
+    else:
+        stat.discrimination = None
+
+    stat.distractor_rates = {
+        option: round(count / n, 4) for option, count in (stat.wrong_option_counts or {}).items()
+    } if n else {}
+
+
+def accumulate(responses: Iterable[Response], accumulators: Dict[str, ItemAccumulator]) -> int:
+    """
+    Fold responses, ordered by attempt, into per-question accumulators
+
+    Returns:
+        Number of attempts read
+    """
+    attempts = 0
+    for _, group in itertools.groupby(responses, key=lambda r: r[0]):
+        answers = list(group)
+        attempts += 1
+        k = len(answers)
+        total_correct = sum(1 for r in answers if r[3])
+        for _, question_id, selected, is_correct in answers:
+            acc = accumulators.get(question_id)
+            if acc is None:
+                acc = accumulators[question_id] = ItemAccumulator()
+            # Rest score: the attempt's score on every other question
+            rest = (total_correct - (1 if is_correct else 0)) / (k - 1) if k > 1 else None
+            acc.add(bool(is_correct), selected, rest)
+    return attempts
+
+
+def quiz_responses(since, until, chunk_size: int = 2000) -> Iterator[Response]:
+    """Role quiz responses of quizzes completed in (since, until]"""
+    rows = QuizResponse.objects.filter(quiz__status='completed', quiz__completed_at__lte=until)
+    if since is not None:
+        rows = rows.filter(quiz__completed_at__gt=since)
+    rows = rows.order_by('quiz_id').values_list(
+        'quiz_id', 'session_question_id', 'question_id', 'user_answer', 'is_correct'
+    )
+    for quiz_id, session_question_id, question_id, selected, is_correct in rows.iterator(chunk_size=chunk_size):
+        qid = session_question_id or (str(question_id) if question_id else None)
+        if qid:
+            yield quiz_id, qid, selected, is_correct
+
+
+def test_responses(since, until, chunk_size: int = 2000) -> Iterator[Response]:
+    """Mock/core test answers of attempts completed in (since, until]"""
+    rows = TestAnswer.objects.filter(test_attempt__status='completed', test_attempt__completed_at__lte=until)
+    if since is not None:
+        rows = rows.filter(test_attempt__completed_at__gt=since)
+    rows = rows.order_by('test_attempt_id').values_list(
+        'test_attempt_id', 'question_id', 'selected_answer', 'is_correct'
+    )
+    return rows.iterator(chunk_size=chunk_size)
+
+
+def exam_responses(since, until, chunk_size: int = 500) -> Iterator[Response]:
+    """
+    Answers of test-system exam attempts graded in (since, until]
+
+    An ExamAttempt stores positions within a version of a question file;
+    they are resolved to the catalog question ids through that version,
+    so edited banks keep their statistics per question. Attempts whose
+    file version is no longer available are skipped.
+    """
+    from personalizedplan.models import ExamAttempt
+    from personalizedplan.testsystem.exam_state import bank_questions
+
+    rows = ExamAttempt.objects.filter(created_at__lte=until)
+    if since is not None:
+        rows = rows.filter(created_at__gt=since)
+    rows = rows.order_by('id').values_list(
+        'id', 'question_file', 'bank_version', 'question_ids', 'answers', 'correct_mask'
+    )
+    banks = {}
+    for attempt_id, question_file, version, ids, answers, mask in rows.iterator(chunk_size=chunk_size):
+        key = (question_file, version)
+        if key not in banks:
+            banks[key] = bank_questions(question_file, version)
+        questions = banks[key]
+        if questions is None:
+            continue
+        answers = answers or []
+        for i, position in enumerate(ids or ()):
+            try:
+                qid = questions[position].get('id')
+            except (IndexError, TypeError):
+                continue
+            if not qid:
+                continue
+            selected = answers[i] if i < len(answers) else None
+            yield attempt_id, str(qid), selected if type(selected) is int else None, mask[i:i + 1] == '1'
+
+
+def readiness_question_id(answer: Dict[str, Any]) -> Optional[str]:
+    """Readiness answers carry the question text; fall back to a hash of it when there is no id"""
+    qid = answer.get('question_id') or answer.get('id')
+    if qid:
+        return str(qid)
+    text = answer.get('question_text') or answer.get('text')
+    if not text:
+        return None
+    return 'q_' + hashlib.sha1(text.strip().encode('utf-8')).hexdigest()[:16]
+
+
+def readiness_responses(since, until, chunk_size: int = 200) -> Iterator[Response]:
+    """Answers stored in the JSON of readiness results completed in (since, until]"""
+    rows = ReadinessTestResult.objects.filter(completed_at__lte=until)
+    if since is not None:
+        rows = rows.filter(completed_at__gt=since)
+    rows = rows.order_by('id').values_list('id', 'answers')
+    for result_id, answers in rows.iterator(chunk_size=chunk_size):
+        if isinstance(answers, dict):
+            answers = answers.values()
+        for answer in answers or ():
+            if not isinstance(answer, dict):
+                continue
+            qid = readiness_question_id(answer)
+            if qid is None:
+                continue
+            selected = answer.get('selected_index')
+            is_correct = answer.get('is_correct')
+            if is_correct is None:
+                is_correct = selected is not None and str(selected) == str(answer.get('correct_index'))
+            yield result_id, qid, int(selected) if str(selected).isdigit() else None, bool(is_correct)
+
+
+RESPONSE_STREAMS = {
+    'quiz': quiz_responses,
+    'test': test_responses,
+    'exam': exam_responses,
+    'readiness': readiness_responses,
+}
+
+
+def save_accumulators(source: str, accumulators: Dict[str, ItemAccumulator], batch_size: int = 500):
+    """Merge accumulated sums into the stored QuestionStat rows"""
+    question_ids = list(accumulators)
+    for start in range(0, len(question_ids), batch_size):
+        batch = question_ids[start:start + batch_size]
+        existing = {
+            stat.question_id: stat
+            for stat in QuestionStat.objects.filter(source=source, question_id__in=batch)
+        }
+        to_create, to_update = [], []
+        for question_id in batch:
+            stat = existing.get(question_id)
+            if stat is None:
+                stat = QuestionStat(source=source, question_id=question_id)
+                to_create.append(stat)
+            else:
+                to_update.append(stat)
+            accumulators[question_id].merge_into(stat)
+
+        QuestionStat.objects.bulk_create(to_create)
+        QuestionStat.objects.bulk_update(to_update, [
+            'responses', 'correct', 'scored_responses', 'scored_correct', 'rest_score_sum',
+            'rest_score_sq_sum', 'cross_sum', 'wrong_option_counts', 'p_value', 'discrimination',
+            'distractor_rates', 'updated_at',
+        ])
+
+
+def analyze_source(source: str, rebuild: bool = False, chunk_size: int = 2000) -> Dict[str, int]:
+    """
+    Fold a source's newly completed attempts into its question statistics
+
+    Args:
+        source: 'quiz', 'test', 'exam' or 'readiness'
+        rebuild: Drop the stored statistics and re-read every attempt
+        chunk_size: Rows fetched per database round trip
+
+    Returns:
+        Counts of attempts read and questions updated
+    """
+    until = timezone.now()
+    checkpoint = ItemAnalysisCheckpoint.objects.filter(source=source).first()
+    since = None if rebuild or checkpoint is None else checkpoint.processed_until
+
+    accumulators: Dict[str, ItemAccumulator] = {}
+    attempts = accumulate(RESPONSE_STREAMS[source](since, until, chunk_size=chunk_size), accumulators)
+
+    with transaction.atomic():
+        if rebuild:
+            QuestionStat.objects.filter(source=source).delete()
+        save_accumulators(source, accumulators)
+        ItemAnalysisCheckpoint.objects.update_or_create(source=source, defaults={'processed_until': until})
+
+    invalidate_question_stats(source)
+    return {'attempts': attempts, 'questions': len(accumulators)}
+
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Tuple[float, Dict[str, Tuple[int, Optional[float], Optional[float]]]]] = {}
+
+
+def get_question_stats(source: str) -> Dict[str, Tuple[int, Optional[float], Optional[float]]]:
+    """
+    Question id -> (responses, p_value, discrimination) for a source
+
+    Only questions with at least MIN_RESPONSES responses are included.
+    The mapping is read from QuestionStat at most every
+    STATS_CACHE_SECONDS per process; on a database error the previous
+    mapping (or an empty one) is returned.
+    """
+    now = time.monotonic()
+    cached = _stats.get(source)
+    if cached is not None and now - cached[0] < STATS_CACHE_SECONDS:
+        return cached[1]
+
+    try:
+        stats = {
+            question_id: (responses, p_value, discrimination)
+            for question_id, responses, p_value, discrimination in
+            QuestionStat.objects.filter(source=source, responses__gte=MIN_RESPONSES)
+            .values_list('question_id', 'responses', 'p_value', 'discrimination')
+        }
+    except Exception as e:
+        print(f"Warning: Could not load question stats for {source} - {e}")
+        stats = cached[1] if cached is not None else {}
+
+    with _stats_lock:
+        _stats[source] = (now, stats)
+    return stats
+
+
+def invalidate_question_stats(source: str = None):
+    with _stats_lock:
+        if source is None:
+            _stats.clear()
+        else:
+            _stats.pop(source, None)
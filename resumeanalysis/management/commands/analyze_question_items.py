@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from resumeanalysis.item_analysis import SOURCES, analyze_source
+
+
+class Command(BaseCommand):
+    help = "Update question difficulty and discrimination statistics from attempts completed since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=SOURCES, action='append',
+                            help="Response source to analyze (repeatable, default all)")
+        parser.add_argument('--rebuild', action='store_true', help="Drop stored statistics and re-read every attempt")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows fetched per database round trip")
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options['chunk_size'])
+        for source in options['source'] or SOURCES:
+            counts = analyze_source(source, rebuild=options['rebuild'], chunk_size=chunk_size)
+            self.stdout.write(self.style.SUCCESS(
+                f"{source}: {counts['attempts']} attempts read, {counts['questions']} questions updated"
+            ))
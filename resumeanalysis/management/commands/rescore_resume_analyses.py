@@ -0,0 +1,86 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from resumeanalysis.models import ResumeAnalysis
+from resumeanalysis.resume_analyzer import ResumeAnalyzer, rescore_compressed_text
+
+RESCORED_FIELDS = [
+    'ats_score', 'skills_extracted', 'experience_years', 'skill_level',
+    'skills_match_score', 'experience_score', 'education_score', 'format_score',
+    'analysis_version', 'updated_at',
+]
+
+
+class Command(BaseCommand):
+    help = "Re-score stored resume analyses from their saved text under the current analyzer and skill taxonomy."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Re-score analyses already on the current version too")
+        parser.add_argument('--batch-size', type=int, default=500, help="Analyses read and written per batch")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+
+    def handle(self, *args, **options):
+        version = ResumeAnalyzer().analysis_version
+        batch_size = max(1, options['batch_size'])
+
+        stored = ResumeAnalysis.objects.filter(compressed_text__isnull=False)
+        analyses = stored.exclude(target_role='')
+        if not options['all']:
+            analyses = analyses.exclude(analysis_version=version)
+        skipped = ResumeAnalysis.objects.filter(compressed_text__isnull=True).count()
+        no_role = stored.filter(target_role='').count()
+
+        workers = max(1, options['workers'])
+        updated = 0
+        last_pk = None
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while True:
+                # Each batch is its own query keyed on the last pk, so the
+                # versions written below never shift an open cursor
+                page = analyses.order_by('pk')
+                if last_pk is not None:
+                    page = page.filter(pk__gt=last_pk)
+                batch = [
+                    (pk, bytes(compressed), role)
+                    for pk, compressed, role in page.values_list('id', 'compressed_text', 'target_role')[:batch_size]
+                ]
+                if not batch:
+                    break
+                last_pk = batch[-1][0]
+
+                now = timezone.now()
+                rescored = []
+                chunksize = max(1, len(batch) // (workers * 4))
+                for pk, result in pool.map(rescore_compressed_text, batch, chunksize=chunksize):
+                    rescored.append(ResumeAnalysis(
+                        id=pk,
+                        ats_score=result['ats_score'],
+                        skills_extracted=result['skills_extracted'],
+                        experience_years=result['experience_years'],
+                        skill_level=result['skill_level'],
+                        skills_match_score=result['skills_match_score'],
+                        experience_score=result['experience_score'],
+                        education_score=result['education_score'],
+                        format_score=result['format_score'],
+                        analysis_version=result['analysis_version'],
+                        updated_at=now,
+                    ))
+
+                with transaction.atomic():
+                    ResumeAnalysis.objects.bulk_update(rescored, RESCORED_FIELDS)
+                updated += len(rescored)
+                self.stdout.write(f"Re-scored {updated} analyses...")
+
+        self.stdout.write(self.style.SUCCESS(f"Re-scored {updated} analyses to version {version}"))
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {skipped} analyses with no stored text (uploaded before text was kept)"
+            ))
+        if no_role:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {no_role} analyses with no target role"
+            ))
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumeanalysis', '0007_testattempt_category_testattempt_module_index_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='compressed_text',
+            field=models.BinaryField(blank=True, editable=False, help_text='zlib-compressed text extracted from the resume file', null=True),
+        ),
+    ]
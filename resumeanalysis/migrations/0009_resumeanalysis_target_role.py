@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+def backfill_target_role(apps, schema_editor):
+    """Copy the target role from each analysis' quiz"""
+    ResumeAnalysis = apps.get_model('resumeanalysis', 'ResumeAnalysis')
+    RoleQuiz = apps.get_model('resumeanalysis', 'RoleQuiz')
+
+    roles = dict(
+        RoleQuiz.objects.filter(resume_analysis__isnull=False)
+        .order_by('created_at')
+        .values_list('resume_analysis_id', 'target_role')
+    )
+    analyses = [ResumeAnalysis(id=pk, target_role=role) for pk, role in roles.items()]
+    ResumeAnalysis.objects.bulk_update(analyses, ['target_role'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumeanalysis', '0008_resumeanalysis_compressed_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeanalysis',
+            name='target_role',
+            field=models.CharField(blank=True, default='', help_text='Role the resume was scored against', max_length=20),
+        ),
+        migrations.RunPython(backfill_target_role, migrations.RunPython.noop),
+    ]
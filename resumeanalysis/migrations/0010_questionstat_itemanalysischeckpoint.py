@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumeanalysis', '0009_resumeanalysis_target_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemAnalysisCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20, unique=True)),
+                ('processed_until', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('quiz', 'Role Quiz'), ('test', 'Mock/Core Test'), ('readiness', 'Readiness Test')], max_length=20)),
+                ('question_id', models.CharField(help_text="Question identifier within the source's question bank", max_length=100)),
+                ('responses', models.IntegerField(default=0)),
+                ('correct', models.IntegerField(default=0)),
+                ('scored_responses', models.IntegerField(default=0, help_text='Responses from attempts with at least two questions')),
+                ('scored_correct', models.IntegerField(default=0)),
+                ('rest_score_sum', models.FloatField(default=0.0)),
+                ('rest_score_sq_sum', models.FloatField(default=0.0)),
+                ('cross_sum', models.FloatField(default=0.0, help_text='Sum of correct x rest score')),
+                ('wrong_option_counts', models.JSONField(default=dict, help_text='Option index -> times chosen by incorrect responses')),
+                ('p_value', models.FloatField(blank=True, help_text='Proportion of correct responses', null=True)),
+                ('discrimination', models.FloatField(blank=True, help_text='Corrected point-biserial (item vs rest score)', null=True)),
+                ('distractor_rates', models.JSONField(default=dict, help_text='Option index -> share of all responses choosing it wrongly')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('source', 'question_id')},
+            },
+        ),
+    ]
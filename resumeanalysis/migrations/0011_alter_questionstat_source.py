@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumeanalysis', '0010_questionstat_itemanalysischeckpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='questionstat',
+            name='source',
+            field=models.CharField(choices=[('quiz', 'Role Quiz'), ('test', 'Mock/Core Test'), ('exam', 'Test-System Exam'), ('readiness', 'Readiness Test')], max_length=20),
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.utils import timezone
 from django.contrib.auth.models import User
 import json
 import uuid
+import zlib
 
 # Import UserRegistration from users app
 from users.models import UserRegistration
@@ -25,6 +26,7 @@ class ResumeAnalysis(models.Model):
     user = models.ForeignKey(UserRegistration, on_delete=models.CASCADE, related_name='resume_analyses')
     resume_file = models.FileField(upload_to=resume_upload_path)
     original_filename = models.CharField(max_length=255)
+    target_role = models.CharField(max_length=20, blank=True, default='', help_text="Role the resume was scored against")
     
     # AI Analysis Results
     ats_score = models.IntegerField(help_text="ATS compatibility score (0-100)")
@@ -41,6 +43,7 @@ class ResumeAnalysis(models.Model):
     # Analysis Metadata
     analysis_version = models.CharField(max_length=20, default='1.0')
     processing_time = models.FloatField(help_text="Processing time in seconds")
+    compressed_text = models.BinaryField(null=True, blank=True, editable=False, help_text="zlib-compressed text extracted from the resume file")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -49,6 +52,18 @@ class ResumeAnalysis(models.Model):
     
     def __str__(self):
         return f"{self.user.userid} - Resume Analysis ({self.ats_score}%)"
+    
+    @staticmethod
+    def compress_text(text):
+        """Compress extracted resume text for storage"""
+        return zlib.compress((text or '').encode('utf-8'), 6)
+    
+    @property
+    def extracted_text(self):
+        """Stored resume text, or None for analyses created before text was kept"""
+        if self.compressed_text is None:
+            return None
+        return zlib.decompress(bytes(self.compressed_text)).decode('utf-8')
 
 class Role(models.Model):
     """Role definitions for mock tests"""
@@ -468,3 +483,52 @@ class MockTestXP(models.Model):
     def __str__(self):
         return f"{self.user_id} - Level {self.current_level} ({self.total_xp} XP)"
 
+
+
+class QuestionStat(models.Model):
+    """
+    Item-analysis statistics for one question, accumulated by the
+    analyze_question_items command from graded responses.
+    """
+    
+    SOURCE_CHOICES = [
+        ('quiz', 'Role Quiz'),
+        ('test', 'Mock/Core Test'),
+        ('exam', 'Test-System Exam'),
+        ('readiness', 'Readiness Test'),
+    ]
+    
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    question_id = models.CharField(max_length=100, help_text="Question identifier within the source's question bank")
+    
+    # Running sums, so new responses can be folded in without re-reading old ones
+    responses = models.IntegerField(default=0)
+    correct = models.IntegerField(default=0)
+    scored_responses = models.IntegerField(default=0, help_text="Responses from attempts with at least two questions")
+    scored_correct = models.IntegerField(default=0)
+    rest_score_sum = models.FloatField(default=0.0)
+    rest_score_sq_sum = models.FloatField(default=0.0)
+    cross_sum = models.FloatField(default=0.0, help_text="Sum of correct x rest score")
+    wrong_option_counts = models.JSONField(default=dict, help_text="Option index -> times chosen by incorrect responses")
+    
+    # Derived statistics
+    p_value = models.FloatField(null=True, blank=True, help_text="Proportion of correct responses")
+    discrimination = models.FloatField(null=True, blank=True, help_text="Corrected point-biserial (item vs rest score)")
+    distractor_rates = models.JSONField(default=dict, help_text="Option index -> share of all responses choosing it wrongly")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['source', 'question_id']
+    
+    def __str__(self):
+        return f"{self.source}:{self.question_id} (p={self.p_value}, r={self.discrimination})"
+
+
+class ItemAnalysisCheckpoint(models.Model):
+    """Completion time up to which a source's attempts are folded into QuestionStat"""
+    
+    source = models.CharField(max_length=20, unique=True)
+    processed_until = models.DateTimeField()
+    
+    def __str__(self):
+        return f"{self.source} until {self.processed_until}"
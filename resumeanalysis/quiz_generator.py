@@ -1,66 +1,189 @@
-import json
 import random
-import os
-from typing import Dict, List, Any
-from django.conf import settings
+import threading
+import time
+import zlib
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple
+
+# Seconds between mtime checks of the compiled question store
+QUESTION_BANK_CHECK_INTERVAL = 5
+
+# Lowest p-value (share answered correctly) for each measured difficulty
+P_VALUE_BANDS = ((0.7, 'easy'), (0.4, 'medium'), (0.0, 'hard'))
+
+
+class QuestionBank:
+    """Immutable, indexed snapshot of every category's compiled quiz bank"""
+
+    def __init__(self, categories: Dict[str, List[Dict[str, Any]]],
+                 versions: Dict[str, Tuple[str, str]] = None):
+        # Category -> (bank path relative to BASE_DIR, compiled bank version)
+        self.versions = MappingProxyType(dict(versions or {}))
+        # Short fingerprint of the banks this snapshot was built from
+        self.version = format(zlib.crc32(repr(sorted(self.versions.items())).encode()), '08x')
+        self.by_category = MappingProxyType({
+            category: tuple(questions) for category, questions in categories.items()
+        })
+
+        by_id = {}
+        by_difficulty = {}
+        for category, questions in self.by_category.items():
+            buckets = {}
+            for question in questions:
+                # First occurrence wins, as the old linear scan did
+                by_id.setdefault(question.get('id'), question)
+                buckets.setdefault(question.get('difficulty'), []).append(question)
+            by_difficulty[category] = MappingProxyType({
+                difficulty: tuple(bucket) for difficulty, bucket in buckets.items()
+            })
+        self.by_id = MappingProxyType(by_id)
+        self.by_difficulty = MappingProxyType(by_difficulty)
+
+    def __repr__(self):
+        return f"<QuestionBank version={self.version} questions={len(self.by_id)}>"
+
+    def questions(self, category: str, difficulty: str = 'mixed') -> tuple:
+        """Questions of a category, optionally restricted to one difficulty"""
+        if difficulty == 'mixed':
+            return self.by_category.get(category, ())
+        return self.by_difficulty.get(category, {}).get(difficulty, ())
+
+    def get(self, question_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(question_id)
+
+
+_bank_lock = threading.Lock()
+_bank: Optional[QuestionBank] = None
+_bank_last_check = 0.0
+
+
+def get_question_bank(force: bool = False) -> QuestionBank:
+    """
+    Return the process-wide question bank.
+
+    The bank is built from the quiz banks of the compiled question store
+    (see compile_question_banks), which is stat'ed at most every
+    QUESTION_BANK_CHECK_INTERVAL seconds; categories whose compiled bank
+    did not change keep their questions, and the bank is swapped
+    atomically so readers never see a half-built index.
+    """
+    global _bank, _bank_last_check
+
+    now = time.monotonic()
+    if not force and _bank is not None and now - _bank_last_check < QUESTION_BANK_CHECK_INTERVAL:
+        return _bank
+
+    from personalizedplan.testsystem.question_compiler import load_compiled_store
+
+    with _bank_lock:
+        _bank_last_check = now
+        banks = {
+            bank['category']: (relative, bank)
+            for relative, bank in sorted(load_compiled_store()['banks'].items())
+            if bank.get('source') == 'quiz'
+        }
+        versions = {category: (relative, bank['checksum'][:16]) for category, (relative, bank) in banks.items()}
+        if force or _bank is None or dict(_bank.versions) != versions:
+            previous = _bank
+            categories = {}
+            for category, (relative, bank) in banks.items():
+                if not force and previous is not None and previous.versions.get(category) == versions[category]:
+                    categories[category] = previous.by_category[category]
+                else:
+                    categories[category] = bank['questions']
+            _bank = QuestionBank(categories, versions)
+
+    return _bank
+
+
+def effective_difficulty(question: Dict[str, Any], stats: Dict[str, tuple] = None) -> str:
+    """Difficulty measured from item statistics when available, else the question's label"""
+    entry = stats.get(str(question.get('id'))) if stats else None
+    if entry is not None and entry[1] is not None:
+        for floor, label in P_VALUE_BANDS:
+            if entry[1] >= floor:
+                return label
+    return question.get('difficulty', 'medium')
+
+
+def balanced_sample(questions, count: int, stats: Dict[str, tuple], rng=random) -> List[Dict[str, Any]]:
+    """
+    Draw questions spread evenly across measured difficulty
+    
+    Args:
+        questions: Candidate questions
+        count: Number of questions to draw
+        stats: Question id -> (responses, p_value, discrimination), see item_analysis
+        rng: Random source
+        
+    Questions whose discrimination is negative (stronger students get
+    them wrong more often) are only used when nothing else is left.
+    """
+    pools = {'easy': [], 'medium': [], 'hard': []}
+    weak = []
+    for question in questions:
+        entry = stats.get(str(question.get('id')))
+        if entry is not None and entry[2] is not None and entry[2] < 0:
+            weak.append(question)
+        else:
+            pools.setdefault(effective_difficulty(question, stats), []).append(question)
+    
+    pools = [pool for pool in pools.values() if pool]
+    for pool in pools:
+        rng.shuffle(pool)
+    
+    # Take one question from each difficulty in turn
+    selected = []
+    while len(selected) < count and pools:
+        for pool in pools:
+            if len(selected) < count:
+                selected.append(pool.pop())
+        pools = [pool for pool in pools if pool]
+    
+    if len(selected) < count:
+        rng.shuffle(weak)
+        selected.extend(weak[:count - len(selected)])
+    return selected
+
 
 class QuizGenerator:
     """Generate role-specific quizzes with balanced question distribution"""
     
-    def __init__(self):
-        # Fix BASE_DIR path - it should point to Careerlytics directory
-        base_dir = str(settings.BASE_DIR)
-        if base_dir == 'D:\\':
-            base_dir = 'D:\\Careerlytics'
-        self.questions_dir = os.path.join(base_dir, 'resumeanalysis/questions')
-        print(f"QuizGenerator initialized with questions_dir: {self.questions_dir}")  # Debug line
-        self.question_cache = {}
+    def __init__(self, bank: QuestionBank = None, stats: Dict[str, tuple] = None,
+                 use_store: bool = False, exclude: List[int] = None):
+        self.bank = bank or get_question_bank()
+        # Item statistics (question id -> responses, p_value, discrimination)
+        self.stats = stats or {}
+        # Draw through the indexed question store, leaving out these StoredQuestion ids
+        self.use_store = use_store
+        self.exclude = exclude or []
     
-    def generate_quiz(self, target_role: str, difficulty: str = 'mixed') -> Dict[str, Any]:
+    def generate_quiz(self, target_role: str, difficulty: str = 'mixed', seed: int = None) -> Dict[str, Any]:
         """
         Generate a balanced quiz for the specified role
         
         Args:
             target_role: Target role (frontend, backend, devops, datascience)
             difficulty: Difficulty level (easy, medium, hard, mixed)
+            seed: Optional seed so the same quiz can be drawn again
             
         Returns:
             Dictionary containing quiz questions and metadata
         """
-        print(f"Starting quiz generation for target_role: {target_role}")  # Debug line
-        
-        # Load questions for each category
-        general_questions = self._load_questions('general')
-        tech_questions = self._load_questions('tech_fundamentals')
-        role_questions = self._load_questions(target_role)
-        
-        print(f"Loaded questions: general={len(general_questions)}, tech={len(tech_questions)}, role={len(role_questions)}")  # Debug line
+        rng = random.Random(seed)
         
         # Select questions based on distribution (30% General, 30% Tech, 40% Role-specific)
-        selected_general = self._select_questions(general_questions, 9, difficulty)
-        selected_tech = self._select_questions(tech_questions, 9, difficulty)
-        selected_role = self._select_questions(role_questions, 12, difficulty)
+        selected_general = self._select_questions('general', 9, difficulty, rng)
+        selected_tech = self._select_questions('tech_fundamentals', 9, difficulty, rng)
+        selected_role = self._select_questions(target_role, 12, difficulty, rng)
         
         # Combine and shuffle questions
         all_questions = selected_general + selected_tech + selected_role
-        random.shuffle(all_questions)
+        rng.shuffle(all_questions)
         
         # Add question numbers and metadata
         quiz_data = {
-            'questions': [
-                {
-                    'number': i + 1,
-                    'id': q['id'],
-                    'category': q['category'],
-                    'difficulty': q['difficulty'],
-                    'question_text': q['question_text'],
-                    'options': q['options'],
-                    'correct_answer': q.get('correct_answer'),
-                    'explanation': q.get('explanation', ''),
-                    'tags': q.get('tags', [])
-                }
-                for i, q in enumerate(all_questions)
-            ],
+            'questions': [self._quiz_question(i + 1, q) for i, q in enumerate(all_questions)],
             'metadata': {
                 'target_role': target_role,
                 'total_questions': len(all_questions),
@@ -70,64 +193,117 @@ class QuizGenerator:
                     'role_specific': len(selected_role)
                 },
                 'time_limit': 1800,  # 30 minutes
-                'difficulty': difficulty
+                'difficulty': difficulty,
+                'bank_version': self.bank.version,
+                # Compiled version of each bank drawn from, see questions_for_ids()
+                'banks': dict(
+                    self.bank.versions[category] for category in ('general', 'tech_fundamentals', target_role)
+                    if category in self.bank.versions
+                ),
+                'seed': seed
             }
         }
         
         return quiz_data
     
-    def _load_questions(self, category: str) -> List[Dict[str, Any]]:
-        """Load questions from JSON file"""
-        if category in self.question_cache:
-            print(f"Using cached questions for category: {category}")  # Debug line
-            return self.question_cache[category]
+    def questions_for_ids(self, question_ids: List[str], banks: Dict[str, str] = None) -> List[Dict[str, Any]]:
+        """
+        Rebuild a generated quiz's question list from its ordered question IDs
         
-        try:
-            file_path = os.path.join(self.questions_dir, category, 'questions.json')
-            print(f"Loading questions from: {file_path}")  # Debug line
-            print(f"File exists: {os.path.exists(file_path)}")  # Debug line
-            
-            if not os.path.exists(file_path):
-                print(f"File not found: {file_path}")  # Debug line
-                return []
-                
-            with open(file_path, 'r', encoding='utf-8') as f:
-                questions = json.load(f)
-            
-            print(f"Loaded {len(questions)} questions for category: {category}")  # Debug line
-            print(f"First question sample: {questions[0] if questions else 'None'}")  # Debug line
-            
-            self.question_cache[category] = questions
-            return questions
-        except FileNotFoundError:
-            print(f"Warning: Questions file not found for category: {category} at {file_path}")
-            return []
-        except json.JSONDecodeError as e:
-            print(f"Error: Invalid JSON in questions file for category: {category} - {e}")
-            return []
-        except Exception as e:
-            print(f"Unexpected error loading questions for category: {category} - {e}")
-            return []
+        Args:
+            question_ids: Ordered question IDs of the quiz
+            banks: Bank path -> compiled version the quiz was drawn from (its
+                'banks' metadata); questions of banks edited since are taken
+                from the archived version the quiz showed
+        
+        Returns None if any ID is in neither.
+        """
+        superseded = {}
+        current = dict(self.bank.versions.values())
+        stale = [(bank, version) for bank, version in (banks or {}).items() if current.get(bank) != version]
+        if stale:
+            from personalizedplan.testsystem.question_store import archived_questions
+            for bank, version in stale:
+                for question in archived_questions(bank, version) or ():
+                    superseded.setdefault(question.get('id'), question)
+        
+        questions = []
+        for i, question_id in enumerate(question_ids):
+            question = superseded.get(question_id) or self.bank.get(question_id)
+            if question is None:
+                return None
+            questions.append(self._quiz_question(i + 1, question))
+        return questions
     
-    def _select_questions(self, questions: List[Dict[str, Any]], 
-                        count: int, difficulty: str) -> List[Dict[str, Any]]:
-        """Select questions based on difficulty and count"""
-        if not questions:
-            return []
+    @staticmethod
+    def _quiz_question(number: int, q: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'number': number,
+            'id': q['id'],
+            'category': q['category'],
+            'difficulty': q['difficulty'],
+            'question_text': q['question_text'],
+            'options': q['options'],
+            'correct_answer': q.get('correct_answer'),
+            'explanation': q.get('explanation', ''),
+            'tags': q.get('tags', [])
+        }
+    
+    def _load_questions(self, category: str) -> List[Dict[str, Any]]:
+        """Questions of a category from the shared question bank"""
+        return list(self.bank.questions(category))
+    
+    def _select_questions(self, category: str, count: int, difficulty: str,
+                          rng: random.Random = None) -> List[Dict[str, Any]]:
+        """Select questions of a category based on difficulty and count"""
+        rng = rng or random
+        if self.use_store:
+            drawn = self._draw_from_store(category, count, difficulty, rng)
+            if drawn is not None:
+                return drawn
         
-        # Filter by difficulty if specified
-        if difficulty != 'mixed':
-            filtered_questions = [q for q in questions if q['difficulty'] == difficulty]
+        if self.stats:
+            # Measured difficulty replaces the labels once questions have enough responses
+            candidates = [
+                q for q in self.bank.questions(category)
+                if difficulty == 'mixed' or effective_difficulty(q, self.stats) == difficulty
+            ]
+            if len(candidates) >= count and difficulty == 'mixed':
+                return balanced_sample(candidates, count, self.stats, rng)
         else:
-            filtered_questions = questions
+            candidates = self.bank.questions(category, difficulty)
         
         # If not enough questions after filtering, use all available
-        if len(filtered_questions) < count:
-            selected = filtered_questions
-        else:
-            selected = random.sample(filtered_questions, count)
-        
-        return selected
+        if len(candidates) < count:
+            return list(candidates)
+        return rng.sample(candidates, count)
+    
+    def _draw_from_store(self, category: str, count: int, difficulty: str,
+                         rng: random.Random) -> Optional[List[Dict[str, Any]]]:
+        """
+        Questions drawn through the question store, or None if the store cannot serve this bank
+
+        Only rows of the compiled bank version this quiz bank was built from
+        are drawn, and their stored payloads are served as they are.
+        """
+        from django.db import DatabaseError
+        from personalizedplan.testsystem.question_store import sample_questions
+        if category not in self.bank.versions:
+            return None
+        bank, bank_version = self.bank.versions[category]
+        try:
+            rows = sample_questions(
+                count, source='quiz', bank=bank, bank_version=bank_version,
+                difficulty=None if difficulty == 'mixed' else difficulty,
+                exclude=self.exclude, stats=self.stats, rng=rng
+            )
+        except DatabaseError as e:
+            print(f"Warning: Question store unavailable, sampling the question bank - {e}")
+            return None
+        # An empty or out-of-date store falls back to the in-memory bank
+        if not rows:
+            return None
+        return [row.question for row in rows]
     
     def calculate_quiz_score(self, responses: List[Dict[str, Any]], target_role: str = None) -> Dict[str, int]:
         """
@@ -135,17 +311,11 @@ class QuizGenerator:
         
         Args:
             responses: List of user responses with question_id and selected_option
-            target_role: Optional target role to load relevant questions
+            target_role: Unused; kept for backwards compatibility
             
         Returns:
             Dictionary with scores for each category and total
         """
-        # If target_role is provided, load relevant questions to populate cache
-        if target_role:
-            self._load_questions('general')
-            self._load_questions('tech_fundamentals')
-            self._load_questions(target_role)
-
         category_scores = {
             'general_ability': {'correct': 0, 'total': 0},
             'tech_fundamentals': {'correct': 0, 'total': 0},
@@ -166,7 +336,6 @@ class QuizGenerator:
             question_id = response.get('question_id')
             selected_option = response.get('selected_option')
             
-            # Find the question (this would normally come from database)
             question = self._find_question_by_id(question_id)
             if not question:
                 continue
@@ -204,20 +373,14 @@ class QuizGenerator:
         return final_scores
     
     def _find_question_by_id(self, question_id: str) -> Dict[str, Any]:
-        """Find question by ID (simplified version)"""
-        # In a real implementation, this would query the database
-        # For now, search through cached questions
-        for category_questions in self.question_cache.values():
-            for question in category_questions:
-                if question.get('id') == question_id:
-                    return question
-        return None
+        """Find question by ID"""
+        return self.bank.get(question_id)
     
     def get_quiz_statistics(self, target_role: str) -> Dict[str, Any]:
         """Get statistics about available questions for a role"""
-        general_questions = self._load_questions('general')
-        tech_questions = self._load_questions('tech_fundamentals')
-        role_questions = self._load_questions(target_role)
+        general_questions = self.bank.questions('general')
+        tech_questions = self.bank.questions('tech_fundamentals')
+        role_questions = self.bank.questions(target_role)
         
         return {
             'target_role': target_role,
@@ -241,19 +404,30 @@ class QuizGenerator:
                 distribution[difficulty] += 1
         return distribution
 
-def generate_role_quiz(target_role: str, difficulty: str = 'mixed') -> Dict[str, Any]:
+def generate_role_quiz(target_role: str, difficulty: str = 'mixed', seed: int = None, user=None) -> Dict[str, Any]:
     """
     Convenience function to generate a role-specific quiz
     
     Args:
         target_role: Target role for the quiz
         difficulty: Difficulty level
+        seed: Optional seed for reproducible question selection
+        user: Optional user whose recently answered questions are avoided
         
     Returns:
         Generated quiz data
     """
-    generator = QuizGenerator()
-    return generator.generate_quiz(target_role, difficulty)
+    from .item_analysis import get_question_stats
+    from personalizedplan.testsystem.question_store import archive_bank_version, recent_quiz_questions
+    generator = QuizGenerator(
+        stats=get_question_stats('quiz'), use_store=True, exclude=recent_quiz_questions(user)
+    )
+    quiz_data = generator.generate_quiz(target_role, difficulty, seed)
+    # The quiz outlives these bank versions if a bank is edited meanwhile
+    for category, (bank, version) in generator.bank.versions.items():
+        if quiz_data['metadata']['banks'].get(bank) == version:
+            archive_bank_version(bank, version, generator.bank.by_category[category])
+    return quiz_data
 
 def calculate_quiz_scores(responses: List[Dict[str, Any]], target_role: str = None) -> Dict[str, int]:
     """
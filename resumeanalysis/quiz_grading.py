@@ -0,0 +1,189 @@
+"""
+Grading service for role quiz submissions.
+
+Answers are graded in memory against the quiz's questions (rebuilt from
+the shared question bank), then the responses, the quiz scores and the
+eligibility rows are written in one transaction using bulk inserts, so a
+submission costs the same handful of queries however many questions the
+quiz has.
+"""
+from typing import Any, Dict, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QuizResponse, RoleEligibility, RecommendedRole
+from .eligibility_calculator import calculate_role_eligibility
+
+# Map question categories to score categories
+CATEGORY_MAPPING = {
+    'general': 'general_ability',
+    'tech_fundamentals': 'tech_fundamentals',
+    'frontend': 'role_specific',
+    'backend': 'role_specific',
+    'devops': 'role_specific',
+    'datascience': 'role_specific'
+}
+
+CATEGORY_WEIGHTS = {
+    'general_ability': 0.3,
+    'tech_fundamentals': 0.3,
+    'role_specific': 0.4
+}
+
+QUIZ_SCORE_FIELDS = [
+    'general_ability_score', 'tech_fundamentals_score', 'role_specific_score',
+    'total_score', 'status', 'completed_at', 'time_taken',
+]
+
+
+def calculate_scores_from_session(responses: List[Dict[str, Any]], questions: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Calculate quiz scores using the questions from session
+
+    Args:
+        responses: List of user responses with question_id and selected_option
+        questions: List of questions used in the quiz
+
+    Returns:
+        Dictionary with scores for each category and total
+    """
+    category_scores = {
+        'general_ability': {'correct': 0, 'total': 0},
+        'tech_fundamentals': {'correct': 0, 'total': 0},
+        'role_specific': {'correct': 0, 'total': 0}
+    }
+
+    # Create a mapping of question_id to question for quick lookup
+    question_map = {str(q['id']): q for q in questions}
+
+    for response in responses:
+        question_id = response.get('question_id')
+        selected_option = response.get('selected_option')
+
+        # Find the question from our questions list
+        question = question_map.get(str(question_id))
+        if not question:
+            print(f"Warning: Question {question_id} not found in questions list")
+            continue
+
+        category = question['category']
+        score_category = CATEGORY_MAPPING.get(category, 'general_ability')
+
+        # Update scores
+        category_scores[score_category]['total'] += 1
+        if selected_option == question['correct_answer']:
+            category_scores[score_category]['correct'] += 1
+
+    # Calculate percentages
+    final_scores = {}
+    for category, scores in category_scores.items():
+        if scores['total'] > 0:
+            final_scores[category] = int((scores['correct'] / scores['total']) * 100)
+        else:
+            final_scores[category] = 0
+
+    # Calculate total score (weighted)
+    total_score = sum(
+        final_scores[cat] * weight
+        for cat, weight in CATEGORY_WEIGHTS.items()
+    )
+
+    final_scores['total'] = int(total_score)
+
+    return final_scores
+
+
+def grade_answers(quiz, questions: List[Dict[str, Any]], answers: List[Optional[int]]):
+    """
+    Grade a full answer sheet in memory
+
+    Args:
+        quiz: RoleQuiz being submitted
+        questions: Quiz questions in display order
+        answers: Selected option per question, None if skipped
+
+    Returns:
+        Tuple of (unsaved QuizResponse objects, score breakdown)
+    """
+    responses = [
+        QuizResponse(
+            quiz=quiz,
+            session_question_id=question['id'],
+            user_answer=selected_option,
+            time_taken=0,
+            is_correct=(selected_option == question['correct_answer'])
+        )
+        for question, selected_option in zip(questions, answers)
+        if selected_option is not None
+    ]
+    scores = calculate_scores_from_session(
+        [{'question_id': r.session_question_id, 'selected_option': r.user_answer} for r in responses],
+        questions
+    )
+    return responses, scores
+
+
+def save_role_eligibility(user, quiz, eligibility: Dict[str, Any]) -> RoleEligibility:
+    """Replace a quiz's eligibility result and its recommended roles"""
+    with transaction.atomic():
+        RoleEligibility.objects.filter(quiz=quiz).delete()
+
+        role_eligibility = RoleEligibility.objects.create(
+            user=user,
+            quiz=quiz,
+            resume_analysis=quiz.resume_analysis,
+            role_name=eligibility['target_role'],
+            eligibility_score=eligibility['total_eligibility'],
+            is_eligible=eligibility['is_eligible'],
+            general_score=quiz.general_ability_score,
+            tech_score=quiz.tech_fundamentals_score,
+            role_score=quiz.role_specific_score,
+            resume_score=quiz.resume_analysis.ats_score,
+            recommended_roles=eligibility['recommended_roles'],
+            improvement_suggestions=eligibility['improvement_areas']
+        )
+
+        RecommendedRole.objects.bulk_create([
+            RecommendedRole(
+                user=user,
+                eligibility=role_eligibility,
+                role_name=rec['role_name'],
+                match_percentage=rec['match_percentage'],
+                match_reasons=rec['match_reasons']
+            )
+            for rec in eligibility['recommended_roles']
+        ])
+    return role_eligibility
+
+
+def submit_quiz(user, quiz, questions: List[Dict[str, Any]], answers: List[Optional[int]],
+                time_taken: int) -> Dict[str, Any]:
+    """
+    Grade and persist a final quiz submission
+
+    Replaces any earlier responses, completes the quiz with its scores
+    and stores the role eligibility, all in one transaction.
+
+    Returns:
+        Score breakdown by category
+    """
+    responses, scores = grade_answers(quiz, questions, answers)
+
+    quiz.general_ability_score = scores.get('general_ability', 0)
+    quiz.tech_fundamentals_score = scores.get('tech_fundamentals', 0)
+    quiz.role_specific_score = scores.get('role_specific', 0)
+    quiz.total_score = scores.get('total', 0)
+    quiz.status = 'completed'
+    quiz.completed_at = timezone.now()
+    quiz.time_taken = time_taken
+
+    eligibility = calculate_role_eligibility(quiz.resume_analysis, quiz)
+
+    with transaction.atomic():
+        QuizResponse.objects.filter(quiz=quiz).delete()
+        QuizResponse.objects.bulk_create(responses)
+        quiz.save(update_fields=QUIZ_SCORE_FIELDS)
+        save_role_eligibility(user, quiz, eligibility)
+
+    return scores
@@ -1,51 +1,105 @@
 import re
 import json
 import time
+import zlib
 from collections import Counter
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 
-# Role-specific skill mappings
-ROLE_SKILLS = {
-    'frontend': {
-        'core': ['html', 'css', 'javascript', 'react', 'vue', 'angular', 'typescript'],
-        'frameworks': ['bootstrap', 'tailwind', 'material-ui', 'antd', 'chakra-ui'],
-        'tools': ['git', 'webpack', 'npm', 'yarn', 'figma', 'photoshop'],
-        'concepts': ['responsive-design', 'cross-browser', 'accessibility', 'performance', 'seo']
-    },
-    'backend': {
-        'core': ['python', 'java', 'nodejs', 'c#', 'php', 'ruby', 'go'],
-        'frameworks': ['django', 'flask', 'express', 'spring', 'laravel', 'rails'],
-        'databases': ['mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch'],
-        'concepts': ['api-design', 'microservices', 'authentication', 'security', 'scalability']
-    },
-    'devops': {
-        'core': ['docker', 'kubernetes', 'jenkins', 'gitlab-ci', 'github-actions'],
-        'cloud': ['aws', 'azure', 'gcp', 'terraform', 'ansible'],
-        'monitoring': ['prometheus', 'grafana', 'elk-stack', 'splunk'],
-        'concepts': ['ci-cd', 'infrastructure-as-code', 'devsecops', 'automation']
-    },
-    'datascience': {
-        'core': ['python', 'r', 'sql', 'jupyter', 'pandas', 'numpy'],
-        'ml': ['scikit-learn', 'tensorflow', 'pytorch', 'keras', 'xgboost'],
-        'visualization': ['matplotlib', 'seaborn', 'plotly', 'tableau', 'power-bi'],
-        'concepts': ['machine-learning', 'deep-learning', 'statistics', 'data-analysis', 'nlp']
-    }
-}
+from .skill_taxonomy import SkillIndex, get_skill_index
+
+ANALYZER_VERSION = '1.2'
+
+# Degree vocabulary grouped by education level, highest level first
+DEGREE_LEVELS = (
+    ('phd', ('phd', 'ph.d', 'doctorate')),
+    ('masters', ('master', 'masters', 'm.s', 'm.tech', 'm.c.a', 'mca', 'm.e', 'msc', 'm.sc', 'mba')),
+    ('bachelors', ('bachelor', 'bachelors', 'b.s', 'b.tech', 'btech', 'b.e', 'bsc', 'b.sc')),
+    ('associate', ('associate',)),
+)
+DEGREE_FIELDS = ('engineering', 'computer science', 'information technology', 'data science')
+
+# Precompiled patterns
+_NORMALIZE_RE = re.compile(r'[^\w\.\,\-\+\#\@\(\)]+')
+_TOKEN_RE = re.compile(r'[\w\+\#]+(?:[\.\-][\w\+\#]+)*')
+_SUBTOKEN_RE = re.compile(r'[\.\-]')
+_EXPERIENCE_RE = re.compile(
+    r'(?=[\de])(?:'
+    r'(\d+)\+?\s*years?\s*(?:of\s*)?experience'
+    r'|experience\s*(\d+)\+?\s*years?'
+    r'|(\d{4})\s*[-–]\s*(\d{4}|\bpresent\b)'
+    r'|(\d+)\+?\s*years?'
+    r')'
+)
+
+
+class ResumeDocument:
+    """
+    Normalized view of a resume built once and shared by every extractor.
+
+    Holds the cleaned lowercase text, the token array (with character
+    offsets on demand) and a token frequency Counter. Dotted and
+    hyphenated tokens ("react.js", "python-based") are kept whole in the
+    token array and counted both whole and by their parts, so a skill is
+    found either way; ``split_tokens`` is the token array with such tokens
+    split, for phrase matching. Extractors should
+    answer their questions from ``counts``/``contains`` or ``findall``
+    (memoized per pattern) rather than rescanning ``text`` themselves.
+    """
+
+    def __init__(self, raw_text: str):
+        self.text = _NORMALIZE_RE.sub(' ', raw_text or '').lower().strip()
+        self.tokens: List[str] = _TOKEN_RE.findall(self.text)
+        self.counts = Counter(self.tokens)
+        self.counts.update(
+            part for token in self.tokens if _SUBTOKEN_RE.search(token)
+            for part in _SUBTOKEN_RE.split(token)
+        )
+
+        self._split_tokens: Optional[List[str]] = None
+        self._offsets: Optional[List[Tuple[int, int]]] = None
+        self._joined: Optional[str] = None
+        self._matches: Dict[Any, List[Any]] = {}
+
+    def __len__(self):
+        return len(self.tokens)
+
+    @property
+    def offsets(self) -> List[Tuple[int, int]]:
+        """(start, end) character offsets of each token in ``text``"""
+        if self._offsets is None:
+            self._offsets = [match.span() for match in _TOKEN_RE.finditer(self.text)]
+        return self._offsets
+
+    @property
+    def split_tokens(self) -> List[str]:
+        """The token array with dotted and hyphenated tokens split into their parts"""
+        if self._split_tokens is None:
+            self._split_tokens = [part for token in self.tokens for part in _SUBTOKEN_RE.split(token)]
+        return self._split_tokens
+
+    def contains(self, term: str) -> bool:
+        """Whether ``term`` (a token or space-separated phrase) occurs in the document"""
+        if ' ' not in term:
+            return term in self.counts
+        if not all(part in self.counts for part in term.split(' ')):
+            return False
+        if self._joined is None:
+            self._joined = ' %s | %s ' % (' '.join(self.tokens), ' '.join(self.split_tokens))
+        return ' %s ' % term in self._joined
+
+    def findall(self, pattern) -> List[Any]:
+        """Memoized ``pattern.findall`` over the normalized text"""
+        if pattern not in self._matches:
+            self._matches[pattern] = pattern.findall(self.text)
+        return self._matches[pattern]
 
-# Common tech keywords
-TECH_KEYWORDS = [
-    'javascript', 'python', 'java', 'c++', 'c#', 'php', 'ruby', 'go', 'rust',
-    'html', 'css', 'typescript', 'sql', 'nosql', 'mongodb', 'postgresql', 'mysql',
-    'react', 'vue', 'angular', 'django', 'flask', 'express', 'spring', 'laravel',
-    'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'git', 'linux', 'ubuntu',
-    'rest', 'api', 'microservices', 'agile', 'scrum', 'tdd', 'cicd'
-]
 
 class ResumeAnalyzer:
     """AI-powered resume analysis system"""
     
-    def __init__(self):
+    def __init__(self, taxonomy: Optional[SkillIndex] = None):
         self.processing_start = time.time()
+        self.taxonomy = taxonomy or get_skill_index()
     
     def analyze_resume(self, file_content: str, filename: str, target_role: str) -> Dict[str, Any]:
         """
@@ -59,13 +113,13 @@ class ResumeAnalyzer:
         Returns:
             Dictionary containing analysis results
         """
-        # Extract text and clean it
-        cleaned_text = self._clean_text(file_content)
+        # Normalize and tokenize once; every extractor reads from this
+        doc = self.build_document(file_content)
         
         # Extract various components
-        skills = self._extract_skills(cleaned_text, target_role)
-        experience = self._extract_experience(cleaned_text)
-        education = self._extract_education(cleaned_text)
+        skills = self._extract_skills(doc, target_role)
+        experience = self._extract_experience(doc)
+        education = self._extract_education(doc)
         
         # Calculate scores
         scores = self._calculate_scores(skills, experience, education, target_role)
@@ -86,55 +140,25 @@ class ResumeAnalyzer:
             'education_score': scores['education'],
             'format_score': scores['format'],
             'processing_time': processing_time,
-            'analysis_version': '1.0'
+            'analysis_version': self.analysis_version
         }
     
-    def _clean_text(self, text: str) -> str:
-        """Clean and normalize text content"""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove special characters but keep important ones
-        text = re.sub(r'[^\w\s\.\,\-\+\#\@\(\)]', ' ', text)
-        # Convert to lowercase for processing
-        return text.lower().strip()
+    @property
+    def analysis_version(self) -> str:
+        """Analyzer version tagged with the skill taxonomy version it scored against"""
+        return f"{ANALYZER_VERSION}-t{self.taxonomy.version}"
+    
+    def build_document(self, text: str) -> ResumeDocument:
+        """Build the shared normalized representation of the resume text"""
+        return ResumeDocument(text)
     
-    def _extract_skills(self, text: str, target_role: str) -> List[str]:
+    def _extract_skills(self, doc: ResumeDocument, target_role: str) -> List[str]:
         """Extract skills from resume text"""
-        found_skills = []
-        text_lower = text.lower()
-        
-        # Get role-specific skills
-        role_skills = ROLE_SKILLS.get(target_role, {})
-        all_role_skills = []
-        for category, skills in role_skills.items():
-            all_role_skills.extend(skills)
-        
-        # Check for role-specific skills
-        for skill in all_role_skills:
-            if skill in text_lower:
-                found_skills.append(skill)
-        
-        # Check for common tech keywords
-        for keyword in TECH_KEYWORDS:
-            if keyword in text_lower:
-                found_skills.append(keyword)
+        relevant = self.taxonomy.role_skill_set(target_role) | self.taxonomy.general_skills
         
-        # Extract skills using patterns
-        # Programming languages
-        prog_languages = re.findall(r'\b(python|java|javascript|c\+\+|c\#|php|ruby|go|rust|swift|kotlin)\b', text_lower)
-        found_skills.extend([lang for lang in prog_languages if lang not in found_skills])
-        
-        # Frameworks and libraries
-        frameworks = re.findall(r'\b(react|vue|angular|django|flask|express|spring|laravel|rails)\b', text_lower)
-        found_skills.extend([fw for fw in frameworks if fw not in found_skills])
-        
-        # Tools and platforms
-        tools = re.findall(r'\b(git|docker|kubernetes|aws|azure|gcp|jenkins|terraform|ansible)\b', text_lower)
-        found_skills.extend([tool for tool in tools if tool not in found_skills])
-        
-        return list(set(found_skills))  # Remove duplicates
+        return sorted(self.taxonomy.match(doc) & relevant)
     
-    def _extract_experience(self, text: str) -> Dict[str, Any]:
+    def _extract_experience(self, doc: ResumeDocument) -> Dict[str, Any]:
         """Extract work experience information"""
         experience = {
             'years': 0,
@@ -142,39 +166,39 @@ class ResumeAnalyzer:
             'total_months': 0
         }
         
-        # Look for years of experience patterns
-        year_patterns = [
-            r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
-            r'experience[:\s]*(\d+)\+?\s*years?',
-            r'(\d+)\+?\s*years?\s*(?:of\s*)?(?:work|professional)?'
-        ]
-        
-        for pattern in year_patterns:
-            matches = re.findall(pattern, text.lower())
-            if matches:
-                experience['years'] = max(int(match) for match in matches)
+        # One pass collects "N years experience", "experience N years",
+        # bare "N years" mentions and date ranges like "2020-2023"
+        stated = ([], [], [])
+        for before, after, start, end, bare in doc.findall(_EXPERIENCE_RE):
+            if start:
+                end_year = 2024 if end == 'present' else int(end)
+                months = (end_year - int(start)) * 12
+                experience['total_months'] += months
+                experience['entries'].append({
+                    'start': int(start),
+                    'end': end_year,
+                    'months': months
+                })
+            elif before:
+                stated[0].append(int(before))
+            elif after:
+                stated[1].append(int(after))
+            else:
+                stated[2].append(int(bare))
+        
+        # Most specific phrasing wins
+        for years in stated:
+            if years:
+                experience['years'] = max(years)
                 break
         
-        # Extract individual experience entries
-        # Look for date ranges like "2020-2023" or "Jan 2020 - Dec 2023"
-        date_ranges = re.findall(r'(\d{4})\s*[-–]\s*(\d{4}|\bpresent\b)', text.lower())
-        for start, end in date_ranges:
-            end_year = 2024 if end == 'present' else int(end)
-            months = (end_year - int(start)) * 12
-            experience['total_months'] += months
-            experience['entries'].append({
-                'start': int(start),
-                'end': end_year,
-                'months': months
-            })
-        
         # Calculate total years from entries
         if experience['total_months'] > 0:
             experience['years'] = max(experience['years'], experience['total_months'] / 12)
         
         return experience
     
-    def _extract_education(self, text: str) -> Dict[str, Any]:
+    def _extract_education(self, doc: ResumeDocument) -> Dict[str, Any]:
         """Extract education information"""
         education = {
             'degrees': [],
@@ -182,29 +206,15 @@ class ResumeAnalyzer:
             'level': 'unknown'
         }
         
-        # Degree patterns
-        degree_patterns = [
-            r'(bachelor|master|phd|doctorate|associate|b\.s\.|m\.s\.|ph\.d\.)',
-            r'(b\.tech|m\.tech|m\.c\.a|b\.e\.|m\.e\.)',
-            r'(engineering|computer science|information technology|data science)'
-        ]
+        for level, terms in DEGREE_LEVELS:
+            found = [term for term in terms if doc.contains(term)]
+            if found:
+                education['degrees'].extend(found)
+                if education['level'] == 'unknown':
+                    education['level'] = level
         
-        text_lower = text.lower()
-        for pattern in degree_patterns:
-            matches = re.findall(pattern, text_lower)
-            if matches:
-                education['degrees'].extend(matches)
-                education['has_degree'] = True
-        
-        # Determine education level
-        if 'phd' in text_lower or 'doctorate' in text_lower:
-            education['level'] = 'phd'
-        elif 'master' in text_lower or 'm.' in text_lower:
-            education['level'] = 'masters'
-        elif 'bachelor' in text_lower or 'b.' in text_lower:
-            education['level'] = 'bachelors'
-        elif 'associate' in text_lower:
-            education['level'] = 'associate'
+        education['degrees'].extend(field for field in DEGREE_FIELDS if doc.contains(field))
+        education['has_degree'] = bool(education['degrees'])
         
         return education
     
@@ -241,22 +251,19 @@ class ResumeAnalyzer:
     
     def _calculate_skills_match(self, skills: List[str], target_role: str) -> int:
         """Calculate skills match score for target role"""
-        role_skills = ROLE_SKILLS.get(target_role, {})
-        all_required_skills = []
-        
-        for category, skill_list in role_skills.items():
-            all_required_skills.extend(skill_list)
-        
-        # Count matching skills
-        matching_skills = set(skills) & set(all_required_skills)
+        all_required_skills = self.taxonomy.role_skill_set(target_role)
         
         if not all_required_skills:
             return 50  # Default score if no role skills defined
         
+        # Count matching skills
+        skills = set(skills)
+        matching_skills = skills & all_required_skills
+        
         match_percentage = (len(matching_skills) / len(all_required_skills)) * 100
         
         # Bonus for having extra relevant skills
-        bonus = min(20, len(set(skills) - set(all_required_skills)) * 2)
+        bonus = min(20, len(skills - all_required_skills) * 2)
         
         return min(100, match_percentage + bonus)
     
@@ -318,3 +325,20 @@ def analyze_resume_text(text_content: str, filename: str, target_role: str) -> D
     """
     analyzer = ResumeAnalyzer()
     return analyzer.analyze_resume(text_content, filename, target_role)
+
+def rescore_compressed_text(job: Tuple[Any, bytes, str]) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Re-analyze a stored resume from its compressed text
+    
+    Runs in the rescore command's worker processes, so it must not touch
+    the database.
+    
+    Args:
+        job: (analysis id, zlib-compressed text, target role)
+        
+    Returns:
+        (analysis id, analysis results dictionary)
+    """
+    analysis_id, compressed, target_role = job
+    text = zlib.decompress(compressed).decode('utf-8')
+    return analysis_id, analyze_resume_text(text, '', target_role)
@@ -0,0 +1,337 @@
+"""
+Resume retrieval for placement drives.
+
+Each placement cell gets an in-memory TF-IDF index over the stored text of
+its students' latest resume analyses. Documents are kept as per-resume
+(term id, count) arrays and folded into a row-major (CSR-style) sparse
+matrix the first time the index is queried after a change. Adding a
+resume only appends arrays; ranking a drive is a few NumPy gathers plus a
+``bincount`` and never touches the resume files on disk.
+"""
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from django.db.models import Q
+
+from Careerlytics.models import PlacementCellStudent
+from users.models import UserRegistration
+from .models import ResumeAnalysis
+from .resume_analyzer import ResumeDocument
+from .skill_taxonomy import get_skill_index
+
+
+def document_terms(text: str) -> Counter:
+    """Token counts for a piece of text, plus canonical skills for any aliases it uses"""
+    doc = ResumeDocument(text)
+    terms = Counter(doc.counts)
+    for skill in get_skill_index().match(doc):
+        if skill not in terms:
+            terms[skill] = 1
+    return terms
+
+
+def drive_query_text(drive) -> str:
+    """Text a drive is matched on: role, description and extra requirements"""
+    parts = [drive.job_role, drive.description, drive.additional_requirements]
+    return ' '.join(part for part in parts if part)
+
+
+class ResumeSearchIndex:
+    """Incrementally built TF-IDF index over one placement cell's resumes"""
+
+    def __init__(self, student_ids: Iterable[str] = (), emails: Iterable[str] = ()):
+        # Cell membership, used to route newly uploaded resumes
+        self.student_ids = {sid for sid in student_ids if sid}
+        self.emails = {email for email in emails if email}
+
+        self.vocabulary: Dict[str, int] = {}
+        self.user_ids: List[Any] = []
+        self.analysis_ids: List[Any] = []
+        self._row_for_user: Dict[Any, int] = {}
+        self._alive: List[bool] = []
+        self._term_chunks: List[np.ndarray] = []
+        self._count_chunks: List[np.ndarray] = []
+        self._lengths: List[int] = []
+
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._row_for_user)
+
+    def covers(self, user) -> bool:
+        """Whether a student belongs to the cell this index was built for"""
+        return (user.student_id in self.student_ids) or (user.email in self.emails)
+
+    def add(self, user_id, analysis_id, text: str):
+        """Add or replace the resume indexed for a student"""
+        terms = document_terms(text)
+        with self._lock:
+            vocabulary = self.vocabulary
+            columns = np.fromiter(
+                (vocabulary.setdefault(term, len(vocabulary)) for term in terms),
+                dtype=np.int32, count=len(terms)
+            )
+            counts = np.fromiter(terms.values(), dtype=np.float32, count=len(terms))
+
+            previous = self._row_for_user.get(user_id)
+            if previous is not None:
+                self._alive[previous] = False
+
+            self._row_for_user[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            self.analysis_ids.append(analysis_id)
+            self._alive.append(True)
+            self._term_chunks.append(columns)
+            self._count_chunks.append(counts)
+            self._lengths.append(len(columns))
+            self._matrix = None
+
+    def remove(self, user_id, analysis_id=None) -> bool:
+        """
+        Drop a student's resume from the index
+
+        With an analysis_id, only if that analysis is the one indexed for
+        the student. Returns whether a resume was dropped.
+        """
+        with self._lock:
+            row = self._row_for_user.get(user_id)
+            if row is None or (analysis_id is not None and self.analysis_ids[row] != analysis_id):
+                return False
+            del self._row_for_user[user_id]
+            self._alive[row] = False
+            self._matrix = None
+            return True
+
+    def _build_matrix(self):
+        """Fold the pending documents into L2-normalized TF-IDF rows"""
+        n_rows = len(self.user_ids)
+        n_terms = len(self.vocabulary)
+        if not n_rows:
+            return None
+
+        # Consolidate chunks so later rebuilds only concatenate new documents
+        columns = np.concatenate(self._term_chunks)
+        counts = np.concatenate(self._count_chunks)
+        self._term_chunks = [columns]
+        self._count_chunks = [counts]
+
+        lengths = np.asarray(self._lengths, dtype=np.int64)
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        rows = np.repeat(np.arange(n_rows, dtype=np.int32), lengths)
+        alive = np.asarray(self._alive, dtype=bool)
+
+        n_docs = int(alive.sum())
+        df = np.bincount(columns[alive[rows]], minlength=n_terms)
+        idf = (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        weights = (1.0 + np.log(counts)) * idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n_rows))
+        norms[norms == 0] = 1.0
+        weights = (weights / norms[rows]).astype(np.float32)
+
+        return {
+            'indptr': indptr,
+            'columns': columns,
+            'weights': weights,
+            'idf': idf,
+            'live_rows': np.flatnonzero(alive),
+            'row_for_user': dict(self._row_for_user),
+            'user_ids': list(self.user_ids),
+            'analysis_ids': list(self.analysis_ids),
+        }
+
+    def rank(self, query_text: str, k: int = 20, user_ids: Optional[Iterable[Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Top-k resumes by cosine similarity to the query text.
+
+        Args:
+            query_text: Drive description or any free text
+            k: Number of results to return
+            user_ids: Optional subset of students to rank (e.g. applicants)
+
+        Returns:
+            List of dicts with user_id, analysis_id and score, best first
+        """
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = self._build_matrix()
+            matrix = self._matrix
+            vocabulary = self.vocabulary
+        if matrix is None:
+            return []
+
+        if user_ids is None:
+            candidates = matrix['live_rows']
+        else:
+            row_for_user = matrix['row_for_user']
+            candidates = np.fromiter(
+                sorted({row_for_user[uid] for uid in user_ids if uid in row_for_user}), dtype=np.int64
+            )
+        if not len(candidates):
+            return []
+
+        # Query weights scattered into a dense lookup table over the vocabulary
+        lookup = np.zeros(len(matrix['idf']), dtype=np.float32)
+        for term, count in document_terms(query_text).items():
+            column = vocabulary.get(term)
+            if column is not None and column < len(lookup):
+                lookup[column] = (1.0 + np.log(count)) * matrix['idf'][column]
+        norm = np.linalg.norm(lookup)
+        if norm:
+            lookup /= norm
+
+        # Gather the candidates' row slices and score them in one bincount
+        indptr = matrix['indptr']
+        starts, ends = indptr[candidates], indptr[candidates + 1]
+        spans = ends - starts
+        positions = np.repeat(ends - spans.cumsum(), spans) + np.arange(spans.sum())
+        owners = np.repeat(np.arange(len(candidates)), spans)
+        scores = np.bincount(
+            owners,
+            weights=matrix['weights'][positions] * lookup[matrix['columns'][positions]],
+            minlength=len(candidates)
+        )
+
+        order = np.arange(len(candidates))
+        if len(order) > k:
+            order = np.argpartition(-scores, k - 1)[:k]
+        order = order[np.argsort(-scores[order], kind='stable')]
+
+        return [
+            {
+                'user_id': matrix['user_ids'][candidates[i]],
+                'analysis_id': matrix['analysis_ids'][candidates[i]],
+                'score': round(float(scores[i]), 4),
+            }
+            for i in order
+        ]
+
+
+_indexes: Dict[Any, ResumeSearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def build_cell_index(placement_cell) -> ResumeSearchIndex:
+    """Build a cell's index from the stored text of its students' latest analyses"""
+    members = list(
+        PlacementCellStudent.objects.filter(placement_cell=placement_cell)
+        .values_list('student_id', 'email')
+    )
+    index = ResumeSearchIndex(
+        student_ids=[sid for sid, _ in members],
+        emails=[email for _, email in members],
+    )
+    if not members:
+        return index
+
+    users = UserRegistration.objects.filter(
+        Q(student_id__in=index.student_ids) | Q(email__in=index.emails)
+    ).values('pk')
+    analyses = (
+        ResumeAnalysis.objects
+        .filter(user__in=users, compressed_text__isnull=False)
+        .order_by('created_at')
+        .values_list('id', 'user_id', 'compressed_text')
+    )
+    # Oldest first, so each student's latest analysis replaces earlier ones
+    for analysis_id, user_id, compressed in analyses.iterator():
+        analysis = ResumeAnalysis(id=analysis_id, user_id=user_id, compressed_text=compressed)
+        index.add(user_id, analysis_id, analysis.extracted_text)
+    return index
+
+
+def get_cell_index(placement_cell) -> ResumeSearchIndex:
+    """Cached per-process index for a placement cell"""
+    index = _indexes.get(placement_cell.pk)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(placement_cell.pk)
+            if index is None:
+                index = build_cell_index(placement_cell)
+                _indexes[placement_cell.pk] = index
+    return index
+
+
+def invalidate_cell_index(placement_cell_id):
+    """Forget a cell's index, e.g. after its student list changes"""
+    with _indexes_lock:
+        _indexes.pop(placement_cell_id, None)
+
+
+def index_resume(analysis: ResumeAnalysis, text: str):
+    """Add a freshly analysed resume to every cached index its student belongs to"""
+    for index in list(_indexes.values()):
+        if index.covers(analysis.user):
+            index.add(analysis.user_id, analysis.id, text)
+
+
+def unindex_resume(analysis: ResumeAnalysis):
+    """
+    Remove a deleted resume from the cached indexes
+
+    Indexes holding it fall back to the student's latest remaining
+    analysis; deleting an older analysis leaves them as they are.
+    """
+    remaining = None
+    for index in list(_indexes.values()):
+        if not index.covers(analysis.user) or not index.remove(analysis.user_id, analysis.id):
+            continue
+        if remaining is None:
+            remaining = (
+                ResumeAnalysis.objects
+                .filter(user_id=analysis.user_id, compressed_text__isnull=False)
+                .exclude(id=analysis.id)
+                .order_by('-created_at')
+                .only('id', 'user_id', 'compressed_text')
+                .first()
+            ) or False
+        if remaining:
+            index.add(remaining.user_id, remaining.id, remaining.extracted_text)
+
+
+def eligible_user_ids(drive) -> List[Any]:
+    """UserRegistration ids of a drive's cell students who meet its eligibility criteria"""
+    students = PlacementCellStudent.objects.filter(placement_cell=drive.placement_cell, is_active=True)
+    if drive.min_cgpa is not None:
+        students = students.filter(marks_percentage__gte=drive.min_cgpa)
+    departments = [d.strip() for d in (drive.eligible_departments or '').split(',') if d.strip()]
+    if departments:
+        dept_filter = Q()
+        for department in departments:
+            dept_filter |= Q(department__iexact=department)
+        students = students.filter(dept_filter)
+    years = [int(y) for y in (drive.eligible_years or '').split(',') if y.strip().isdigit()]
+    if years:
+        students = students.filter(year__in=years)
+
+    members = list(students.values_list('student_id', 'email'))
+    if not members:
+        return []
+    return list(
+        UserRegistration.objects.filter(
+            Q(student_id__in=[sid for sid, _ in members if sid]) |
+            Q(email__in=[email for _, email in members if email])
+        ).values_list('pk', flat=True)
+    )
+
+
+def rank_drive_candidates(drive, scope: str = 'applicants', k: int = 20) -> List[Dict[str, Any]]:
+    """
+    Rank a drive's applicants, or all its eligible students, by resume relevance
+
+    Args:
+        drive: PlacementActivity of type 'drive'
+        scope: 'applicants' or 'eligible'
+        k: Number of candidates to return
+    """
+    if scope == 'eligible':
+        user_ids = eligible_user_ids(drive)
+    else:
+        user_ids = list(drive.applications.values_list('student_id', flat=True))
+    if not user_ids:
+        return []
+    return get_cell_index(drive.placement_cell).rank(drive_query_text(drive), k=k, user_ids=user_ids)
@@ -0,0 +1,170 @@
+"""
+Skill taxonomy for resume analysis and role eligibility.
+
+Skills, synonyms and role weights live in a versioned JSON file
+(``taxonomy/skill_taxonomy.json``) so curators can extend them without a
+deploy. The file is compiled into an immutable ``SkillIndex`` that is
+cached per process and only rebuilt when the file's ``version`` changes.
+Matching walks the resume tokens once, so its cost depends on the resume
+length and not on how many skills the taxonomy holds.
+"""
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Optional
+
+TAXONOMY_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'taxonomy', 'skill_taxonomy.json'
+)
+
+# Seconds between mtime checks of the taxonomy file
+TAXONOMY_CHECK_INTERVAL = 5
+
+
+class SkillIndex:
+    """Immutable skill matcher compiled from one taxonomy version"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.version = str(data.get('version', 0))
+
+        self.role_skills = MappingProxyType({
+            role: MappingProxyType({
+                category: tuple(skills) for category, skills in categories.items()
+            })
+            for role, categories in data.get('role_skills', {}).items()
+        })
+        self._role_skill_sets = {
+            role: frozenset(skill for skills in categories.values() for skill in skills)
+            for role, categories in self.role_skills.items()
+        }
+        self.general_skills = frozenset(data.get('general_skills', []))
+
+        self.role_weights = MappingProxyType({
+            role: MappingProxyType({
+                'skills': tuple(config.get('skills', [])),
+                'alternative_roles': tuple(config.get('alternative_roles', [])),
+            })
+            for role, config in data.get('role_weights', {}).items()
+        })
+
+        # Surface form (normalized tokens) -> canonical skill
+        surfaces = {}
+        canonical_skills = set(self.general_skills)
+        for skills in self._role_skill_sets.values():
+            canonical_skills.update(skills)
+        for skill in canonical_skills:
+            surfaces[skill] = skill
+        for skill, aliases in data.get('synonyms', {}).items():
+            for alias in aliases:
+                surfaces[alias] = skill
+
+        terms = {}
+        phrases = {}
+        for surface, skill in surfaces.items():
+            parts = tuple(_tokenize(surface))
+            if not parts:
+                continue
+            if len(parts) == 1:
+                terms[parts[0]] = skill
+            else:
+                phrases.setdefault(parts[0], []).append((parts, skill))
+
+        self._terms = terms
+        self._phrases = {head: tuple(entries) for head, entries in phrases.items()}
+
+    def __repr__(self):
+        return f"<SkillIndex version={self.version} terms={len(self._terms)}>"
+
+    def role_skill_set(self, role: str) -> FrozenSet[str]:
+        """All canonical skills listed for a role"""
+        return self._role_skill_sets.get(role, frozenset())
+
+    def match(self, doc) -> FrozenSet[str]:
+        """
+        Canonical skills mentioned in a ResumeDocument.
+
+        Single-token aliases are resolved from the document's distinct
+        tokens; multi-token aliases are only checked at positions whose
+        token starts one of them, in the token array and, if the document
+        has dotted or hyphenated tokens, in its split token array too.
+        """
+        terms = self._terms
+        found = {terms[token] for token in doc.counts if token in terms}
+
+        heads = doc.counts.keys() & self._phrases.keys()
+        if heads:
+            streams = [doc.tokens]
+            if len(doc.split_tokens) != len(doc.tokens):
+                streams.append(doc.split_tokens)
+            for tokens in streams:
+                for i, token in enumerate(tokens):
+                    if token not in heads:
+                        continue
+                    for parts, skill in self._phrases[token]:
+                        if tuple(tokens[i:i + len(parts)]) == parts:
+                            found.add(skill)
+
+        return frozenset(found)
+
+
+def _tokenize(text: str):
+    from .resume_analyzer import ResumeDocument
+    return ResumeDocument(text).tokens
+
+
+_lock = threading.Lock()
+_index: Optional[SkillIndex] = None
+_loaded_mtime = None
+_last_check = 0.0
+
+
+def _load_taxonomy_file(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or 'version' not in data:
+        raise ValueError("taxonomy file must be an object with a 'version' key")
+    return data
+
+
+def get_skill_index(force: bool = False) -> SkillIndex:
+    """
+    Return the compiled skill index for this process.
+
+    The taxonomy file is stat'ed at most every TAXONOMY_CHECK_INTERVAL
+    seconds; the index is recompiled only when the file's version differs
+    from the cached one. A broken file keeps the last good index.
+    """
+    global _index, _loaded_mtime, _last_check
+
+    now = time.monotonic()
+    if not force and _index is not None and now - _last_check < TAXONOMY_CHECK_INTERVAL:
+        return _index
+
+    with _lock:
+        _last_check = now
+        try:
+            mtime = os.path.getmtime(TAXONOMY_PATH)
+        except OSError as e:
+            print(f"Warning: Skill taxonomy not found at {TAXONOMY_PATH} - {e}")
+            mtime = None
+
+        if mtime is not None and (force or mtime != _loaded_mtime):
+            try:
+                data = _load_taxonomy_file(TAXONOMY_PATH)
+                if force or _index is None or str(data['version']) != _index.version:
+                    _index = SkillIndex(data)
+                _loaded_mtime = mtime
+            except (ValueError, OSError) as e:
+                print(f"Error: Invalid skill taxonomy at {TAXONOMY_PATH} - {e}")
+
+        if _index is None:
+            _index = SkillIndex({})
+
+    return _index
+
+
+def reload_skill_index() -> SkillIndex:
+    """Recompile the skill index from disk regardless of version"""
+    return get_skill_index(force=True)
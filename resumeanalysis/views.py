@@ -1,4 +1,5 @@
 import json
+import secrets
 import time
 import uuid
 from django.shortcuts import render, redirect, get_object_or_404, reverse
@@ -9,9 +10,9 @@ from django.views.decorators.http import require_POST
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.conf import settings
-from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
+from typing import Any, Dict, List
 import os
 
 from users.models import UserRegistration
@@ -21,8 +22,10 @@ from .models import (
 )
 from .forms import ResumeUploadForm, QuizStartForm, QuizAnswerForm, RoleSelectionForm
 from .resume_analyzer import analyze_resume_text
-from .quiz_generator import generate_role_quiz, calculate_quiz_scores
+from .resume_search import index_resume, unindex_resume
+from .quiz_generator import QuizGenerator, generate_role_quiz, calculate_quiz_scores
 from .eligibility_calculator import calculate_role_eligibility
+from .quiz_grading import save_role_eligibility, submit_quiz
 
 def extract_text_from_file(uploaded_file) -> str:
     """Extract text from uploaded resume file"""
@@ -166,10 +169,15 @@ def upload_resume(request):
                     user=user,
                     resume_file=resume_file,
                     original_filename=resume_file.name,
+                    target_role=target_role,
+                    compressed_text=ResumeAnalysis.compress_text(file_content),
                     **analysis_result
                 )
                 print(f"Resume analysis saved with ID: {resume_analysis.id}")  # Debug line
                 
+                # Keep any cached placement-cell search indexes current
+                index_resume(resume_analysis, file_content)
+                
                 # Create quiz session
                 try:
                     print(f"About to create quiz for user: {user.userid}, role: {target_role}")  # Debug line
@@ -301,6 +309,79 @@ def quiz_index(request):
     messages.info(request, "Please upload your resume first to start the assessment.")
     return redirect('upload')
 
+def fallback_quiz_data(target_role: str) -> Dict[str, Any]:
+    """Basic quiz used when no questions could be generated for a role"""
+    return {
+        'questions': [
+            {
+                'id': 'fallback_1',
+                'category': 'general',
+                'difficulty': 'easy',
+                'question_text': f'What is your experience with {target_role} development?',
+                'options': ['Beginner', 'Intermediate', 'Advanced', 'Expert'],
+                'correct_answer': 1,
+                'explanation': 'This helps assess your current skill level.'
+            },
+            {
+                'id': 'fallback_2',
+                'category': 'general',
+                'difficulty': 'easy',
+                'question_text': 'How comfortable are you with problem-solving?',
+                'options': ['Not comfortable', 'Somewhat comfortable', 'Very comfortable', 'Expert level'],
+                'correct_answer': 2,
+                'explanation': 'Problem-solving is essential for development roles.'
+            },
+            {
+                'id': 'fallback_3',
+                'category': 'general',
+                'difficulty': 'easy',
+                'question_text': 'Do you prefer working independently or in teams?',
+                'options': ['Independently', 'Small teams', 'Large teams', 'Mixed approach'],
+                'correct_answer': 3,
+                'explanation': 'Team collaboration is important in most development roles.'
+            }
+        ],
+        'quiz_info': {
+            'title': f'{target_role.title()} Assessment',
+            'description': 'Basic assessment for your selected role.',
+            'total_questions': 3,
+            'time_limit': 900,  # 15 minutes
+            'difficulty': 'easy'
+        }
+    }
+
+
+def store_quiz_state(session, quiz_id, quiz_data: Dict[str, Any]):
+    """
+    Keep only the question bank versions, seed and ordered question IDs in the session
+    
+    The full questions are rebuilt from the in-memory question bank (or the
+    archived versions of banks edited since) by quiz_questions_from_session(),
+    so the session row stays small.
+    """
+    metadata = quiz_data.get('metadata', {})
+    session[f'quiz_{quiz_id}_state'] = {
+        'version': metadata.get('bank_version', 'fallback'),
+        'banks': metadata.get('banks', {}),
+        'seed': metadata.get('seed'),
+        'ids': [q['id'] for q in quiz_data['questions']],
+    }
+
+
+def quiz_questions_from_session(session, quiz) -> List[Dict[str, Any]]:
+    """Questions of the quiz in progress, rebuilt from the compact session state"""
+    state = session.get(f'quiz_{quiz.id}_state')
+    if not state:
+        # Sessions started before the compact state stored full questions
+        return session.get(f'quiz_{quiz.id}_questions', [])
+    
+    if state['version'] == 'fallback':
+        questions = fallback_quiz_data(quiz.target_role)['questions']
+        return [q for q in questions if q['id'] in state['ids']]
+    
+    return QuizGenerator().questions_for_ids(state['ids'], state.get('banks')) or []
+
+
 def start_quiz(request, quiz_id):
     """Start the quiz session"""
     # Get user from existing session system
@@ -327,7 +408,7 @@ def start_quiz(request, quiz_id):
     # Generate quiz questions
     try:
         print(f"Attempting to generate quiz for role: {quiz.target_role}")  # Debug line
-        quiz_data = generate_role_quiz(quiz.target_role)
+        quiz_data = generate_role_quiz(quiz.target_role, seed=secrets.randbits(31), user=user)
         print(f"Generated quiz data for {quiz.target_role}: {len(quiz_data.get('questions', []))} questions")  # Debug line
         print(f"Quiz data keys: {list(quiz_data.keys())}")  # Debug line
         print(f"Quiz data type: {type(quiz_data)}")  # Debug line
@@ -354,51 +435,14 @@ def start_quiz(request, quiz_id):
         
         # Create a fallback quiz with basic questions
         print("Creating fallback quiz...")  # Debug line
-        quiz_data = {
-            'questions': [
-                {
-                    'id': 'fallback_1',
-                    'category': 'general',
-                    'difficulty': 'easy',
-                    'question_text': f'What is your experience with {quiz.target_role} development?',
-                    'options': ['Beginner', 'Intermediate', 'Advanced', 'Expert'],
-                    'correct_answer': 1,
-                    'explanation': 'This helps assess your current skill level.'
-                },
-                {
-                    'id': 'fallback_2',
-                    'category': 'general',
-                    'difficulty': 'easy',
-                    'question_text': 'How comfortable are you with problem-solving?',
-                    'options': ['Not comfortable', 'Somewhat comfortable', 'Very comfortable', 'Expert level'],
-                    'correct_answer': 2,
-                    'explanation': 'Problem-solving is essential for development roles.'
-                },
-                {
-                    'id': 'fallback_3',
-                    'category': 'general',
-                    'difficulty': 'easy',
-                    'question_text': 'Do you prefer working independently or in teams?',
-                    'options': ['Independently', 'Small teams', 'Large teams', 'Mixed approach'],
-                    'correct_answer': 3,
-                    'explanation': 'Team collaboration is important in most development roles.'
-                }
-            ],
-            'quiz_info': {
-                'title': f'{quiz.target_role.title()} Assessment',
-                'description': 'Basic assessment for your selected role.',
-                'total_questions': 3,
-                'time_limit': 900,  # 15 minutes
-                'difficulty': 'easy'
-            }
-        }
+        quiz_data = fallback_quiz_data(quiz.target_role)
         print(f"Created fallback quiz with {len(quiz_data['questions'])} questions")  # Debug line
     
-    # Store questions in session
-    request.session[f'quiz_{quiz_id}_questions'] = quiz_data['questions']
+    # Store question IDs in session
+    store_quiz_state(request.session, quiz_id, quiz_data)
     request.session[f'quiz_{quiz_id}_start_time'] = time.time()
     request.session.save()  # Ensure session is saved
-    print(f"Stored {len(quiz_data['questions'])} questions in session")  # Debug line
+    print(f"Stored {len(quiz_data['questions'])} question IDs in session")  # Debug line
     
     # Update quiz status
     quiz.status = 'in_progress'
@@ -421,78 +465,6 @@ def start_quiz(request, quiz_id):
         'user': user
     })
 
-def calculate_scores_from_session(responses: List[Dict[str, Any]], questions: List[Dict[str, Any]]) -> Dict[str, int]:
-    """
-    Calculate quiz scores using the questions from session
-    
-    Args:
-        responses: List of user responses with question_id and selected_option
-        questions: List of questions used in the quiz
-        
-    Returns:
-        Dictionary with scores for each category and total
-    """
-    category_scores = {
-        'general_ability': {'correct': 0, 'total': 0},
-        'tech_fundamentals': {'correct': 0, 'total': 0},
-        'role_specific': {'correct': 0, 'total': 0}
-    }
-    
-    # Map categories to score categories
-    category_mapping = {
-        'general': 'general_ability',
-        'tech_fundamentals': 'tech_fundamentals',
-        'frontend': 'role_specific',
-        'backend': 'role_specific',
-        'devops': 'role_specific',
-        'datascience': 'role_specific'
-    }
-    
-    # Create a mapping of question_id to question for quick lookup
-    question_map = {str(q['id']): q for q in questions}
-    
-    for response in responses:
-        question_id = response.get('question_id')
-        selected_option = response.get('selected_option')
-        
-        # Find the question from our questions list
-        question = question_map.get(str(question_id))
-        if not question:
-            print(f"Warning: Question {question_id} not found in questions list")
-            continue
-        
-        category = question['category']
-        score_category = category_mapping.get(category, 'general_ability')
-        
-        # Update scores
-        category_scores[score_category]['total'] += 1
-        if selected_option == question['correct_answer']:
-            category_scores[score_category]['correct'] += 1
-    
-    # Calculate percentages
-    final_scores = {}
-    for category, scores in category_scores.items():
-        if scores['total'] > 0:
-            final_scores[category] = int((scores['correct'] / scores['total']) * 100)
-        else:
-            final_scores[category] = 0
-    
-    # Calculate total score (weighted)
-    weights = {
-        'general_ability': 0.3,
-        'tech_fundamentals': 0.3,
-        'role_specific': 0.4
-    }
-    
-    total_score = sum(
-        final_scores[cat] * weight 
-        for cat, weight in weights.items()
-    )
-    
-    final_scores['total'] = int(total_score)
-    
-    return final_scores
-
 @csrf_exempt
 @require_POST
 def submit_answer(request, quiz_id):
@@ -513,7 +485,7 @@ def submit_answer(request, quiz_id):
         return redirect('user_login')
     
     # Get quiz
-    quiz = get_object_or_404(RoleQuiz, id=quiz_id, user=user)
+    quiz = get_object_or_404(RoleQuiz.objects.select_related('resume_analysis'), id=quiz_id, user=user)
     print(f"Current quiz status: {quiz.status}")  # Debug line
     
     # If quiz is still pending, update it to in_progress (this might happen due to race conditions)
@@ -546,85 +518,19 @@ def submit_answer(request, quiz_id):
             answers_json = request.POST.get('answers')
             print(f"Received answers: {answers_json}")  # Debug line
             answers = json.loads(answers_json)
-            questions = request.session.get(f'quiz_{quiz_id}_questions', [])
+            questions = quiz_questions_from_session(request.session, quiz)
             print(f"Questions from session: {len(questions)}")  # Debug line
+            if not questions:
+                # Grading against no questions would complete the quiz with zero scores
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'The questions of this quiz are no longer available. Please restart the quiz.'
+                }, status=409)
             
-            # Clear existing responses
-            QuizResponse.objects.filter(quiz=quiz).delete()
-            
-            # Save all answers
-            for question_idx, selected_option in enumerate(answers):
-                if selected_option is not None and question_idx < len(questions):
-                    question = questions[question_idx]
-                    QuizResponse.objects.create(
-                        quiz=quiz,
-                        session_question_id=question['id'],
-                        user_answer=selected_option,
-                        time_taken=0,
-                        is_correct=(selected_option == question['correct_answer'])
-                    )
-            
-            # Calculate scores and complete the quiz
-            response_data = [
-                {
-                    'question_id': resp.session_question_id,
-                    'selected_option': resp.user_answer
-                }
-                for resp in QuizResponse.objects.filter(quiz=quiz)
-            ]
-            
-            print(f"Response data for scoring: {len(response_data)} responses")  # Debug line
-            
-            # Create a custom scoring function that uses the session questions
-            scores = calculate_scores_from_session(response_data, questions)
-            print(f"Calculated scores: {scores}")  # Debug line
-            
-            # Update quiz with scores
-            quiz.general_ability_score = scores.get('general_ability', 0)
-            quiz.tech_fundamentals_score = scores.get('tech_fundamentals', 0)
-            quiz.role_specific_score = scores.get('role_specific', 0)
-            quiz.total_score = scores.get('total', 0)
-            quiz.status = 'completed'
-            quiz.completed_at = timezone.now()
-            quiz.save()
-            
-            # Calculate time taken
+            # Grade in memory, then store responses, scores and eligibility in one transaction
             start_time = request.session.get(f'quiz_{quiz_id}_start_time', time.time())
-            quiz.time_taken = int(time.time() - start_time)
-            quiz.save()
-            
-            # Calculate eligibility
-            eligibility = calculate_role_eligibility(quiz.resume_analysis, quiz)
-            
-            # Save eligibility results
-            with transaction.atomic():
-                # Delete existing if any
-                RoleEligibility.objects.filter(quiz=quiz).delete()
-                
-                role_eligibility = RoleEligibility.objects.create(
-                    user=user,
-                    quiz=quiz,
-                    resume_analysis=quiz.resume_analysis,
-                    role_name=eligibility['target_role'],
-                    eligibility_score=eligibility['total_eligibility'],
-                    is_eligible=eligibility['is_eligible'],
-                    general_score=quiz.general_ability_score,
-                    tech_score=quiz.tech_fundamentals_score,
-                    role_score=quiz.role_specific_score,
-                    resume_score=quiz.resume_analysis.ats_score,
-                    recommended_roles=eligibility['recommended_roles'],
-                    improvement_suggestions=eligibility['improvement_areas']
-                )
-                
-                # Save recommended roles
-                for rec in eligibility['recommended_roles']:
-                    RecommendedRole.objects.create(
-                        user=user,
-                        eligibility=role_eligibility,
-                        role_name=rec['role_name'],
-                        match_percentage=rec['match_percentage'],
-                        match_reasons=rec['match_reasons']
-                    )
+            scores = submit_quiz(user, quiz, questions, answers, int(time.time() - start_time))
+            print(f"Calculated scores: {scores}")  # Debug line
             
             # Always redirect to results page
             redirect_url = reverse('resumeanalysis:quiz_results', kwargs={'quiz_id': quiz.id})
@@ -638,7 +544,7 @@ def submit_answer(request, quiz_id):
             time_taken = request.POST.get('time_taken', 0)
             
             # Get questions from session
-            questions = request.session.get(f'quiz_{quiz_id}_questions', [])
+            questions = quiz_questions_from_session(request.session, quiz)
             question = next((q for q in questions if q['id'] == question_id), None)
             
             if not question:
@@ -727,34 +633,11 @@ def complete_quiz(request, quiz_id):
     eligibility = calculate_role_eligibility(quiz.resume_analysis, quiz)
     
     # Save eligibility results
-    with transaction.atomic():
-        role_eligibility = RoleEligibility.objects.create(
-            user=user,
-            quiz=quiz,
-            resume_analysis=quiz.resume_analysis,
-            role_name=eligibility['target_role'],
-            eligibility_score=eligibility['total_eligibility'],
-            is_eligible=eligibility['is_eligible'],
-            general_score=quiz.general_ability_score,
-            tech_score=quiz.tech_fundamentals_score,
-            role_score=quiz.role_specific_score,
-            resume_score=quiz.resume_analysis.ats_score,
-            recommended_roles=eligibility['recommended_roles'],
-            improvement_suggestions=eligibility['improvement_areas']
-        )
-        
-        # Save recommended roles
-        for rec in eligibility['recommended_roles']:
-            RecommendedRole.objects.create(
-                user=user,
-                eligibility=role_eligibility,
-                role_name=rec['role_name'],
-                match_percentage=rec['match_percentage'],
-                match_reasons=rec['match_reasons']
-            )
+    save_role_eligibility(user, quiz, eligibility)
     
     # Clear quiz session data
     session_keys = [
+        f'quiz_{quiz_id}_state',
         f'quiz_{quiz_id}_questions',
         f'quiz_{quiz_id}_start_time'
     ]
@@ -986,6 +869,7 @@ def delete_resume(request, analysis_id):
                 default_storage.delete(analysis.resume_file.name)
         
         # Delete the analysis record
+        unindex_resume(analysis)
         analysis.delete()
         
         messages.success(request, "Resume deleted successfully. You can now upload a new resume.")
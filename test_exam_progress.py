@@ -0,0 +1,64 @@
+import json
+import os
+import django
+
+# Setup Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Careerlytics.settings')
+django.setup()
+
+from django.test import RequestFactory, TestCase
+
+from personalizedplan.models import ExamProgress
+from personalizedplan.testsystem import views
+from personalizedplan.testsystem.exam_progress import (
+    parse_changes, record_progress, saved_progress, submit_progress,
+)
+
+ATTEMPT = 'test-attempt'
+
+
+class ExamProgressTests(TestCase):
+
+    def test_out_of_order_post_does_not_roll_answers_back(self):
+        self.assertEqual(record_progress(ATTEMPT, 2, {'0': 1, '1': 2}), 2)
+
+        # An older post arriving late holds nothing newer
+        self.assertEqual(record_progress(ATTEMPT, 1, {'0': 3}), 2)
+
+        self.assertEqual(saved_progress(ATTEMPT, 3), {'answers': [1, 2, None], 'seq': 2})
+
+    def test_cleared_answer_is_removed(self):
+        record_progress(ATTEMPT, 1, {'0': 1, '2': 0})
+        record_progress(ATTEMPT, 2, parse_changes({'0': None}, 3))
+
+        self.assertEqual(saved_progress(ATTEMPT, 3)['answers'], [None, None, 0])
+        self.assertEqual(ExamProgress.objects.get(attempt=ATTEMPT).answers, {'2': 0})
+
+    def test_submit_applies_pending_changes(self):
+        record_progress(ATTEMPT, 1, {'0': 1, '1': 2})
+
+        answers = submit_progress(ATTEMPT, 2, {'1': 3, '2': 0}, 4)
+
+        self.assertEqual(answers, [1, 3, 0, None])
+        self.assertIsNotNone(ExamProgress.objects.get(attempt=ATTEMPT).submitted_at)
+        # A submitted attempt is not restored on the exam page
+        self.assertEqual(saved_progress(ATTEMPT, 4), {'answers': [None] * 4, 'seq': 0})
+
+    def test_post_after_submit_is_rejected(self):
+        record_progress(ATTEMPT, 1, {'0': 1})
+        submit_progress(ATTEMPT, 2, {}, 3)
+
+        self.assertIsNone(record_progress(ATTEMPT, 3, {'0': 2}))
+
+        request = RequestFactory().post(
+            '/personalized-plan/test-system/save-progress/',
+            json.dumps({'attempt': ATTEMPT, 'seq': 3, 'changes': {'0': 2}}),
+            content_type='application/json',
+        )
+        request.session = {'current_test_state': {'attempt': ATTEMPT, 'file': '', 'ids': [0, 1, 2]}}
+        request.user = None
+        # Past session_login_required, which only resolves the logged-in student
+        response = views.save_progress.__wrapped__(request)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(ExamProgress.objects.get(attempt=ATTEMPT).answers, {'0': 1})
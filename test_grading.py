@@ -0,0 +1,72 @@
+import random
+from collections import Counter
+
+from personalizedplan.testsystem.grading import AnswerKey
+
+TAGS = ['loops', 'functions', 'classes', 'sql', 'http', 'git']
+
+
+def bank(size=40, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            'id': f'q{n}',
+            'category': rng.choice(['python', 'web', 'tools']),
+            'question_text': f'Question {n}',
+            'options': ['a', 'b', 'c', 'd'],
+            'correct_answer': rng.randrange(4),
+            'tags': rng.sample(TAGS, rng.randint(0, 3)),
+        }
+        for n in range(size)
+    ]
+
+
+def old_grading(questions, answers):
+    """The per-question loop submit_test used before the vectorized kernel"""
+    results = []
+    for i, question in enumerate(questions):
+        user_answer = answers[i] if i < len(answers) else None
+        results.append({'is_correct': user_answer == question.get('correct_answer'), 'tags': question.get('tags', [])})
+    failed_tags = [tag for res in results if not res['is_correct'] for tag in res['tags']]
+    return (
+        sum(res['is_correct'] for res in results),
+        ''.join('1' if res['is_correct'] else '0' for res in results),
+        [tag for tag, count in Counter(failed_tags).most_common(3)],
+    )
+
+
+def test_grades_match_the_old_grading_loop():
+    questions = bank()
+    key = AnswerKey(questions)
+    rng = random.Random(1)
+    for _ in range(500):
+        ids = rng.sample(range(len(questions)), 20)
+        answers = [rng.choice([None, 0, 1, 2, 3]) for _ in range(rng.randint(0, 20))]
+        grade = key.grade(ids, answers)
+
+        expected = old_grading([questions[i] for i in ids], answers)
+        assert (grade.correct_count, grade.correct_mask, grade.weak_tags()) == expected
+
+
+def test_malformed_answers_are_graded_wrong():
+    questions = bank(size=3)
+    for question in questions:
+        question['correct_answer'] = 0
+    key = AnswerKey(questions)
+
+    for answer in (-1, -2, 4, 99, 32767, 32768, 2 ** 40, -(2 ** 40), '70000', 'b', 1.5, [0], {}, True):
+        grade = key.grade([0, 1, 2], [answer, answer, answer])
+        assert grade.correct_count == 0, answer
+        assert grade.correct_mask == '000', answer
+
+
+def test_questions_without_a_usable_key_are_never_correct():
+    questions = bank(size=4)
+    questions[0]['correct_answer'] = None
+    questions[1]['correct_answer'] = -1
+    questions[2]['correct_answer'] = 7
+    questions[3]['correct_answer'] = -2
+    key = AnswerKey(questions)
+
+    for answers in ([None] * 4, [-1] * 4, [-2] * 4, [7] * 4, []):
+        assert key.grade([0, 1, 2, 3], answers).correct_count == 0, answers
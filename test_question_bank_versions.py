@@ -0,0 +1,99 @@
+import os
+import django
+
+# Setup Django environment
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Careerlytics.settings')
+django.setup()
+
+from django.test import TestCase
+
+from personalizedplan.models import ExamAttempt
+from personalizedplan.testsystem import question_catalog, question_store
+from personalizedplan.testsystem.exam_state import (
+    attempt_results, current_exam_questions, grade_exam, new_exam_state,
+)
+from personalizedplan.testsystem.question_catalog import QuestionCatalog, QuestionFile
+from personalizedplan.testsystem.question_compiler import QUESTIONS_ROOT
+from resumeanalysis.quiz_generator import QuestionBank, QuizGenerator
+
+BANK_PATH = os.path.join(QUESTIONS_ROOT, 'bank_edit_regression.json')
+QUIZ_BANK = os.path.join('resumeanalysis', 'questions', 'backend', 'questions.json')
+
+
+def question(n, correct=0):
+    return {
+        'id': f'q{n}',
+        'category': 'backend',
+        'difficulty': 'easy',
+        'question_text': f'Question {n}',
+        'options': ['a', 'b', 'c', 'd'],
+        'correct_answer': correct,
+        'explanation': '',
+        'tags': [f'topic{n}'],
+    }
+
+
+def bank_v1():
+    return [question(n) for n in range(3)]
+
+
+def bank_v2():
+    # The first question's answer changed and the last one was removed
+    return [question(0, correct=2), question(1)]
+
+
+class BankEditedMidTestTests(TestCase):
+
+    def setUp(self):
+        self.saved_catalog = question_catalog._catalog
+        self.addCleanup(setattr, question_catalog, '_catalog', self.saved_catalog)
+        # Archived versions are remembered per process, the rows are rolled back per test
+        question_store._archived_versions.clear()
+        question_store._archived_banks.clear()
+
+    def use_bank(self, version, questions):
+        """Serve the test bank from the catalog as if it was compiled at this version"""
+        question_catalog._catalog = QuestionCatalog(
+            {BANK_PATH: QuestionFile(BANK_PATH, version, questions)}, question_catalog._store_mtimes()
+        )
+
+    def test_running_test_keeps_the_version_it_was_drawn_from(self):
+        self.use_bank('v1', bank_v1())
+        state = new_exam_state(BANK_PATH, count=3)
+        shown = current_exam_questions({'current_test_state': state})
+
+        self.use_bank('v2', bank_v2())
+        questions = current_exam_questions({'current_test_state': state})
+
+        self.assertEqual(questions, shown)
+        answers = [q['correct_answer'] for q in questions]
+        grade = grade_exam(state, questions, answers)
+        self.assertEqual((grade.correct_count, grade.total), (3, 3))
+
+    def test_results_of_an_attempt_on_an_edited_bank_keep_their_details(self):
+        self.use_bank('v1', bank_v1())
+        state = new_exam_state(BANK_PATH, count=3)
+        attempt = ExamAttempt(
+            test_type='initial_assessment', title='Bank edit', question_file=state['file'],
+            bank_version=state['version'], question_ids=state['ids'], answers=[0, 1, 0],
+            correct_mask='101', total_questions=3, correct_answers=2, score_percentage=66.7,
+        )
+
+        self.use_bank('v2', bank_v2())
+        details = attempt_results(attempt)['results_detail']
+
+        self.assertEqual(len(details), 3)
+        self.assertEqual([d['question'] for d in details], [f"Question {i}" for i in state['ids']])
+        self.assertEqual([d['correct_answer'] for d in details], [0, 0, 0])
+
+    def test_quiz_questions_come_from_the_archived_bank_version(self):
+        generator = QuizGenerator(bank=QuestionBank({'backend': bank_v1()}, {'backend': (QUIZ_BANK, 'v1')}))
+        quiz = generator.generate_quiz('backend', seed=1)
+        question_store.archive_bank_version(QUIZ_BANK, 'v1', bank_v1())
+        ids = [q['id'] for q in quiz['questions']]
+
+        edited = QuizGenerator(bank=QuestionBank({'backend': bank_v2()}, {'backend': (QUIZ_BANK, 'v2')}))
+
+        self.assertEqual(quiz['metadata']['banks'], {QUIZ_BANK: 'v1'})
+        self.assertIsNone(edited.questions_for_ids(ids))
+        self.assertEqual(edited.questions_for_ids(ids, quiz['metadata']['banks']), quiz['questions'])
@@ -0,0 +1,36 @@
+from resumeanalysis.resume_analyzer import ResumeDocument, analyze_resume_text
+
+DOTTED_RESUME = """
+Frontend developer. Built dashboards in React.js and Vue.js on a Node.js
+backend; Python-based ETL jobs and Django-based REST APIs.
+B.Tech in computer-science.
+"""
+
+
+def test_dotted_and_hyphenated_tokens_are_indexed_by_their_parts():
+    doc = ResumeDocument(DOTTED_RESUME)
+
+    # Kept whole in the token array, counted whole and by parts
+    assert 'react.js' in doc.tokens
+    assert 'python-based' in doc.tokens
+    for term in ('react.js', 'react', 'vue', 'node.js', 'node', 'python', 'django', 'b.tech'):
+        assert doc.contains(term), term
+    assert doc.contains('computer science')
+    assert not doc.contains('based python')
+
+
+def test_skills_in_dotted_and_hyphenated_mentions_are_matched():
+    frontend = analyze_resume_text(DOTTED_RESUME, 'resume.txt', 'frontend')['skills_extracted']
+    backend = analyze_resume_text(DOTTED_RESUME, 'resume.txt', 'backend')['skills_extracted']
+
+    for skill in ('react', 'vue', 'python', 'django'):
+        assert skill in frontend, skill
+    assert 'nodejs' in backend
+
+
+def test_hyphenated_phrase_aliases_are_matched():
+    text = "Trained machine-learning models with scikit learn"
+    skills = analyze_resume_text(text, 'resume.txt', 'datascience')['skills_extracted']
+
+    assert 'machine-learning' in skills
+    assert 'scikit-learn' in skills